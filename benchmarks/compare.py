@@ -0,0 +1,62 @@
+import argparse
+import json
+import sys
+import typing as t
+
+
+def load(path: str) -> t.Dict[tuple, dict]:
+    with open(path) as fp:
+        report = json.load(fp)
+
+    return {
+        (result["backend"], result["group"], result["name"], result["size"]): result
+        for result in report["results"]
+    }
+
+
+def compare(
+    baseline: t.Dict[tuple, dict], current: t.Dict[tuple, dict], tolerance: float = 0.1
+) -> t.List[dict]:
+    rows = []
+
+    for key in baseline.keys() & current.keys():
+        before, after = baseline[key]["per_op_us"], current[key]["per_op_us"]
+        ratio = after / before if before else 1.0
+
+        rows.append(
+            {
+                "key": key,
+                "before": before,
+                "after": after,
+                "ratio": ratio,
+                "regression": ratio > 1 + tolerance,
+            }
+        )
+
+    return sorted(rows, key=lambda row: row["ratio"], reverse=True)
+
+
+def main(argv: t.Optional[t.Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.compare")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    args = parser.parse_args(argv)
+
+    rows = compare(load(args.baseline), load(args.current), args.tolerance)
+
+    for row in rows:
+        backend, group, name, size = row["key"]
+
+        print(
+            f"{'!' if row['regression'] else ' '} {backend:<14} {group:<10}"
+            f" {name:<15} {size or '':>8} {row['before']:>12.2f}"
+            f" {row['after']:>12.2f} us/op {row['ratio']:>6.2f}x"
+        )
+
+    # a non-zero exit status fails CI when anything got slower than the tolerance
+    return int(any(row["regression"] for row in rows))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
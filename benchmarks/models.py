@@ -0,0 +1,22 @@
+import datetime
+
+import sqlalchemy as sa
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+from flex_alchemy import ActiveRecord
+
+
+class Base(DeclarativeBase, ActiveRecord):
+    pass
+
+
+class Account(Base):
+    __tablename__ = "bench_accounts"
+
+    id: Mapped[int] = mapped_column(sa.Integer(), primary_key=True)
+    email: Mapped[str] = mapped_column(sa.String(100), unique=True)
+    name: Mapped[str] = mapped_column(sa.String(50))
+    score: Mapped[float] = mapped_column(sa.Float())
+    enable: Mapped[bool] = mapped_column(sa.Boolean(), default=True)
+    created_at: Mapped[datetime.datetime] = mapped_column(
+        sa.DateTime(), server_default=sa.func.now()
+    )
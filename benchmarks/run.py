@@ -0,0 +1,373 @@
+import argparse
+import datetime
+import importlib.metadata
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import typing as t
+
+import sqlalchemy as sa
+from sqlalchemy.pool import StaticPool
+
+from flex_alchemy.builders.upsert import UpsertBuilder
+
+from .models import Account, Base
+
+BACKENDS = ("sqlite-memory", "sqlite-file", "postgresql")
+SIZES = (1000, 100000, 1000000)
+
+
+def make_rows(size: int, seed: int = 0, offset: int = 0) -> t.List[dict]:
+    rng = random.Random(seed)
+
+    return [
+        {
+            "email": f"user{num}@example.com",
+            "name": f"user {num}",
+            "score": rng.random(),
+            "enable": num % 2 == 0,
+        }
+        for num in range(offset, offset + size)
+    ]
+
+
+def make_engine(
+    backend: str, directory: str, postgresql_url: t.Optional[str] = None
+) -> sa.Engine:
+    if backend == "sqlite-memory":
+        # one shared connection, every session sees the same in-memory database
+        return sa.create_engine("sqlite://", poolclass=StaticPool)
+
+    if backend == "sqlite-file":
+        return sa.create_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+
+    if backend == "postgresql":
+        if not postgresql_url:
+            raise ValueError("a PostgreSQL url is required for the postgresql backend.")
+
+        return sa.create_engine(postgresql_url)
+
+    raise ValueError(f"unknown backend {backend}.")
+
+
+class Suite:
+    def __init__(
+        self,
+        engine: sa.Engine,
+        backend: str,
+        sizes: t.Sequence[int] = SIZES,
+        repeat: int = 3,
+        iterations: int = 2000,
+        operations: int = 500,
+        seed: int = 0,
+    ):
+        self.engine = engine
+        self.backend = backend
+        self.sizes = sizes
+        self.repeat = repeat
+        self.iterations = iterations
+        self.operations = operations
+        self.seed = seed
+        self.results: t.List[dict] = []
+
+    def run(self, groups: t.Sequence[str] = ("builders", "crud", "bulk", "hydration")):
+        Base.make_session(self.engine)
+
+        try:
+            for group in groups:
+                getattr(self, f"bench_{group}")()
+        finally:
+            Base.teardown_session()
+            Base.metadata.drop_all(self.engine)
+
+        return self.results
+
+    def reset(self, size: int = 0):
+        Base.teardown_session()
+        Base.metadata.drop_all(self.engine)
+        Base.metadata.create_all(self.engine)
+
+        if size:
+            Account.bulk_load(make_rows(size, self.seed))
+
+    def measure(
+        self,
+        group: str,
+        name: str,
+        run: t.Callable[[], t.Any],
+        ops: int,
+        size: t.Optional[int] = None,
+        setup: t.Optional[t.Callable[[], t.Any]] = None,
+    ):
+        timings = []
+
+        # the best run is reported, the median shows how noisy the machine was
+        for _ in range(self.repeat):
+            if setup is not None:
+                setup()
+
+            started = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - started)
+
+        seconds = min(timings)
+
+        self.results.append(
+            {
+                "backend": self.backend,
+                "group": group,
+                "name": name,
+                "size": size,
+                "ops": ops,
+                "seconds": seconds,
+                "median": statistics.median(timings),
+                "per_op_us": seconds / ops * 1e6,
+                "ops_per_second": ops / seconds if seconds else float(ops),
+            }
+        )
+
+    def bench_builders(self):
+        row = make_rows(1, self.seed)[0]
+        dialect = self.engine.dialect
+        iterations = range(self.iterations)
+
+        builders = {
+            "select": lambda: Account.where(
+                Account.enable.is_(True), Account.score > 0.5
+            )
+            .order_by(Account.id.desc())
+            .limit(20)
+            ._build(),
+            "insert": lambda: Account.insert(row)._build(),
+            "update": lambda: Account.update(name="renamed")
+            .where(Account.id == 1)
+            ._build(),
+            "delete": lambda: Account.destroy().where(Account.id == 1)._build(),
+            "upsert": lambda: UpsertBuilder(Account)
+            .values([row])
+            .on_conflict("email")
+            ._build([row], dialect.name),
+        }
+
+        for name, build in builders.items():
+            self.measure(
+                "builders",
+                name,
+                lambda: [build() for _ in iterations],
+                self.iterations,
+            )
+
+        select = builders["select"]()
+
+        self.measure(
+            "builders",
+            "select_compile",
+            lambda: [select.compile(dialect=dialect) for _ in iterations],
+            self.iterations,
+        )
+
+    def bench_crud(self):
+        ops = self.operations
+        rows = make_rows(ops, self.seed, offset=ops)
+        pks = list(range(1, ops + 1))
+        instances = []
+
+        def setup():
+            self.reset(ops)
+            instances.clear()
+
+        def create():
+            instances.extend(Account.create(row) for row in rows)
+
+        def save():
+            for instance in instances:
+                instance.name = "renamed"
+                instance.save()
+
+        def delete():
+            for instance in instances:
+                instance.delete()
+
+        self.measure(
+            "crud", "find", lambda: [Account.find(pk) for pk in pks], ops, setup=setup
+        )
+        self.measure(
+            "crud", "first", lambda: [Account.first() for _ in pks], ops, setup=setup
+        )
+        self.measure(
+            "crud",
+            "all",
+            lambda: [Account.all() for _ in range(10)],
+            10,
+            size=ops,
+            setup=setup,
+        )
+        self.measure("crud", "create", create, ops, setup=setup)
+
+        # save and delete work on the instances created just before them
+        self.measure("crud", "save", save, ops, setup=lambda: (setup(), create()))
+        self.measure("crud", "delete", delete, ops, setup=lambda: (setup(), create()))
+
+    def bench_bulk(self):
+        for size in self.sizes:
+            rows = make_rows(size, self.seed)
+
+            self.measure(
+                "bulk",
+                "bulk_create",
+                lambda: Account.bulk_create(rows, batch_size=1000),
+                size,
+                size,
+                setup=self.reset,
+            )
+            self.measure(
+                "bulk",
+                "bulk_load",
+                lambda: Account.bulk_load(rows),
+                size,
+                size,
+                setup=self.reset,
+            )
+
+            # every row conflicts, the update branch is measured
+            self.measure(
+                "bulk",
+                "upsert",
+                lambda: Account.upsert(rows, conflict=["email"], update=["score"]),
+                size,
+                size,
+                setup=lambda: self.reset(size),
+            )
+
+    def bench_hydration(self):
+        columns = (Account.id, Account.email, Account.name, Account.score)
+
+        for size in self.sizes:
+            self.reset(size)
+
+            # a fresh session each time, the identity map would skip hydration
+            self.measure(
+                "hydration",
+                "orm",
+                lambda: Account.select().execute().scalars().all(),
+                size,
+                size,
+                setup=Base.teardown_session,
+            )
+            self.measure(
+                "hydration",
+                "rows",
+                lambda: Account.select(*columns).execute().all(),
+                size,
+                size,
+                setup=Base.teardown_session,
+            )
+
+            for mode in ("as_rows", "as_dicts", "as_dataclasses"):
+                self.measure(
+                    "hydration",
+                    mode,
+                    getattr(Account.select(), mode),
+                    size,
+                    size,
+                    setup=Base.teardown_session,
+                )
+
+
+def metadata(args: argparse.Namespace) -> dict:
+    try:
+        version = importlib.metadata.version("flex-alchemy")
+    except importlib.metadata.PackageNotFoundError:
+        version = None
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        "flex_alchemy": version,
+        "commit": commit,
+        "sqlalchemy": sa.__version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "sizes": args.sizes,
+        "repeat": args.repeat,
+        "iterations": args.iterations,
+        "operations": args.operations,
+        "seed": args.seed,
+    }
+
+
+def main(argv: t.Optional[t.Sequence[str]] = None) -> dict:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run")
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS)
+    parser.add_argument(
+        "--postgresql-url", default=os.environ.get("BENCHMARK_POSTGRESQL_URL")
+    )
+    parser.add_argument(
+        "--groups", nargs="+", default=["builders", "crud", "bulk", "hydration"]
+    )
+    parser.add_argument("--sizes", nargs="+", type=int, default=list(SIZES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--operations", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="benchmark.json")
+    args = parser.parse_args(argv)
+
+    # PostgreSQL only joins the default run when a database is configured
+    backends = args.backends or [
+        backend
+        for backend in BACKENDS
+        if backend != "postgresql" or args.postgresql_url
+    ]
+
+    report = {"meta": metadata(args), "results": []}
+
+    with tempfile.TemporaryDirectory() as directory:
+        for backend in backends:
+            engine = make_engine(backend, directory, args.postgresql_url)
+
+            try:
+                suite = Suite(
+                    engine,
+                    backend,
+                    sizes=args.sizes,
+                    repeat=args.repeat,
+                    iterations=args.iterations,
+                    operations=args.operations,
+                    seed=args.seed,
+                )
+                report["results"].extend(suite.run(args.groups))
+            finally:
+                engine.dispose()
+
+    with open(args.output, "w") as fp:
+        json.dump(report, fp, indent=2)
+
+    for result in report["results"]:
+        print(
+            f"{result['backend']:<14} {result['group']:<10} {result['name']:<15}"
+            f" {result['size'] or '':>8} {result['per_op_us']:>12.2f} us/op"
+            f" {result['ops_per_second']:>14.1f} ops/s",
+            file=sys.stderr,
+        )
+
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,13 @@
 from .activerecord import ActiveRecord
 
 __all__ = ["ActiveRecord"]
+
+
+def __getattr__(name: str):
+    # the asyncio extra is optional, only import it when asked for
+    if name == "AsyncActiveRecord":
+        from .asyncio import AsyncActiveRecord
+
+        return AsyncActiveRecord
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,19 +1,41 @@
 import typing as t
 
-from sqlalchemy import Insert, Select, Update, Delete
+from sqlalchemy import Insert, Select, Update, Delete, inspect, update
 from sqlalchemy.orm import Session
 from sqlalchemy.engine.result import Result
 
-from .session import ScopedSessionHandler
+from .session import ScopedSessionHandler, commit_loaded, in_unit_of_work
 from .builders.select import SelectBuilder
 from .builders.insert import InsertBuilder
 from .builders.update import UpdateBuilder
 from .builders.delete import DeleteBuilder
+from .builders.upsert import UpsertBuilder
+from .scopes import Scope
+from .loading import find_many, listen_lazy_loads
+from .bulk import values_updates
+from .utils import chunked, max_bind_params
+from .instrumentation import instrument
+
+BULK_UPDATE_STRATEGIES = ("auto", "executemany", "values")
 
 T = t.TypeVar("T", bound="ActiveRecord")
 
 
 class ActiveRecord(ScopedSessionHandler):
+    _strict_loading: bool = False
+    _global_scopes: t.Dict[str, Scope] = {}
+
+    @classmethod
+    def add_global_scope(cls, scope: Scope, name: t.Optional[str] = None):
+        cls._global_scopes = {**cls._global_scopes, name or scope.name: scope}
+
+    @classmethod
+    def prevent_lazy_loading(cls, enable: bool = True):
+        cls._strict_loading = enable
+
+        if enable:
+            listen_lazy_loads()
+
     @classmethod
     def select(cls: t.Type[T], *entities) -> SelectBuilder:
         return cls._new_select().select(*entities)
@@ -28,7 +50,34 @@ class ActiveRecord(ScopedSessionHandler):
     def find(cls: t.Type[T], pk: t.Any, session: Session = None) -> t.Optional[T]:
         session = cls.get_session(session)
 
-        return session.get(cls, pk)
+        if not cls._global_scopes:
+            return session.get(
+                cls, pk, execution_options={"prepared": cls._prepared_statements}
+            )
+
+        return (
+            cls._new_select()
+            .where(*_pk_criteria(cls, pk))
+            .execute(session=session)
+            .scalars()
+            .first()
+        )
+
+    @classmethod
+    def find_many(
+        cls: t.Type[T],
+        pks: t.Iterable[t.Any],
+        chunk_size: t.Optional[int] = None,
+        with_missing: bool = False,
+        session: t.Optional[Session] = None,
+    ) -> t.Union[t.List[T], t.Tuple[t.List[T], t.List[t.Any]]]:
+        session = cls.get_session(session)
+
+        instances, missing = find_many(
+            session, cls, pks, chunk_size, cls._new_select()._build()
+        )
+
+        return (instances, missing) if with_missing else instances
 
     @classmethod
     def all(cls: t.Type[T], session: Session = None) -> t.Sequence[T]:
@@ -36,6 +85,18 @@ class ActiveRecord(ScopedSessionHandler):
 
         return cls._new_select().execute(session=session).scalars().all()
 
+    @classmethod
+    def each(
+        cls: t.Type[T], batch_size: int = 1000, session: t.Optional[Session] = None
+    ) -> t.Iterator[T]:
+        return cls._new_select().stream(batch_size, session=session)
+
+    @classmethod
+    def chunk(
+        cls: t.Type[T], batch_size: int = 1000, session: t.Optional[Session] = None
+    ) -> t.Iterator[t.List[T]]:
+        return cls._new_select().chunk(batch_size, session=session)
+
     @classmethod
     def create(cls: t.Type[T], attributes: dict, session: Session = None) -> T:
         session = cls.get_session(session)
@@ -45,10 +106,157 @@ class ActiveRecord(ScopedSessionHandler):
 
         return instance
 
+    @classmethod
+    def bulk_create(
+        cls: t.Type[T],
+        rows: t.Iterable[dict],
+        batch_size: int = 1000,
+        return_instances: bool = False,
+        return_keys: bool = False,
+        session: t.Optional[Session] = None,
+    ) -> t.Union[int, t.List[t.Any]]:
+        session = cls.get_session(session)
+
+        primary_key = inspect(cls).primary_key
+        returned = []
+        total = 0
+
+        for batch in chunked(rows, batch_size):
+            builder = InsertBuilder(cls, session=session).many(batch)
+
+            if return_instances:
+                builder.returning(cls, sort_by_parameter_order=True)
+            elif return_keys:
+                builder.returning(*primary_key, sort_by_parameter_order=True)
+
+            try:
+                result = builder.execute(commit=False)
+
+                if return_instances:
+                    instances = result.scalars().all()
+
+                    # keep loaded attributes from being expired by batch commits
+                    for instance in instances:
+                        session.expunge(instance)
+
+                    returned.extend(instances)
+                elif return_keys:
+                    returned.extend(
+                        row[0] if len(primary_key) == 1 else tuple(row)
+                        for row in result
+                    )
+
+                if not in_unit_of_work(session):
+                    session.commit()
+
+            except Exception as e:
+                session.rollback()
+                raise e
+
+            total += len(batch)
+
+        if return_instances:
+            session.add_all(returned)
+
+        return returned if return_instances or return_keys else total
+
+    @classmethod
+    def bulk_update(
+        cls: t.Type[T],
+        rows: t.Iterable[dict],
+        batch_size: int = 1000,
+        strategy: str = "auto",
+        session: t.Optional[Session] = None,
+    ) -> int:
+        if strategy not in BULK_UPDATE_STRATEGIES:
+            raise ValueError(
+                f"strategy must be one of {', '.join(BULK_UPDATE_STRATEGIES)}."
+            )
+
+        session = cls.get_session(session)
+
+        mapper = inspect(cls)
+        dialect_name = session.get_bind(mapper=mapper).dialect.name
+
+        if strategy == "auto":
+            strategy = "values" if dialect_name == "postgresql" else "executemany"
+
+        total = 0
+
+        for batch in chunked(rows, batch_size):
+            try:
+                if strategy == "values":
+                    for stmt in values_updates(
+                        mapper, batch, max_bind_params(dialect_name)
+                    ):
+                        session.execute(stmt)
+                else:
+                    # ORM bulk UPDATE by primary key, one executemany per key set
+                    session.execute(update(cls), batch)
+
+                if not in_unit_of_work(session):
+                    session.commit()
+
+            except Exception as e:
+                session.rollback()
+                raise e
+
+            total += len(batch)
+
+        return total
+
+    @classmethod
+    def bulk_load(
+        cls: t.Type[T],
+        rows: t.Iterable[t.Any],
+        columns: t.Optional[t.Sequence[str]] = None,
+        batch_size: int = 1000,
+        session: t.Optional[Session] = None,
+    ) -> dict:
+        return InsertBuilder(cls, session=cls._session).copy_from(
+            rows, columns, batch_size, session=session
+        )
+
+    @classmethod
+    def upsert(
+        cls: t.Type[T],
+        rows: t.Iterable[dict],
+        conflict: t.Sequence[str] = (),
+        update: t.Optional[t.Union[t.Sequence[str], dict]] = None,
+        batch_size: int = 1000,
+        return_keys: bool = False,
+        session: t.Optional[Session] = None,
+    ) -> t.Union[int, t.List[t.Any]]:
+        primary_key = inspect(cls).primary_key
+
+        builder = UpsertBuilder(cls, session=cls._session).values(rows)
+        builder.on_conflict(*conflict).batch_size(batch_size)
+
+        if isinstance(update, dict):
+            builder.update(**update)
+        elif update:
+            builder.update(*update)
+        elif update is not None:
+            builder.do_nothing()
+
+        if return_keys:
+            builder.returning(*primary_key)
+
+        result = builder.execute(session)
+
+        if not return_keys:
+            return result
+
+        return [row[0] if len(primary_key) == 1 else tuple(row) for row in result]
+
     @classmethod
     def where(cls: t.Type[T], *express) -> SelectBuilder:
         return cls._new_select().where(*express)
 
+    @classmethod
+    def with_(cls: t.Type[T], *paths: str, strict: bool = False) -> SelectBuilder:
+        return cls._new_select().with_(*paths, strict=strict)
+
     @classmethod
     def order_by(cls: t.Type[T], *express) -> SelectBuilder:
         return cls._new_select().order_by(*express)
@@ -73,15 +281,23 @@ class ActiveRecord(ScopedSessionHandler):
 
     @classmethod
     def update(cls: t.Type[T], **values) -> UpdateBuilder:
-        return UpdateBuilder(cls, session=cls._session).values(**values)
+        return (
+            UpdateBuilder(cls, session=cls._session)
+            .boot_scopes(cls._global_scopes)
+            .values(**values)
+        )
 
     @classmethod
     def destroy(cls: t.Type[T]) -> DeleteBuilder:
-        return DeleteBuilder(cls, session=cls._session)
+        return DeleteBuilder(cls, session=cls._session).boot_scopes(cls._global_scopes)
 
     @classmethod
     def _new_select(cls: t.Type[T]) -> SelectBuilder:
-        return SelectBuilder(cls, session=cls._session)
+        return (
+            SelectBuilder(cls, session=cls._session)
+            .boot_scopes(cls._global_scopes)
+            .prepared(cls._prepared_statements)
+        )
 
     @classmethod
     def execute(
@@ -93,35 +309,82 @@ class ActiveRecord(ScopedSessionHandler):
     ) -> Result:
         session = cls.get_session(session)
 
-        return session.execute(stmt, *args, **kwargs)
+        return instrument(cls, lambda: session.execute(stmt, *args, **kwargs))
+
+    @classmethod
+    def cursor_paginate(
+        cls: t.Type[T],
+        per_page: int = 30,
+        after: t.Optional[str] = None,
+        session: t.Optional[Session] = None,
+    ) -> dict:
+        return cls._new_select().cursor_paginate(per_page, after, session=session)
 
-    # @classmethod
-    # def paginate(cls, page: int = 1, per_page: int = 50, **kwargs):
-    #     return cls()._new_select().paginate(page, per_page, **kwargs)
+    @classmethod
+    def paginate(
+        cls: t.Type[T],
+        page: int = 1,
+        per_page: int = 30,
+        count: str = "exact",
+        session: t.Optional[Session] = None,
+    ) -> dict:
+        return cls._new_select().paginate(page, per_page, count, session=session)
 
     def save(self, session: t.Optional[Session] = None, refresh: bool = True):
         session = self.get_session(session)
 
         try:
             session.add(self)
-            session.commit()
+
+            # staged only, the enclosing unit of work commits once; new rows are
+            # flushed right away so their primary keys can be used in the block
+            if in_unit_of_work(session):
+                if inspect(self).pending:
+                    session.flush()
+
+                return
 
             if refresh:
-                session.refresh(self)
+                commit_loaded(session, self)
+            else:
+                session.commit()
 
         except Exception as e:
             session.rollback()
             raise e
 
-    def delete(self, session: t.Optional[Session] = None, commit: bool = True):
+    def delete(
+        self,
+        session: t.Optional[Session] = None,
+        commit: bool = True,
+        force: bool = False,
+    ):
         session = self.get_session(session)
 
         try:
-            session.delete(self)
+            soft = not force and any(
+                scope.delete(self) for scope in self._global_scopes.values()
+            )
 
-            if commit:
+            if soft:
+                session.add(self)
+            else:
+                session.delete(self)
+
+            if commit and not in_unit_of_work(session):
                 session.commit()
 
         except Exception as e:
             self._session.rollback()
             raise e
+
+    def force_delete(self, session: t.Optional[Session] = None, commit: bool = True):
+        self.delete(session, commit, force=True)
+
+
+def _pk_criteria(model: t.Type[t.Any], pk: t.Any) -> t.List[t.Any]:
+    values = pk if isinstance(pk, tuple) else (pk,)
+
+    return [
+        column == value for column, value in zip(inspect(model).primary_key, values)
+    ]
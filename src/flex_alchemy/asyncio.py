@@ -0,0 +1,260 @@
+import typing as t
+
+from contextlib import asynccontextmanager
+
+from sqlalchemy import Insert, Select, Update, Delete, inspect
+from sqlalchemy.ext.asyncio import AsyncSession, async_scoped_session
+from sqlalchemy.engine.result import Result
+
+from .activerecord import _pk_criteria
+from .loading import find_many
+from .scopes import Scope
+from .session import (
+    _UNIT_OF_WORK,
+    ScopedSessionHandler,
+    commit_loaded,
+    in_unit_of_work,
+)
+from .builders.asyncio import (
+    AsyncSelectBuilder,
+    AsyncInsertBuilder,
+    AsyncUpdateBuilder,
+    AsyncDeleteBuilder,
+)
+from .instrumentation import instrument_async
+
+T = t.TypeVar("T", bound="AsyncActiveRecord")
+
+
+class AsyncActiveRecord(ScopedSessionHandler):
+    _global_scopes: t.Dict[str, Scope] = {}
+
+    @classmethod
+    def add_global_scope(cls, scope: Scope, name: t.Optional[str] = None):
+        cls._global_scopes = {**cls._global_scopes, name or scope.name: scope}
+
+    @classmethod
+    @asynccontextmanager
+    async def transaction(
+        cls, session: t.Optional[AsyncSession] = None
+    ) -> t.AsyncIterator[AsyncSession]:
+        session = cls.get_async_session(session)
+        depth = session.info.get(_UNIT_OF_WORK, 0)
+
+        session.info[_UNIT_OF_WORK] = depth + 1
+
+        try:
+            yield session
+
+            if not depth:
+                await session.commit()
+
+        except Exception as e:
+            if not depth:
+                await session.rollback()
+
+            raise e
+
+        finally:
+            session.info[_UNIT_OF_WORK] = depth
+
+    unit_of_work = transaction
+
+    @classmethod
+    def select(cls: t.Type[T], *entities) -> AsyncSelectBuilder:
+        return cls._new_select().select(*entities)
+
+    @classmethod
+    async def first(
+        cls: t.Type[T], session: t.Optional[AsyncSession] = None
+    ) -> t.Optional[T]:
+        session = cls.get_async_session(session)
+
+        return (await cls._new_select().execute(session=session)).scalars().first()
+
+    @classmethod
+    async def find(
+        cls: t.Type[T], pk: t.Any, session: t.Optional[AsyncSession] = None
+    ) -> t.Optional[T]:
+        session = cls.get_async_session(session)
+
+        if not cls._global_scopes:
+            return await session.get(
+                cls, pk, execution_options={"prepared": cls._prepared_statements}
+            )
+
+        stmt = cls._new_select().where(*_pk_criteria(cls, pk))
+
+        return (await stmt.execute(session=session)).scalars().first()
+
+    @classmethod
+    async def find_many(
+        cls: t.Type[T],
+        pks: t.Iterable[t.Any],
+        chunk_size: t.Optional[int] = None,
+        with_missing: bool = False,
+        session: t.Optional[AsyncSession] = None,
+    ) -> t.Union[t.List[T], t.Tuple[t.List[T], t.List[t.Any]]]:
+        session = cls.get_async_session(session)
+
+        if isinstance(session, async_scoped_session):
+            session = session()
+
+        instances, missing = await session.run_sync(
+            find_many, cls, pks, chunk_size, cls._new_select()._build()
+        )
+
+        return (instances, missing) if with_missing else instances
+
+    @classmethod
+    async def all(
+        cls: t.Type[T], session: t.Optional[AsyncSession] = None
+    ) -> t.Sequence[T]:
+        session = cls.get_async_session(session)
+
+        return (await cls._new_select().execute(session=session)).scalars().all()
+
+    @classmethod
+    async def create(
+        cls: t.Type[T], attributes: dict, session: t.Optional[AsyncSession] = None
+    ) -> T:
+        session = cls.get_async_session(session)
+
+        instance = cls(**attributes)
+        await instance.save(session)
+
+        return instance
+
+    @classmethod
+    def where(cls: t.Type[T], *express) -> AsyncSelectBuilder:
+        return cls._new_select().where(*express)
+
+    @classmethod
+    def with_(cls: t.Type[T], *paths: str, strict: bool = False) -> AsyncSelectBuilder:
+        return cls._new_select().with_(*paths, strict=strict)
+
+    @classmethod
+    def order_by(cls: t.Type[T], *express) -> AsyncSelectBuilder:
+        return cls._new_select().order_by(*express)
+
+    @classmethod
+    def offset(cls: t.Type[T], offset: int = 0) -> AsyncSelectBuilder:
+        if not isinstance(offset, int):
+            raise ValueError
+
+        return cls._new_select().offset(offset)
+
+    @classmethod
+    def limit(cls: t.Type[T], limit: int = 0) -> AsyncSelectBuilder:
+        if not isinstance(limit, int):
+            raise ValueError
+
+        return cls._new_select().limit(limit)
+
+    @classmethod
+    def insert(cls: t.Type[T], values) -> AsyncInsertBuilder:
+        return AsyncInsertBuilder(cls, session=cls._async_session).values(values)
+
+    @classmethod
+    async def bulk_load(
+        cls: t.Type[T],
+        rows: t.Iterable[t.Any],
+        columns: t.Optional[t.Sequence[str]] = None,
+        batch_size: int = 1000,
+        session: t.Optional[AsyncSession] = None,
+    ) -> dict:
+        return await AsyncInsertBuilder(cls, session=cls._async_session).copy_from(
+            rows, columns, batch_size, session=session
+        )
+
+    @classmethod
+    def update(cls: t.Type[T], **values) -> AsyncUpdateBuilder:
+        return (
+            AsyncUpdateBuilder(cls, session=cls._async_session)
+            .boot_scopes(cls._global_scopes)
+            .values(**values)
+        )
+
+    @classmethod
+    def destroy(cls: t.Type[T]) -> AsyncDeleteBuilder:
+        return AsyncDeleteBuilder(cls, session=cls._async_session).boot_scopes(
+            cls._global_scopes
+        )
+
+    @classmethod
+    def _new_select(cls: t.Type[T]) -> AsyncSelectBuilder:
+        return (
+            AsyncSelectBuilder(cls, session=cls._async_session)
+            .boot_scopes(cls._global_scopes)
+            .prepared(cls._prepared_statements)
+        )
+
+    @classmethod
+    async def execute(
+        cls: t.Type[T],
+        stmt: t.Union[Select, Insert, Update, Delete],
+        session: t.Optional[AsyncSession] = None,
+        *args,
+        **kwargs,
+    ) -> Result:
+        session = cls.get_async_session(session)
+
+        return await instrument_async(
+            cls, lambda: session.execute(stmt, *args, **kwargs)
+        )
+
+    async def save(
+        self, session: t.Optional[AsyncSession] = None, refresh: bool = True
+    ):
+        session = self.get_async_session(session)
+
+        try:
+            session.add(self)
+
+            if in_unit_of_work(session):
+                if inspect(self).pending:
+                    await session.flush()
+
+                return
+
+            if refresh:
+                if isinstance(session, async_scoped_session):
+                    session = session()
+
+                await session.run_sync(commit_loaded, self)
+            else:
+                await session.commit()
+
+        except Exception as e:
+            await session.rollback()
+            raise e
+
+    async def delete(
+        self,
+        session: t.Optional[AsyncSession] = None,
+        commit: bool = True,
+        force: bool = False,
+    ):
+        session = self.get_async_session(session)
+
+        try:
+            soft = not force and any(
+                scope.delete(self) for scope in self._global_scopes.values()
+            )
+
+            if soft:
+                session.add(self)
+            else:
+                await session.delete(self)
+
+            if commit and not in_unit_of_work(session):
+                await session.commit()
+
+        except Exception as e:
+            await session.rollback()
+            raise e
+
+    async def force_delete(
+        self, session: t.Optional[AsyncSession] = None, commit: bool = True
+    ):
+        await self.delete(session, commit, force=True)
@@ -0,0 +1,247 @@
+import asyncio
+import typing as t
+
+from sqlalchemy.engine.result import Result
+from sqlalchemy.ext.asyncio import AsyncSession, async_scoped_session
+
+from .base import BaseChunkedBuilder
+from .select import SelectBuilder
+from .insert import InsertBuilder
+from .update import UpdateBuilder
+from .delete import DeleteBuilder
+from ..session import in_unit_of_work
+from ..instrumentation import instrument_async
+
+
+class RunSyncMixin:
+    async def _run_sync(self, fn: t.Callable, session, *args, **kwargs):
+        session = self.get_session(session)
+
+        if isinstance(session, async_scoped_session):
+            session = session()
+
+        # reuse the sync implementation on the session's greenlet-adapted Session
+        return await session.run_sync(
+            lambda sync_session: fn(self, *args, session=sync_session, **kwargs)
+        )
+
+
+class AsyncSelectBuilder(RunSyncMixin, SelectBuilder):
+    _handler_session = "_async_session"
+
+    async def execute(
+        self, session: t.Optional[AsyncSession] = None, *args, **kwargs
+    ) -> Result:
+        session = self.get_session(session)
+
+        stmt, args, kwargs = self._statement(args, kwargs)
+
+        if self._cache is not None:
+            return await self._run_sync(
+                SelectBuilder._execute_cached, session, stmt, args, kwargs
+            )
+
+        return await instrument_async(
+            self, lambda: session.execute(stmt, *args, **kwargs)
+        )
+
+    async def chunk(
+        self,
+        batch_size: int = 1000,
+        session: t.Optional[AsyncSession] = None,
+        expunge: bool = True,
+    ) -> t.AsyncIterator[t.List[t.Any]]:
+        session = self.get_session(session)
+
+        stmt, args, kwargs = self._statement(
+            (), {"execution_options": {"yield_per": batch_size}}
+        )
+
+        result = await session.stream(stmt, *args, **kwargs)
+
+        if not self._entities:
+            result = result.scalars()
+        else:
+            expunge = False
+
+        try:
+            async for partition in result.partitions():
+                yield partition
+
+                if expunge:
+                    for instance in partition:
+                        if instance in session:
+                            session.expunge(instance)
+        finally:
+            await result.close()
+
+    async def stream(
+        self,
+        batch_size: int = 1000,
+        session: t.Optional[AsyncSession] = None,
+        expunge: bool = True,
+    ) -> t.AsyncIterator[t.Any]:
+        async for partition in self.chunk(batch_size, session, expunge):
+            for item in partition:
+                yield item
+
+    async def count(self, session: t.Optional[AsyncSession] = None) -> int:
+        return await self._run_sync(SelectBuilder.count, session)
+
+    async def as_rows(self, session: t.Optional[AsyncSession] = None) -> t.List[tuple]:
+        return await self._run_sync(SelectBuilder.as_rows, session)
+
+    async def as_dicts(self, session: t.Optional[AsyncSession] = None) -> t.List[dict]:
+        return await self._run_sync(SelectBuilder.as_dicts, session)
+
+    async def as_dataclasses(
+        self, session: t.Optional[AsyncSession] = None
+    ) -> t.List[t.Any]:
+        return await self._run_sync(SelectBuilder.as_dataclasses, session)
+
+    async def to_columns(
+        self, *args, session: t.Optional[AsyncSession] = None, **kwargs
+    ):
+        return await self._run_sync(SelectBuilder.to_columns, session, *args, **kwargs)
+
+    async def to_numpy(self, *args, session: t.Optional[AsyncSession] = None, **kwargs):
+        return await self._run_sync(SelectBuilder.to_numpy, session, *args, **kwargs)
+
+    async def paginate(self, *args, session: t.Optional[AsyncSession] = None, **kwargs):
+        return await self._run_sync(SelectBuilder.paginate, session, *args, **kwargs)
+
+    async def cursor_paginate(
+        self, *args, session: t.Optional[AsyncSession] = None, **kwargs
+    ):
+        return await self._run_sync(
+            SelectBuilder.cursor_paginate, session, *args, **kwargs
+        )
+
+
+class AsyncInsertBuilder(RunSyncMixin, InsertBuilder):
+    _handler_session = "_async_session"
+
+    async def execute(
+        self,
+        session: t.Optional[AsyncSession] = None,
+        commit: bool = True,
+        *args,
+        **kwargs,
+    ) -> Result[t.Any]:
+        session = self.get_session(session)
+
+        stmt = self._build()
+
+        if self._rows is not None:
+            args = (self._rows, *args)
+
+        result = await instrument_async(
+            self, lambda: session.execute(stmt, *args, **kwargs)
+        )
+
+        if commit and not in_unit_of_work(session):
+            await session.commit()
+
+        return result
+
+    async def copy_from(
+        self, *args, session: t.Optional[AsyncSession] = None, **kwargs
+    ) -> dict:
+        return await self._run_sync(InsertBuilder.copy_from, session, *args, **kwargs)
+
+
+class AsyncChunkedBuilder(BaseChunkedBuilder):
+    async def execute_chunked(
+        self,
+        chunk_size: int = 1000,
+        sleep: float = 0,
+        session: t.Optional[AsyncSession] = None,
+        progress: t.Optional[t.Callable[[int, int], None]] = None,
+    ) -> int:
+        session = self.get_session(session)
+
+        last = None
+        chunks = 0
+        total = 0
+
+        while True:
+            stmt = self._chunk_keys(last, chunk_size)
+            pks = (await instrument_async(self, lambda: session.execute(stmt))).all()
+
+            if not pks:
+                break
+
+            try:
+                result = await instrument_async(
+                    self, lambda: session.execute(self._chunk_statement(pks))
+                )
+
+                if not in_unit_of_work(session):
+                    await session.commit()
+
+            except Exception as e:
+                await session.rollback()
+                raise e
+
+            last = tuple(pks[-1])
+            chunks += 1
+            total += result.rowcount
+
+            if progress is not None:
+                progress(chunks, total)
+
+            if len(pks) < chunk_size:
+                break
+
+            if sleep:
+                await asyncio.sleep(sleep)
+
+        return total
+
+
+class AsyncUpdateBuilder(AsyncChunkedBuilder, UpdateBuilder):
+    _handler_session = "_async_session"
+
+    async def execute(
+        self,
+        session: t.Optional[AsyncSession] = None,
+        commit: bool = True,
+        *args,
+        **kwargs,
+    ) -> Result[t.Any]:
+        session = self.get_session(session)
+
+        stmt = self._build()
+
+        result = await instrument_async(
+            self, lambda: session.execute(stmt, *args, **kwargs)
+        )
+
+        if commit and not in_unit_of_work(session):
+            await session.commit()
+
+        return result
+
+
+class AsyncDeleteBuilder(AsyncChunkedBuilder, DeleteBuilder):
+    _handler_session = "_async_session"
+
+    async def execute(
+        self,
+        session: t.Optional[AsyncSession] = None,
+        commit: bool = True,
+        *args,
+        **kwargs,
+    ) -> Result[t.Any]:
+        session = self.get_session(session)
+
+        stmt = self._build()
+
+        result = await instrument_async(
+            self, lambda: session.execute(stmt, *args, **kwargs)
+        )
+
+        if commit and not in_unit_of_work(session):
+            await session.commit()
+
+        return result
@@ -1,14 +1,31 @@
+import copy
+import functools
+import time
 import typing as t
 
+from sqlalchemy import Select, inspect, select, tuple_
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
 from sqlalchemy.sql.elements import BinaryExpression
 
 from ..exceptions import SessionNotProvidedError
+from ..explain import SlowQueryLog
+from ..pagination import keyset_predicate
+from ..session import in_unit_of_work
+from ..instrumentation import instrument, listen
 
 _M = t.TypeVar("_M")
 
 
 class BaseBuilder(t.Generic[_M]):
+    slow_query_log = SlowQueryLog()
+
+    _slow_query_log: t.Optional[SlowQueryLog] = None
+    _frozen: bool = False
+
+    # attribute of the model holding the scoped session to fall back on
+    _handler_session: str = "_session"
+
     def __init__(self, model: _M, session: t.Optional[Session] = None):
         self._model: _M = model
         self._session: Session = session
@@ -19,6 +36,10 @@ class BaseBuilder(t.Generic[_M]):
     def get_session(self, session: t.Optional[Session] = None) -> Session:
         session = session or self._session
 
+        # frozen builders are often made at import time, before `make_session`
+        if not session and self._frozen:
+            session = getattr(self._model, self._handler_session, None)
+
         if not session:
             raise SessionNotProvidedError
 
@@ -27,8 +48,31 @@ class BaseBuilder(t.Generic[_M]):
     def execute(self):
         raise NotImplementedError
 
+    def freeze(self):
+        self._frozen = True
+
+        return self
+
+    def _mutable(self):
+        # frozen builders are never changed, chained calls work on a copy that
+        # shares the clause tuples with its parent
+        return copy.copy(self) if self._frozen else self
+
+    def __copy__(self):
+        clone = object.__new__(type(self))
+        clone.__dict__.update(self.__dict__)
+
+        for name, value in self.__dict__.items():
+            if isinstance(value, dict):
+                clone.__dict__[name] = dict(value)
+
+        # the statement built for the parent does not match a changed copy
+        clone.__dict__.pop("_statement", None)
+
+        return clone
+
     def boot_scopes(self, scopes: dict = {}):
-        self._scopes = scopes
+        self._scopes = dict(scopes)
         self._on_delete: t.Optional[t.Callable] = None
 
         for _, scope in self._scopes.items():
@@ -36,17 +80,141 @@ class BaseBuilder(t.Generic[_M]):
 
         return self
 
+    def explain_slow(self, log: t.Optional[SlowQueryLog] = None):
+        builder = self._mutable()
+
+        listen()
+
+        builder._slow_query_log = log or builder.slow_query_log
+
+        return builder
+
     def macro(self, name: str, callable_: t.Callable):
+        builder = self._mutable()
+
         if callable(callable_):
-            self._macros[name] = callable_
+            builder._macros[name] = callable_
 
-        return self
+        return builder
+
+    def __getattr__(self, name: str):
+        macros = self.__dict__.get("_macros", {})
+
+        if name not in macros:
+            raise AttributeError(
+                f"{type(self).__name__!r} object has no attribute {name!r}"
+            )
+
+        return functools.partial(macros[name], self)
 
 
 class BaseWhereBuilder(BaseBuilder):
-    _where_clauses = ()
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self._where_clauses: tuple = ()
 
     def where(self, *express: BinaryExpression):
-        self._where_clauses += (*express,)
+        builder = self._mutable()
+        builder._where_clauses += (*express,)
+
+        return builder
+
+    def boot_scopes(self, scopes: dict = {}):
+        super().boot_scopes(scopes)
+
+        self._scope_clauses: t.Dict[str, tuple] = {}
+
+        # criteria of each scope are tracked so they can be lifted again
+        for name, scope in self._scopes.items():
+            applied = len(self._where_clauses)
+            scope.apply(self)
+
+            self._scope_clauses[name] = self._where_clauses[applied:]
 
         return self
+
+    def without_scope(self, *names: str):
+        builder = self._mutable()
+
+        for name in names or tuple(builder._scopes):
+            clauses = builder.__dict__.get("_scope_clauses", {}).pop(name, ())
+
+            builder._where_clauses = tuple(
+                clause
+                for clause in builder._where_clauses
+                if not any(clause is scoped for scoped in clauses)
+            )
+
+        return builder
+
+
+class BaseChunkedBuilder(BaseWhereBuilder):
+    def execute_chunked(
+        self,
+        chunk_size: int = 1000,
+        sleep: float = 0,
+        session: t.Optional[Session] = None,
+        progress: t.Optional[t.Callable[[int, int], None]] = None,
+    ) -> int:
+        session = self.get_session(session)
+
+        last = None
+        chunks = 0
+        total = 0
+
+        while True:
+            stmt = self._chunk_keys(last, chunk_size)
+            pks = instrument(self, lambda: session.execute(stmt)).all()
+
+            if not pks:
+                break
+
+            try:
+                result = instrument(
+                    self, lambda: session.execute(self._chunk_statement(pks))
+                )
+
+                if not in_unit_of_work(session):
+                    session.commit()
+
+            except Exception as e:
+                session.rollback()
+                raise e
+
+            last = tuple(pks[-1])
+            chunks += 1
+            total += result.rowcount
+
+            if progress is not None:
+                progress(chunks, total)
+
+            if len(pks) < chunk_size:
+                break
+
+            if sleep:
+                time.sleep(sleep)
+
+        return total
+
+    def _chunk_keys(self, last: t.Optional[tuple], chunk_size: int) -> Select:
+        primary_key = inspect(self._model).primary_key
+        stmt = select(*primary_key).where(*self._where_clauses)
+
+        # walk the primary key forward, rows still matching after an update
+        # are never picked twice
+        if last is not None:
+            keys = [(column, False) for column in primary_key]
+            stmt = stmt.where(keyset_predicate(keys, last))
+
+        return stmt.order_by(*primary_key).limit(chunk_size)
+
+    def _chunk_statement(self, pks: t.Sequence[Row]):
+        primary_key = inspect(self._model).primary_key
+
+        if len(primary_key) == 1:
+            in_chunk = primary_key[0].in_([row[0] for row in pks])
+        else:
+            in_chunk = tuple_(*primary_key).in_([tuple(row) for row in pks])
+
+        return self._build().where(in_chunk)
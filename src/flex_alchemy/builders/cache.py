@@ -0,0 +1,233 @@
+import hashlib
+import pickle
+import threading
+import time
+import typing as t
+import uuid
+import weakref
+
+from collections import OrderedDict
+from itertools import chain
+
+from sqlalchemy import event, inspect
+from sqlalchemy.engine import FrozenResult
+from sqlalchemy.orm import Mapper, ORMExecuteState, Session
+from sqlalchemy.sql import TableClause
+from sqlalchemy.sql.util import find_tables
+
+_DIRTY_TABLES = "flex_alchemy_dirty_tables"
+
+
+class LRUCache:
+    def __init__(self, maxsize: int = 512, ttl: t.Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: t.Hashable, default: t.Any = None) -> t.Optional[t.Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if (
+                entry is not None
+                and entry[0] is not None
+                and entry[0] <= time.monotonic()
+            ):
+                del self._entries[key]
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+            return entry[1]
+
+    def set(self, key: t.Hashable, value: t.Any, ttl: t.Optional[float] = None):
+        ttl = ttl if ttl is not None else self.ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __getitem__(self, key: t.Hashable) -> t.Any:
+        value = self.get(key, _MISSING)
+
+        if value is _MISSING:
+            raise KeyError(key)
+
+        return value
+
+    def __setitem__(self, key: t.Hashable, value: t.Any):
+        self.set(key, value)
+
+    def __delitem__(self, key: t.Hashable):
+        with self._lock:
+            del self._entries[key]
+
+    def __contains__(self, key: t.Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+
+class QueryCache:
+    prefix = "flex_alchemy"
+
+    def __init__(self, store: t.Optional[t.MutableMapping] = None, ttl: float = 60):
+        self.store = store if store is not None else LRUCache(maxsize=1024)
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+        # a process that only writes must still bump versions in a shared store
+        _listen(self)
+
+    def key_for(self, key: str, tables: t.Iterable[str]) -> str:
+        versions = ",".join(
+            f"{table}={self._version(table)}" for table in sorted(set(tables))
+        )
+        digest = hashlib.sha1(versions.encode()).hexdigest()
+
+        # resolved before the query runs, so a concurrent write orphans the entry
+        return f"{self.prefix}:query:{key}:{digest}"
+
+    def get(self, entry_key: str) -> t.Optional[FrozenResult]:
+        entry = self.store.get(entry_key)
+
+        if entry is not None and entry[0] <= time.time():
+            entry = None
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+
+        return pickle.loads(entry[1])
+
+    def set(self, entry_key: str, frozen: FrozenResult, ttl: t.Optional[float] = None):
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+
+        # pickled results are detached from the session that produced them
+        self.store[entry_key] = (expires_at, pickle.dumps(frozen))
+
+    def invalidate(self, *tables: str):
+        for table in tables:
+            self.store[self._version_key(table)] = uuid.uuid4().hex
+
+    def info(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses}
+
+    def _version(self, table: str) -> str:
+        key = self._version_key(table)
+        version = self.store.get(key)
+
+        # an evicted version must never fall back to a value seen before
+        if version is None:
+            version = uuid.uuid4().hex
+            self.store[key] = version
+
+        return version
+
+    def _version_key(self, table: str) -> str:
+        return f"{self.prefix}:table:{table}"
+
+
+_MISSING = object()
+_query_caches: "weakref.WeakSet[QueryCache]" = weakref.WeakSet()
+_listening = False
+
+
+def _listen(cache: QueryCache):
+    global _listening
+
+    # invalidation hooks are only paid for once a query cache exists
+    if not _listening:
+        event.listen(Session, "after_flush", _after_flush)
+        event.listen(Session, "do_orm_execute", _do_orm_execute)
+        event.listen(Session, "after_commit", _after_commit)
+        event.listen(Session, "after_rollback", _after_rollback)
+
+        _listening = True
+
+    _query_caches.add(cache)
+
+
+def mark_dirty(session: Session, mappers: t.Iterable[Mapper]):
+    tables = session.info.setdefault(_DIRTY_TABLES, set())
+
+    for mapper in mappers:
+        tables.update(table.name for table in mapper.tables)
+        tables.update(
+            rel.secondary.name
+            for rel in mapper.relationships
+            if rel.secondary is not None
+        )
+
+
+def _after_flush(session: Session, flush_context):
+    objects = chain(session.new, session.dirty, session.deleted)
+
+    mark_dirty(session, {inspect(obj).mapper for obj in objects})
+
+
+def _do_orm_execute(state: ORMExecuteState):
+    if state.is_insert or state.is_update or state.is_delete:
+        mark_dirty(state.session, state.all_mappers)
+
+
+def _after_commit(session: Session):
+    tables = session.info.pop(_DIRTY_TABLES, None)
+
+    if tables:
+        for cache in list(_query_caches):
+            cache.invalidate(*tables)
+
+
+def _after_rollback(session: Session):
+    session.info.pop(_DIRTY_TABLES, None)
+
+
+def dependent_tables(stmt: t.Any) -> t.Set[str]:
+    tables = set()
+
+    for table in find_tables(stmt, check_columns=True, include_aliases=True):
+        while not isinstance(table, TableClause) and hasattr(table, "element"):
+            table = table.element
+
+        if isinstance(table, TableClause):
+            tables.add(table.name)
+
+    return tables
+
+
+def query_cache_key(sql: str, params: t.Mapping) -> str:
+    raw = f"{sql}:{sorted(params.items())!r}"
+
+    return hashlib.sha1(raw.encode()).hexdigest()
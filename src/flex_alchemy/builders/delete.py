@@ -1,18 +1,24 @@
 import typing as t
 
-from sqlalchemy import delete, Delete
+from sqlalchemy import delete, Delete, Update
 from sqlalchemy.orm import Session
 from sqlalchemy.engine.result import Result
 
 
-from .base import BaseWhereBuilder
+from .base import BaseChunkedBuilder
+from ..session import in_unit_of_work
+from ..instrumentation import instrument
 
 
-class DeleteBuilder(BaseWhereBuilder):
+class DeleteBuilder(BaseChunkedBuilder):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
-    def _build(self) -> Delete:
+    def _build(self) -> t.Union[Delete, Update]:
+        # a soft delete scope turns the statement into an UPDATE
+        if "_delete_stmt" in self._macros:
+            return self._macros["_delete_stmt"](self)
+
         stmt = delete(self._model)
 
         if self._where_clauses:
@@ -27,9 +33,9 @@ class DeleteBuilder(BaseWhereBuilder):
 
         stmt = self._build()
 
-        result = session.execute(stmt, *args, **kwargs)
+        result = instrument(self, lambda: session.execute(stmt, *args, **kwargs))
 
-        if commit:
+        if commit and not in_unit_of_work(session):
             session.commit()
 
         return result
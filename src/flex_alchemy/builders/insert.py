@@ -1,10 +1,14 @@
 import typing as t
 
-from sqlalchemy import Insert, insert
-from sqlalchemy.orm import Session
+from sqlalchemy import Insert, insert, inspect
+from sqlalchemy.orm import Session, scoped_session
 from sqlalchemy.engine.result import Result
 
 from .base import BaseBuilder
+from .cache import mark_dirty
+from ..bulk import column_defaults, copy_rows, row_values
+from ..session import in_unit_of_work
+from ..instrumentation import instrument
 
 
 class InsertBuilder(BaseBuilder):
@@ -12,33 +16,51 @@ class InsertBuilder(BaseBuilder):
         super().__init__(*args, **kwargs)
 
         self._values = None
+        self._rows: t.Optional[t.List[dict]] = None
         self._execution_options: dict = {}
         self._returning: dict = {"cols": (), "params": {}}
 
     def values(self, *args, **kwargs):
+        builder = self._mutable()
+
         if args:
-            self._values = args[0]
+            builder._values = args[0]
         else:
-            self._values = kwargs
+            builder._values = kwargs
+
+        return builder
+
+    def many(self, rows: t.Iterable[dict]):
+        builder = self._mutable()
+        builder._rows = list(rows)
 
-        return self
+        return builder
 
     def execution_options(self, **options):
-        self._execution_options.update(options)
+        builder = self._mutable()
+        builder._execution_options.update(options)
 
-        return self
+        return builder
 
     def returning(self, *cols, **kwargs):
-        self._returning["cols"] += (*cols,)
-        self._returning["params"].update(kwargs)
+        builder = self._mutable()
+        builder._returning = {
+            "cols": builder._returning["cols"] + (*cols,),
+            "params": {**builder._returning["params"], **kwargs},
+        }
 
-        return self
+        return builder
 
     def _build(self) -> Insert:
-        if not self._values:
-            raise ValueError("values cannot be empty.")
+        if self._rows is not None:
+            if not self._rows:
+                raise ValueError("rows cannot be empty.")
 
-        stmt = insert(self._model).values(self._values)
+            stmt = insert(self._model)
+        elif not self._values:
+            raise ValueError("values cannot be empty.")
+        else:
+            stmt = insert(self._model).values(self._values)
 
         if self._returning:
             stmt = stmt.returning(
@@ -58,9 +80,61 @@ class InsertBuilder(BaseBuilder):
 
         stmt = self._build()
 
-        result = session.execute(stmt, *args, **kwargs)
+        if self._rows is not None:
+            args = (self._rows, *args)
 
-        if commit:
+        result = instrument(self, lambda: session.execute(stmt, *args, **kwargs))
+
+        if commit and not in_unit_of_work(session):
             session.commit()
 
         return result
+
+    def copy_from(
+        self,
+        rows: t.Iterable[t.Any],
+        columns: t.Optional[t.Sequence[str]] = None,
+        batch_size: int = 1000,
+        session: t.Optional[Session] = None,
+        commit: bool = True,
+    ) -> dict:
+        session = self.get_session(session)
+
+        mapper = inspect(self._model)
+        keys, values = row_values(rows, columns)
+
+        if not keys:
+            raise ValueError("rows cannot be empty.")
+
+        # routed like any other write, so a replica aware session stays on primary
+        connection = session.connection(
+            bind_arguments={"mapper": mapper, "clause": insert(self._model)}
+        )
+
+        try:
+            defaults = column_defaults(connection, mapper.columns, keys)
+
+            if defaults:
+                fill = tuple(defaults.values())
+                keys = [*keys, *defaults]
+                values = (
+                    tuple(row) + tuple(default() for default in fill) for row in values
+                )
+
+            stats = copy_rows(
+                connection, [mapper.columns[key] for key in keys], values, batch_size
+            )
+
+            # rows bypass the ORM, flag the table for query cache invalidation
+            mark_dirty(
+                session() if isinstance(session, scoped_session) else session, [mapper]
+            )
+
+            if commit and not in_unit_of_work(session):
+                session.commit()
+
+        except Exception as e:
+            session.rollback()
+            raise e
+
+        return stats
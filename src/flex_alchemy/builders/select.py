@@ -1,16 +1,58 @@
-from typing import Optional
-
-from sqlalchemy import Executable
-from sqlalchemy.orm import Session
+import copy
+import dataclasses
+import functools
+import math
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from sqlalchemy import Executable, Integer, bindparam, func, inspect, select
+from sqlalchemy.orm import Session, scoped_session
 from sqlalchemy.sql.elements import BinaryExpression, UnaryExpression
 from sqlalchemy.engine.result import Result
+from sqlalchemy.orm.loading import merge_frozen_result
 from sqlalchemy.orm.strategy_options import Load
 from sqlalchemy.sql import Select
+from sqlalchemy.sql.visitors import replacement_traverse
 
 from .base import BaseWhereBuilder
+from ..columnar import fill_arrays, numpy_dtype, require_numpy
+from ..loading import eager_options
+from .cache import (
+    _DIRTY_TABLES,
+    LRUCache,
+    QueryCache,
+    dependent_tables,
+    query_cache_key,
+)
+from ..pagination import (
+    decode_cursor,
+    encode_cursor,
+    estimate_count,
+    keyset_columns,
+    keyset_order,
+    keyset_predicate,
+)
+from ..instrumentation import instrument
+from ..prepared import listen_prepared
+
+_CLAUSE_ATTRS = (
+    "_entities",
+    "_where_clauses",
+    "_group_by",
+    "_having",
+    "_order_by",
+    "_options",
+)
+
+COUNT_MODES = ("exact", "estimate", "cached", "none")
 
 
 class SelectBuilder(BaseWhereBuilder):
+    statement_cache = LRUCache()
+    count_cache = LRUCache(maxsize=1024, ttl=60)
+    sql_cache = LRUCache(maxsize=1024)
+    # created by the first cache() call, its invalidation listeners with it
+    query_cache: Optional[QueryCache] = None
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -21,43 +63,191 @@ class SelectBuilder(BaseWhereBuilder):
         self._having: tuple = ()
         self._order_by: tuple = ()
         self._options: tuple = ()
+        self._cached: bool = False
+        self._cache: Optional[dict] = None
+        self._prepared: bool = False
 
     def select(self, *entities):
-        self._entities += (*entities,)
+        builder = self._mutable()
+        builder._entities += (*entities,)
 
-        return self
+        return builder
 
     def offset(self, offset: int):
-        self._offset = offset
+        builder = self._mutable()
+        builder._offset = offset
 
-        return self
+        return builder
 
     def limit(self, limit: int):
-        self._limit = limit
+        builder = self._mutable()
+        builder._limit = limit
 
-        return self
+        return builder
 
     def group_by(self, *entities):
-        self._group_by += (*entities,)
+        builder = self._mutable()
+        builder._group_by += (*entities,)
 
-        return self
+        return builder
 
     def having(self, *express: BinaryExpression):
-        self._having += (*express,)
+        builder = self._mutable()
+        builder._having += (*express,)
 
-        return self
+        return builder
 
     def order_by(self, *express: UnaryExpression):
-        self._order_by += (*express,)
+        builder = self._mutable()
+        builder._order_by += (*express,)
 
-        return self
+        return builder
 
     def options(self, *options: Load):
-        self._options += (*options,)
+        builder = self._mutable()
+        builder._options += (*options,)
+
+        return builder
+
+    def with_(self, *paths: str, strict: bool = False):
+        builder = self._mutable()
+        builder._options += (*eager_options(builder._model, paths, strict),)
+
+        return builder
+
+    def cached(self, enable: bool = True):
+        builder = self._mutable()
+        builder._cached = enable
+
+        return builder
+
+    def cache(
+        self,
+        ttl: Optional[float] = None,
+        key: Optional[str] = None,
+        tables: Iterable[str] = (),
+    ):
+        builder = self._mutable()
+        builder._cache = {"ttl": ttl, "key": key, "tables": tuple(tables)}
+
+        if SelectBuilder.query_cache is None:
+            SelectBuilder.query_cache = QueryCache()
+
+        return builder
+
+    def prepared(self, enable: bool = True):
+        builder = self._mutable()
+
+        if enable:
+            listen_prepared()
+
+        builder._prepared = enable
+
+        return builder
 
-        return self
+    def _shape(self) -> Optional[tuple]:
+        key = [self._model, self._offset is not None, self._limit is not None]
+        binds = []
+
+        for name in _CLAUSE_ATTRS:
+            shape = ()
+
+            for clause in getattr(self, name):
+                if not hasattr(clause, "_generate_cache_key"):
+                    shape += (clause,)
+                    continue
+
+                cache_key = clause._generate_cache_key()
+
+                # uncacheable elements, or loader options carrying literal values
+                if cache_key is None or (name == "_options" and cache_key.bindparams):
+                    return None
+
+                shape += (cache_key.key,)
+                binds.extend(cache_key.bindparams)
+
+            key.append(shape)
+
+        return tuple(key), binds
+
+    def _build_cached(self) -> tuple[Select, dict]:
+        shape = self._shape()
+
+        if shape is None:
+            return self._build(), {}
+
+        key, binds = shape
+        params = {}
+
+        for idx, bind in enumerate(binds):
+            name = f"fa_{idx}" if bind.unique else bind.key
+
+            if not bind.required:
+                params[name] = bind.effective_value
+
+        if self._offset is not None:
+            params["fa_offset"] = self._offset
+
+        if self._limit is not None:
+            params["fa_limit"] = self._limit
+
+        stmt = self.statement_cache.get(key)
+
+        if stmt is None:
+            stmt = self._build_template(binds)
+            self.statement_cache.set(key, stmt)
+
+        return stmt, params
+
+    def _build_template(self, binds: list) -> Select:
+        replacements = {
+            id(bind): bindparam(f"fa_{idx}", type_=bind.type, expanding=bind.expanding)
+            for idx, bind in enumerate(binds)
+            if bind.unique
+        }
+
+        def replace(element):
+            return replacements.get(id(element))
+
+        template = copy.copy(self)
+
+        for name in _CLAUSE_ATTRS[:-1]:
+            setattr(
+                template,
+                name,
+                tuple(
+                    (
+                        replacement_traverse(clause, {}, replace)
+                        if hasattr(clause, "_generate_cache_key")
+                        else clause
+                    )
+                    for clause in getattr(self, name)
+                ),
+            )
+
+        if self._offset is not None:
+            template._offset = bindparam("fa_offset", type_=Integer)
+
+        if self._limit is not None:
+            template._limit = bindparam("fa_limit", type_=Integer)
+
+        return template._build()
 
     def _build(self) -> Select:
+        # a frozen builder never changes, its statement is built once and shared
+        stmt = self.__dict__.get("_statement")
+
+        if stmt is not None:
+            return stmt
+
+        stmt = self._build_statement()
+
+        if self._frozen:
+            self._statement = stmt
+
+        return stmt
+
+    def _build_statement(self) -> Select:
         if self._entities:
             stmt = Select(*self._entities)
         else:
@@ -84,6 +274,9 @@ class SelectBuilder(BaseWhereBuilder):
         if self._options:
             stmt = stmt.options(*self._options)
 
+        if self._prepared:
+            stmt = stmt.execution_options(prepared=True)
+
         return stmt
 
     def execute(
@@ -91,27 +284,374 @@ class SelectBuilder(BaseWhereBuilder):
     ) -> Result:
         session = self.get_session(session)
 
-        stmt = self._build()
+        stmt, args, kwargs = self._statement(args, kwargs)
+
+        if self._cache is not None:
+            return self._execute_cached(stmt, args, kwargs, session=session)
+
+        options = kwargs.get("execution_options") or {}
+
+        # server side cursors only know the rows fetched so far
+        return instrument(
+            self,
+            lambda: session.execute(stmt, *args, **kwargs),
+            count_rows=not (options.get("stream_results") or options.get("yield_per")),
+        )
+
+    def _execute_cached(
+        self, stmt: Select, args: tuple, kwargs: dict, session: Session
+    ) -> Result:
+        if isinstance(session, scoped_session):
+            session = session()
+
+        tables = dependent_tables(stmt) | set(self._cache["tables"])
+
+        # uncommitted writes of this session must see the database, not the cache
+        if tables & session.info.get(_DIRTY_TABLES, set()):
+            return instrument(self, lambda: session.execute(stmt, *args, **kwargs))
+
+        key = self._cache["key"] or self._query_key(stmt, args, kwargs, session)
+        entry_key = self.query_cache.key_for(key, tables)
+        frozen = self.query_cache.get(entry_key)
+
+        if frozen is None:
+            frozen = instrument(
+                self, lambda: session.execute(stmt, *args, **kwargs)
+            ).freeze()
+            self.query_cache.set(entry_key, frozen, self._cache["ttl"])
+
+        return merge_frozen_result(session, stmt, frozen, load=False)()
+
+    def _query_key(
+        self, stmt: Select, args: tuple, kwargs: dict, session: Session
+    ) -> str:
+        dialect = session.get_bind(clause=stmt).dialect
+        params = {**(args[0] if args else {}), **(kwargs.get("params") or {})}
+        cache_key = stmt._generate_cache_key()
+
+        if cache_key is None:
+            compiled = stmt.compile(dialect=dialect)
+
+            return query_cache_key(str(compiled), {**compiled.params, **params})
+
+        # compiled once per statement shape, later calls only walk the cache key
+        shape = (dialect.name, cache_key.key)
+        sql = self.sql_cache.get(shape)
+
+        if sql is None:
+            sql = str(stmt.compile(dialect=dialect))
+            self.sql_cache.set(shape, sql)
+
+        values = {
+            f"_{index}": _hashable(bind.effective_value)
+            for index, bind in enumerate(cache_key.bindparams)
+        }
+
+        return query_cache_key(sql, {**values, **params})
+
+    def _statement(self, args: tuple, kwargs: dict) -> tuple[Select, tuple, dict]:
+        if not self._cached:
+            return self._build(), args, kwargs
+
+        stmt, params = self._build_cached()
+
+        if args:
+            params, args = {**params, **args[0]}, args[1:]
+
+        params.update(kwargs.pop("params", None) or {})
+
+        return stmt, (params, *args), kwargs
+
+    def chunk(
+        self,
+        batch_size: int = 1000,
+        session: Optional[Session] = None,
+        expunge: bool = True,
+    ) -> Iterator[List[Any]]:
+        session = self.get_session(session)
+
+        result = self.execute(
+            session,
+            execution_options={"stream_results": True, "yield_per": batch_size},
+        )
+
+        # select without entities yields model instances, otherwise plain rows
+        if not self._entities:
+            result = result.scalars()
+        else:
+            expunge = False
+
+        try:
+            for partition in result.partitions():
+                yield partition
+
+                if expunge:
+                    for instance in partition:
+                        if instance in session:
+                            session.expunge(instance)
+        finally:
+            result.close()
+
+    def stream(
+        self,
+        batch_size: int = 1000,
+        session: Optional[Session] = None,
+        expunge: bool = True,
+    ) -> Iterator[Any]:
+        for partition in self.chunk(batch_size, session=session, expunge=expunge):
+            yield from partition
+
+    def cursor_paginate(
+        self,
+        per_page: int = 30,
+        after: Optional[str] = None,
+        session: Optional[Session] = None,
+    ) -> dict:
+        if per_page < 1:
+            raise ValueError("per_page must be positive.")
+
+        session = self.get_session(session)
+
+        mapper = inspect(self._model)
+        keys = keyset_columns(self._order_by, mapper.primary_key)
+
+        stmt = self._build().offset(None).limit(per_page + 1)
+        stmt = stmt.order_by(None).order_by(*keyset_order(keys))
+
+        if after is not None:
+            values = decode_cursor(after)
+
+            if len(values) != len(keys):
+                raise ValueError("cursor does not match the query ordering.")
+
+            stmt = stmt.where(keyset_predicate(keys, values))
+
+        result = instrument(self, lambda: session.execute(stmt))
+        items = result.all() if self._entities else result.scalars().all()
+
+        has_more = len(items) > per_page
+        items = items[:per_page]
+
+        next_cursor = None
+
+        if items:
+            values = [self._keyset_value(items[-1], column) for column, _ in keys]
+
+            if has_more:
+                next_cursor = encode_cursor(values)
+
+        return {
+            "per_page": per_page,
+            "next_cursor": next_cursor,
+            "has_more": has_more,
+            "data": items,
+        }
+
+    def _keyset_value(self, item, column):
+        if not self._entities:
+            prop = inspect(self._model).get_property_by_column(column)
+
+            return getattr(item, prop.key)
+
+        if column in item._mapping:
+            return item._mapping[column]
+
+        # a selected instance of the model carries every one of its columns
+        for value in item:
+            if isinstance(value, self._model):
+                prop = inspect(self._model).get_property_by_column(column)
+
+                return getattr(value, prop.key)
+
+        raise ValueError(
+            f"cursor pagination needs {column} among the selected columns."
+        )
+
+    def count(self, session: Optional[Session] = None) -> int:
+        return self._exact_count(self.get_session(session))
+
+    def as_rows(self, session: Optional[Session] = None) -> List[tuple]:
+        return [tuple(row) for row in self._execute_columns(session)]
+
+    def as_dicts(self, session: Optional[Session] = None) -> List[dict]:
+        result = self._execute_columns(session)
+        keys = list(result.keys())
+
+        return [dict(zip(keys, row)) for row in result]
+
+    def as_dataclasses(self, session: Optional[Session] = None) -> List[Any]:
+        result = self._execute_columns(session)
+        row_class = row_dataclass(self._model, tuple(result.keys()))
+
+        return [row_class(*row) for row in result]
+
+    def to_columns(
+        self, chunk_size: int = 10000, session: Optional[Session] = None
+    ) -> Dict[str, list]:
+        result = self._execute_columns(
+            session,
+            execution_options={"stream_results": True, "yield_per": chunk_size},
+        )
+        names = list(result.keys())
+        columns = [[] for _ in names]
+
+        try:
+            for partition in result.partitions():
+                for column, values in zip(columns, zip(*partition)):
+                    column.extend(values)
+        finally:
+            result.close()
+
+        return dict(zip(names, columns))
+
+    def to_numpy(
+        self,
+        dtypes: Optional[Dict[str, Any]] = None,
+        masked: bool = False,
+        chunk_size: int = 10000,
+        session: Optional[Session] = None,
+    ) -> Dict[str, Any]:
+        require_numpy()
+
+        builder = self._column_builder()
+        result = SelectBuilder.execute(
+            builder,
+            session,
+            execution_options={"stream_results": True, "yield_per": chunk_size},
+        )
+        names = list(result.keys())
+
+        # dtypes follow the selected column types unless given by name
+        dtypes = [
+            (dtypes or {}).get(name) or numpy_dtype(column.type)
+            for name, column in zip(names, builder._build().selected_columns)
+        ]
+
+        try:
+            return fill_arrays(
+                result.partitions(),
+                names,
+                dtypes,
+                masked=masked,
+                capacity=self._limit or chunk_size,
+            )
+        finally:
+            result.close()
+
+    def _column_builder(self) -> "SelectBuilder":
+        builder = copy.copy(self)
+
+        # plain columns never reach the identity map, loader options have nothing
+        # left to load
+        builder._entities = self._entities or tuple(
+            getattr(self._model, prop.key) for prop in inspect(self._model).column_attrs
+        )
+        builder._options = ()
+
+        return builder
+
+    def _execute_columns(self, session: Optional[Session] = None, **kwargs) -> Result:
+        return SelectBuilder.execute(self._column_builder(), session, **kwargs)
+
+    def paginate(
+        self,
+        page: int = 1,
+        per_page: int = 30,
+        count: str = "exact",
+        session: Optional[Session] = None,
+        ttl: Optional[float] = None,
+    ) -> dict:
+        if count not in COUNT_MODES:
+            raise ValueError(f"count must be one of {', '.join(COUNT_MODES)}.")
+
+        if page < 1 or per_page < 1:
+            raise ValueError("page and per_page must be positive.")
+
+        session = self.get_session(session)
+
+        stmt = self._build().offset((page - 1) * per_page).limit(per_page)
+        result = instrument(self, lambda: session.execute(stmt))
+        items = result.all() if self._entities else result.scalars().all()
+
+        total = None
+
+        if count == "exact":
+            total = self._exact_count(session)
+        elif count == "estimate":
+            total = self._estimate_count(session)
+        elif count == "cached":
+            total = self._cached_count(session, ttl)
+
+        return {
+            "total": total,
+            "per_page": per_page,
+            "current_page": page,
+            "last_page": math.ceil(total / per_page) if total is not None else None,
+            "data": items,
+        }
+
+    def _exact_count(self, session: Session) -> int:
+        return instrument(
+            self, lambda: session.execute(self._count_stmt())
+        ).scalar_one()
+
+    def _count_stmt(self) -> Select:
+        if self._group_by or self._having:
+            stmt = self._build().order_by(None).offset(None).limit(None)
+
+            return select(func.count()).select_from(stmt.subquery())
+
+        stmt = select(func.count()).select_from(self._model)
+
+        if self._where_clauses:
+            stmt = stmt.where(*self._where_clauses)
+
+        return stmt
+
+    def _estimate_count(self, session: Session) -> int:
+        if self._group_by or self._having:
+            return self._exact_count(session)
+
+        stmt = select(self._model).where(*self._where_clauses)
+        table = None if self._where_clauses else inspect(self._model).local_table
+
+        total = estimate_count(session.connection(), stmt, table)
+
+        return total if total is not None else self._exact_count(session)
+
+    def _cached_count(self, session: Session, ttl: Optional[float] = None) -> int:
+        stmt = self._count_stmt()
+        cache_key = stmt._generate_cache_key()
+
+        if cache_key is None:
+            return self._exact_count(session)
+
+        key = (
+            cache_key.key,
+            tuple(_hashable(bind.effective_value) for bind in cache_key.bindparams),
+        )
+
+        total = self.count_cache.get(key)
+
+        if total is None:
+            total = instrument(self, lambda: session.execute(stmt)).scalar_one()
+            self.count_cache.set(key, total, ttl)
 
-        return session.execute(stmt, *args, **kwargs)
+        return total
 
-    # def paginate(self, page: int = 1, per_page: int = 30) -> dict:
-    #     self.offset((page - 1) * per_page)
-    #     self.limit(per_page)
 
-    #     if self._where_clauses:
-    #         self._stmt = self._stmt.where(*self._where_clauses)
+@functools.lru_cache(maxsize=None)
+def row_dataclass(model: type, keys: tuple) -> type:
+    # a __slots__ namespace, dataclass(slots=True) needs Python 3.10
+    return dataclasses.make_dataclass(
+        f"{model.__name__}Row",
+        [(key, Any) for key in keys],
+        namespace={"__slots__": keys},
+    )
 
-    #     total_stmt = select(func.count()).select_from(self.get_model_class())
-    #     if self._stmt.whereclause is not None:
-    #         total_stmt = total_stmt.where(self._stmt.whereclause)
 
-    #     total_rows = self.execute(total_stmt).scalars().first()
+def _hashable(value: Any) -> Any:
+    if isinstance(value, (list, set)):
+        return tuple(_hashable(item) for item in value)
 
-    #     return {
-    #         "total": total_rows,
-    #         "per_page": per_page,
-    #         "current_page": page,
-    #         "last_page": math.ceil(total_rows / per_page),
-    #         "data": self.get(),
-    #     }
+    return value
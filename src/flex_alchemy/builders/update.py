@@ -4,10 +4,12 @@ from sqlalchemy import Update, update
 from sqlalchemy.orm import Session
 from sqlalchemy.engine.result import Result
 
-from .base import BaseWhereBuilder
+from .base import BaseChunkedBuilder
+from ..session import in_unit_of_work
+from ..instrumentation import instrument
 
 
-class UpdateBuilder(BaseWhereBuilder):
+class UpdateBuilder(BaseChunkedBuilder):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -17,24 +19,28 @@ class UpdateBuilder(BaseWhereBuilder):
         self._ordered_values: tuple[tuple[str]] = ()
 
     def values(self, **kwargs) -> "UpdateBuilder":
-        self._values.update(kwargs)
+        builder = self._mutable()
+        builder._values.update(kwargs)
 
-        return self
+        return builder
 
     def returning(self, *cols) -> "UpdateBuilder":
-        self._returning += (*cols,)
+        builder = self._mutable()
+        builder._returning += (*cols,)
 
-        return self
+        return builder
 
     def with_dialect_options(self, **opts) -> "UpdateBuilder":
-        self._dialect_options.update(opts)
+        builder = self._mutable()
+        builder._dialect_options.update(opts)
 
-        return self
+        return builder
 
     def ordered_values(self, *args) -> "UpdateBuilder":
-        self._ordered_values += (*args,)
+        builder = self._mutable()
+        builder._ordered_values += (*args,)
 
-        return self
+        return builder
 
     def _build(self) -> Update:
         if not self._values:
@@ -63,9 +69,9 @@ class UpdateBuilder(BaseWhereBuilder):
 
         stmt = self._build()
 
-        result = session.execute(stmt, *args, **kwargs)
+        result = instrument(self, lambda: session.execute(stmt, *args, **kwargs))
 
-        if commit:
+        if commit and not in_unit_of_work(session):
             session.commit()
 
         return result
@@ -0,0 +1,171 @@
+import typing as t
+
+from sqlalchemy import Insert, inspect
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+from .base import BaseBuilder
+from ..exceptions import UnsupportedDialectError
+from ..utils import chunked, max_bind_params
+from ..session import in_unit_of_work
+from ..instrumentation import instrument
+
+DIALECT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+    "mysql": mysql.insert,
+    "mariadb": mysql.insert,
+}
+
+_EXCLUDED = object()
+
+
+class UpsertBuilder(BaseBuilder):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self._rows: t.List[dict] = []
+        self._conflict: tuple = ()
+        self._update: t.Optional[dict] = None
+        self._returning: tuple = ()
+        self._batch_size: int = 1000
+
+    def values(self, rows: t.Union[dict, t.Iterable[dict]]):
+        builder = self._mutable()
+        builder._rows = [rows] if isinstance(rows, dict) else list(rows)
+
+        return builder
+
+    def on_conflict(self, *columns: str):
+        builder = self._mutable()
+        builder._conflict += (*columns,)
+
+        return builder
+
+    def update(self, *columns: str, **values):
+        builder = self._mutable()
+        builder._update = builder._update or {}
+        builder._update.update({column: _EXCLUDED for column in columns}, **values)
+
+        return builder
+
+    def do_nothing(self):
+        builder = self._mutable()
+        builder._update = {}
+
+        return builder
+
+    def returning(self, *cols):
+        builder = self._mutable()
+        builder._returning += (*cols,)
+
+        return builder
+
+    def batch_size(self, size: int):
+        builder = self._mutable()
+        builder._batch_size = size
+
+        return builder
+
+    def _build(self, rows: t.List[dict], dialect_name: str) -> Insert:
+        if dialect_name not in DIALECT_INSERTS:
+            raise UnsupportedDialectError("upsert", dialect_name)
+
+        if self._returning and dialect_name == "mysql":
+            # mariadb has INSERT ... RETURNING, mysql does not
+            raise UnsupportedDialectError("upsert returning", dialect_name)
+
+        mapper = inspect(self._model)
+        conflict = self._conflict or tuple(
+            mapper.get_property_by_column(column).key for column in mapper.primary_key
+        )
+
+        stmt = DIALECT_INSERTS[dialect_name](self._model).values(rows)
+        excluded = (
+            stmt.inserted if dialect_name in ("mysql", "mariadb") else stmt.excluded
+        )
+
+        if self._update is None:
+            # every inserted column except the conflict target, plus onupdate defaults
+            keys = [key for key in rows[0] if key not in conflict]
+            set_ = {
+                mapper.columns[key].name: excluded[mapper.columns[key].name]
+                for key in keys
+            }
+
+            for column in mapper.local_table.columns:
+                if (
+                    column.name not in set_
+                    and column.onupdate is not None
+                    and column.onupdate.is_clause_element
+                ):
+                    set_[column.name] = column.onupdate.arg
+        else:
+            set_ = {
+                mapper.columns[key].name: (
+                    excluded[mapper.columns[key].name] if value is _EXCLUDED else value
+                )
+                for key, value in self._update.items()
+            }
+
+        if dialect_name in ("mysql", "mariadb"):
+            if not set_:
+                # assigning a key to itself turns the conflicting insert into a no-op
+                name = mapper.columns[conflict[0]].name
+                set_ = {name: mapper.local_table.c[name]}
+
+            stmt = stmt.on_duplicate_key_update(set_)
+        else:
+            index_elements = [mapper.columns[key] for key in conflict]
+
+            if set_:
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=index_elements, set_=set_
+                )
+            else:
+                stmt = stmt.on_conflict_do_nothing(index_elements=index_elements)
+
+        if self._returning:
+            stmt = stmt.returning(*self._returning)
+        else:
+            # rowcount is only kept for UPDATE / DELETE unless asked for
+            stmt = stmt.execution_options(preserve_rowcount=True)
+
+        return stmt
+
+    def execute(
+        self, session: t.Optional[Session] = None, commit: bool = True
+    ) -> t.Union[int, t.List[Row]]:
+        session = self.get_session(session)
+
+        if not self._rows:
+            raise ValueError("rows cannot be empty.")
+
+        dialect_name = session.get_bind(mapper=inspect(self._model)).dialect.name
+
+        # a multi-row VALUES carries one bind parameter per column per row
+        per_statement = max(1, max_bind_params(dialect_name) // len(self._rows[0]))
+        size = min(self._batch_size, per_statement)
+
+        returned = []
+        total = 0
+
+        try:
+            for batch in chunked(self._rows, size):
+                stmt = self._build(batch, dialect_name)
+                result = instrument(self, lambda: session.execute(stmt))
+
+                if self._returning:
+                    returned.extend(result.all())
+                else:
+                    total += result.rowcount
+
+            if commit and not in_unit_of_work(session):
+                session.commit()
+
+        except Exception as e:
+            session.rollback()
+            raise e
+
+        return returned if self._returning else total
@@ -0,0 +1,251 @@
+import functools
+import re
+import time
+import typing as t
+
+from itertools import chain
+
+from sqlalchemy import (
+    Column,
+    Connection,
+    Update,
+    and_,
+    cast,
+    column,
+    insert,
+    select,
+    types,
+    update,
+    values,
+)
+from sqlalchemy.engine import Dialect
+from sqlalchemy.orm import Mapper
+
+from .utils import chunked
+
+_TYPE_MODIFIERS = re.compile(r"\([^)]*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def copy_rows(
+    connection: Connection,
+    columns: t.Sequence[Column],
+    rows: t.Iterable[t.Sequence[t.Any]],
+    batch_size: int = 1000,
+) -> dict:
+    table = columns[0].table
+    started = time.perf_counter()
+
+    if (
+        connection.dialect.name == "postgresql"
+        and connection.dialect.driver == "psycopg"
+    ):
+        method = "copy"
+        total = _copy(connection, columns, rows)
+    else:
+        method = "executemany"
+        total = 0
+        stmt = insert(table)
+
+        for batch in chunked(rows, batch_size):
+            connection.execute(
+                stmt, [dict(zip((c.name for c in columns), row)) for row in batch]
+            )
+            total += len(batch)
+
+    elapsed = time.perf_counter() - started
+
+    return {
+        "rows": total,
+        "method": method,
+        "seconds": elapsed,
+        "rows_per_second": total / elapsed if elapsed else float(total),
+    }
+
+
+def _copy(
+    connection: Connection,
+    columns: t.Sequence[Column],
+    rows: t.Iterable[t.Sequence[t.Any]],
+) -> int:
+    driver_connection = connection.connection.driver_connection
+    preparer = connection.dialect.identifier_preparer
+    names = ", ".join(preparer.quote(column.name) for column in columns)
+    binary_types = [
+        _binary_type(column.type, connection.dialect, driver_connection.adapters.types)
+        for column in columns
+    ]
+
+    # the text format adapts any value, binary needs every column type up front
+    binary = all(binary_types)
+    sql = f"COPY {preparer.format_table(columns[0].table)} ({names}) FROM STDIN"
+
+    if binary:
+        sql += " (FORMAT BINARY)"
+
+    if connection.dialect.is_async:
+        from sqlalchemy.util import await_only
+
+        # AsyncConnection, reached from AsyncSession.run_sync
+        return await_only(
+            _copy_async(driver_connection, sql, binary_types if binary else None, rows)
+        )
+
+    total = 0
+
+    with driver_connection.cursor() as cursor, cursor.copy(sql) as copy:
+        if binary:
+            copy.set_types(binary_types)
+
+        for row in rows:
+            copy.write_row(row)
+            total += 1
+
+    return total
+
+
+async def _copy_async(
+    driver_connection: t.Any,
+    sql: str,
+    binary_types: t.Optional[t.List[int]],
+    rows: t.Iterable[t.Sequence[t.Any]],
+) -> int:
+    total = 0
+
+    async with driver_connection.cursor() as cursor, cursor.copy(sql) as copy:
+        if binary_types:
+            copy.set_types(binary_types)
+
+        for row in rows:
+            await copy.write_row(row)
+            total += 1
+
+    return total
+
+
+def _binary_type(
+    type_: types.TypeEngine, dialect: Dialect, registry: t.Any
+) -> t.Optional[int]:
+    # enum and JSON values are adapted by the text format only
+    if isinstance(type_, (types.Enum, types.JSON)):
+        return None
+
+    # the column's own database type, REAL stays float4 and TIME WITH TIME ZONE
+    # timetz; types psycopg does not know, arrays and a bare FLOAT go as text
+    name = _TYPE_MODIFIERS.sub("", type_.compile(dialect=dialect))
+    name = _WHITESPACE.sub(" ", name).strip().lower()
+
+    if name.endswith("]"):
+        return None
+
+    info = registry.get(name)
+
+    return info.oid if info is not None else None
+
+
+def column_defaults(
+    connection: Connection, columns: t.Mapping[str, Column], keys: t.Sequence[str]
+) -> t.Dict[str, t.Callable[[], t.Any]]:
+    # COPY never fires column defaults, they are filled in client side, keyed like
+    # the rows, by attribute name; callables run per row, SQL expressions such as
+    # func.now() once per load, the value they have in a single INSERT statement
+    defaults = {}
+
+    for key, column in columns.items():
+        default = column.default
+
+        if key in keys or default is None:
+            continue
+
+        if default.is_callable:
+            # no execution context outside of an INSERT
+            defaults[key] = functools.partial(default.arg, None)
+        elif default.is_clause_element:
+            defaults[key] = _constant(_evaluate(connection, column, default.arg))
+        elif default.is_scalar:
+            defaults[key] = _constant(default.arg)
+
+    return defaults
+
+
+def _evaluate(connection: Connection, column: Column, expression: t.Any) -> t.Any:
+    # the value an INSERT would store, now() is timestamptz until cast to the
+    # column type; SQLite has no column types and CAST would mangle the text
+    if connection.dialect.name != "sqlite":
+        expression = cast(expression, column.type)
+
+    return connection.scalar(select(expression))
+
+
+def _constant(value: t.Any) -> t.Callable[[], t.Any]:
+    return lambda: value
+
+
+def row_values(
+    rows: t.Iterable[t.Any], keys: t.Optional[t.Sequence[str]] = None
+) -> t.Tuple[t.List[str], t.Iterator[t.Sequence[t.Any]]]:
+    iterator = iter(rows)
+    first = next(iterator, None)
+
+    if first is None:
+        return list(keys or ()), iter(())
+
+    if keys is None:
+        if not isinstance(first, dict):
+            raise ValueError("columns are required when rows are not dicts.")
+
+        keys = list(first)
+
+    iterator = chain([first], iterator)
+
+    if isinstance(first, dict):
+        return list(keys), (tuple(row[key] for key in keys) for row in iterator)
+
+    return list(keys), iterator
+
+
+def values_updates(
+    mapper: Mapper, rows: t.Iterable[dict], max_params: int
+) -> t.Iterator[Update]:
+    primary_key = [mapper.get_property_by_column(c).key for c in mapper.primary_key]
+    groups: t.Dict[tuple, t.List[dict]] = {}
+
+    # one VALUES list per distinct set of updated attributes
+    for row in rows:
+        groups.setdefault(tuple(row), []).append(row)
+
+    for keys, group in groups.items():
+        if not set(primary_key).issubset(keys):
+            raise ValueError("every row must include the primary key.")
+
+        # nothing to set, an empty SET clause is not valid SQL
+        if set(keys) == set(primary_key):
+            continue
+
+        columns = [mapper.columns[key] for key in keys]
+
+        for chunk in chunked(group, max(1, max_params // len(keys))):
+            data = values(
+                *(column(col.name, col.type) for col in columns), name="data"
+            ).data([tuple(row[key] for key in keys) for row in chunk])
+
+            yield (
+                update(mapper.class_)
+                .values(
+                    {
+                        # untyped VALUES literals resolve to text without a cast
+                        col: cast(data.c[col.name], col.type)
+                        for key, col in zip(keys, columns)
+                        if key not in primary_key
+                    }
+                )
+                .where(
+                    and_(
+                        *(
+                            mapper.columns[key] == data.c[mapper.columns[key].name]
+                            for key in primary_key
+                        )
+                    )
+                )
+                .execution_options(synchronize_session=False)
+            )
@@ -0,0 +1,106 @@
+import typing as t
+
+from sqlalchemy import types
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# numpy dtypes of SQLAlchemy types, anything else is kept as Python objects
+NUMPY_DTYPES: t.Dict[t.Type[types.TypeEngine], str] = {
+    types.Boolean: "bool",
+    types.SmallInteger: "int16",
+    types.BigInteger: "int64",
+    types.Integer: "int64",
+    types.Float: "float64",
+    types.Numeric: "float64",
+    types.Date: "datetime64[D]",
+    types.Interval: "timedelta64[us]",
+}
+
+# NULLs of these kinds have no representation in the array itself
+_NOT_NULLABLE = {"b": False, "i": 0, "u": 0}
+
+
+def require_numpy():
+    if np is None:
+        raise ImportError(
+            "numpy is required, install it with `pip install flex-alchemy[numpy]`."
+        )
+
+
+def numpy_dtype(type_: types.TypeEngine) -> str:
+    if isinstance(type_, types.DateTime):
+        # numpy datetimes are naive, aware values stay datetime objects
+        return "object" if type_.timezone else "datetime64[us]"
+
+    for cls, dtype in NUMPY_DTYPES.items():
+        if isinstance(type_, cls):
+            return dtype
+
+    return "object"
+
+
+def fill_arrays(
+    partitions: t.Iterable[t.Sequence[t.Sequence[t.Any]]],
+    names: t.Sequence[str],
+    dtypes: t.Sequence[t.Any],
+    masked: bool = False,
+    capacity: int = 1024,
+) -> t.Dict[str, t.Any]:
+    require_numpy()
+
+    capacity = max(capacity, 1)
+    arrays = [np.empty(capacity, dtype=dtype) for dtype in dtypes]
+    masks = [np.zeros(capacity, dtype=bool) for _ in dtypes] if masked else None
+    size = 0
+
+    for partition in partitions:
+        end = size + len(partition)
+
+        if end > capacity:
+            capacity = max(end, capacity * 2)
+            arrays = [_grow(array, size, capacity) for array in arrays]
+
+            if masked:
+                masks = [_grow(mask, size, capacity) for mask in masks]
+
+        # each chunk is transposed once and copied into the arrays by numpy
+        for idx, values in enumerate(zip(*partition)):
+            array = arrays[idx]
+
+            if array.dtype.kind in _NOT_NULLABLE and None in values:
+                if not masked:
+                    raise ValueError(
+                        f"column {names[idx]} has NULLs, fetch it with masked=True "
+                        "or a float / object dtype."
+                    )
+
+                fill = _NOT_NULLABLE[array.dtype.kind]
+                masks[idx][size:end] = [value is None for value in values]
+                values = [fill if value is None else value for value in values]
+            elif masked and array.dtype.kind in "fOMm" and None in values:
+                masks[idx][size:end] = [value is None for value in values]
+
+            array[size:end] = values
+
+        size = end
+
+    columns = {}
+
+    for idx, name in enumerate(names):
+        array = arrays[idx] if size == capacity else arrays[idx][:size].copy()
+
+        columns[name] = (
+            np.ma.MaskedArray(array, mask=masks[idx][:size]) if masked else array
+        )
+
+    return columns
+
+
+def _grow(array: t.Any, size: int, capacity: int) -> t.Any:
+    grown = np.zeros(capacity, dtype=array.dtype)
+    grown[:size] = array[:size]
+
+    return grown
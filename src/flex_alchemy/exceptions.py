@@ -1,3 +1,32 @@
+import typing as t
+
+
 class SessionNotProvidedError(ValueError):
     def __init__(self):
         super().__init__("Session is not provided or invalid")
+
+
+class LazyLoadError(RuntimeError):
+    def __init__(self, model: str, relationship: str):
+        super().__init__(
+            f"Lazy loading {model}.{relationship} is prevented, eager load it with `with_`"
+        )
+
+
+class NPlusOneError(RuntimeError):
+    def __init__(self, report: t.Any):
+        super().__init__(str(report))
+
+        self.report = report
+
+
+class NPlusOneWarning(UserWarning):
+    pass
+
+
+class UnsupportedDialectError(NotImplementedError):
+    def __init__(self, feature: str, dialect: str):
+        super().__init__(f"{feature} is not supported on {dialect}.")
+
+        self.feature = feature
+        self.dialect = dialect
@@ -0,0 +1,207 @@
+import json
+import logging
+import random
+import re
+import typing as t
+
+from collections import deque
+from dataclasses import asdict, dataclass, field
+
+from sqlalchemy import Connection, func, literal, select, table
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+_SQLITE_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)$")
+
+logger = logging.getLogger("flex_alchemy.slow_queries")
+
+
+class Explain(Executable, ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, statement: Executable, analyze: bool = False):
+        self.statement = statement
+        self.analyze = analyze
+
+
+def explain_prefix(dialect_name: str, analyze: bool = False) -> str:
+    if dialect_name == "postgresql":
+        options = "ANALYZE, FORMAT JSON" if analyze else "FORMAT JSON"
+
+        return f"EXPLAIN ({options}) "
+
+    if dialect_name == "sqlite":
+        return "EXPLAIN QUERY PLAN "
+
+    return "EXPLAIN ANALYZE " if analyze else "EXPLAIN "
+
+
+@compiles(Explain)
+def _compile_explain(element: Explain, compiler, **kw) -> str:
+    prefix = explain_prefix(compiler.dialect.name, element.analyze)
+
+    return prefix + compiler.process(element.statement, **kw)
+
+
+def explain(statement: Executable, analyze: bool = False) -> Explain:
+    return Explain(statement, analyze=analyze)
+
+
+@dataclass
+class SlowQuery:
+    model: t.Optional[str]
+    builder: t.Optional[str]
+    sql: str
+    parameters: t.Any
+    duration: float
+    started_at: float
+    call_site: t.Optional[str]
+    plan: t.Any = None
+    analyzed: bool = False
+    seq_scans: t.List[str] = field(default_factory=list)
+
+
+class SlowQueryLog:
+    def __init__(
+        self,
+        threshold: float = 0.5,
+        analyze: bool = False,
+        sample_rate: float = 1.0,
+        large_table_rows: int = 10000,
+        maxlen: int = 1000,
+    ):
+        self.threshold = threshold
+        self.analyze = analyze
+        self.sample_rate = sample_rate
+        self.large_table_rows = large_table_rows
+        self.records: t.Deque[SlowQuery] = deque(maxlen=maxlen)
+
+        # table sizes are probed once per table, until the log is cleared
+        self._large_tables: t.Dict[t.Tuple[t.Any, str], bool] = {}
+
+    def explain(
+        self, connection: Connection, statement: str, parameters: t.Any
+    ) -> t.Optional[dict]:
+        if random.random() >= self.sample_rate:
+            return None
+
+        # the plan is best effort, the statement it is fetched for must not fail
+        try:
+            return _guarded(
+                connection, self._explain, connection, statement, parameters
+            )
+        except Exception:
+            logger.exception("could not explain slow query: %s", statement)
+
+            return None
+
+    def _explain(
+        self, connection: Connection, statement: str, parameters: t.Any
+    ) -> dict:
+        # ANALYZE runs the statement again, writes are only ever planned
+        analyze = self.analyze and statement.lstrip()[:6].upper() == "SELECT"
+        dialect_name = connection.dialect.name
+
+        result = connection.exec_driver_sql(
+            explain_prefix(dialect_name, analyze) + statement, parameters
+        )
+
+        if dialect_name == "postgresql":
+            plan = result.scalar()
+            plan = json.loads(plan) if isinstance(plan, str) else plan
+            scans = list(_postgresql_scans(plan[0]["Plan"]))
+        else:
+            plan = [dict(row._mapping) for row in result]
+            scans = list(_scans(plan))
+
+        return {
+            "plan": plan,
+            "analyzed": analyze and dialect_name != "sqlite",
+            "seq_scans": [
+                name
+                for name in dict.fromkeys(scans)
+                if self._is_large(connection, name)
+            ],
+        }
+
+    def _is_large(self, connection: Connection, name: str) -> bool:
+        key = (connection.engine.url, name)
+
+        if key not in self._large_tables:
+            try:
+                self._large_tables[key] = _guarded(
+                    connection, self._count_up_to_threshold, connection, name
+                )
+            except Exception:
+                logger.exception("could not count the rows of %s", name)
+
+                self._large_tables[key] = False
+
+        return self._large_tables[key]
+
+    def _count_up_to_threshold(self, connection: Connection, name: str) -> bool:
+        schema, _, name = name.rpartition(".")
+
+        # counting stops at the threshold, large tables are never scanned fully
+        rows = select(literal(1)).select_from(table(name, schema=schema or None))
+        count = select(func.count()).select_from(
+            rows.limit(self.large_table_rows).subquery()
+        )
+
+        return connection.execute(count).scalar() >= self.large_table_rows
+
+    def record(self, slow_query: SlowQuery):
+        self.records.append(slow_query)
+
+        logger.warning(
+            "slow query %.3fms at %s%s: %s",
+            slow_query.duration * 1000,
+            slow_query.call_site,
+            (
+                f" (sequential scan on {', '.join(slow_query.seq_scans)})"
+                if slow_query.seq_scans
+                else ""
+            ),
+            slow_query.sql,
+        )
+
+    def dump(self, fp: t.TextIO):
+        # one JSON document per line, to be loaded again for offline analysis
+        for slow_query in list(self.records):
+            fp.write(json.dumps(asdict(slow_query), default=str) + "\n")
+
+    def clear(self):
+        self.records.clear()
+        self._large_tables.clear()
+
+
+def _guarded(connection: Connection, fn: t.Callable, *args) -> t.Any:
+    # an error aborts the whole PostgreSQL transaction, unless it was raised in a
+    # savepoint of its own
+    if connection.dialect.name == "postgresql" and connection.in_transaction():
+        with connection.begin_nested():
+            return fn(*args)
+
+    return fn(*args)
+
+
+def _postgresql_scans(node: dict) -> t.Iterator[str]:
+    if node.get("Node Type") == "Seq Scan":
+        schema = node.get("Schema")
+        name = node["Relation Name"]
+
+        yield f"{schema}.{name}" if schema else name
+
+    for child in node.get("Plans", ()):
+        yield from _postgresql_scans(child)
+
+
+def _scans(plan: t.List[dict]) -> t.Iterator[str]:
+    for row in plan:
+        # SQLite reports "SCAN <table>", MySQL an access type of "ALL"
+        match = _SQLITE_SCAN.match(str(row.get("detail", "")))
+
+        if match:
+            yield match.group(1)
+        elif row.get("type") == "ALL" and row.get("table"):
+            yield row["table"]
@@ -0,0 +1,404 @@
+import asyncio
+import contextlib
+import contextvars
+import hashlib
+import itertools
+import logging
+import os
+import re
+import sys
+import threading
+import time
+import types
+import typing as t
+
+from dataclasses import dataclass, field
+
+from sqlalchemy import Engine, event
+from sqlalchemy.engine import CursorResult, Result
+
+from .explain import SlowQuery
+
+try:
+    import greenlet
+except ImportError:
+    greenlet = None
+
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|\$\d+|(?<![:\w]):\w+|\?")
+_IN_LIST = re.compile(r"\((?:\s*\?\s*,)+\s*\?\s*\)")
+_VALUES_LIST = re.compile(r"(\(\?(?:, \?)*\))(?:, \1)+")
+_WHITESPACE = re.compile(r"\s+")
+
+# frames from these locations are skipped when looking for the calling site
+_INTERNAL_PATHS = tuple(
+    os.path.dirname(os.path.abspath(module.__file__))
+    for module in (sys.modules[__package__], sys.modules["sqlalchemy"], asyncio)
+) + (os.path.abspath(contextlib.__file__),)
+
+_capture: contextvars.ContextVar[t.Optional["_Capture"]] = contextvars.ContextVar(
+    "flex_alchemy_capture", default=None
+)
+_sinks: t.List[t.Callable[["QueryEvent"], None]] = []
+_listening = False
+
+
+@dataclass
+class QueryEvent:
+    model: t.Optional[str]
+    builder: t.Optional[str]
+    sql: str
+    fingerprint: str
+    bind_count: int
+    statements: int
+    started_at: float
+    duration: float
+    rows: t.Optional[int]
+    call_site: t.Optional[str]
+    error: t.Optional[str] = None
+
+
+@dataclass
+class _Statement:
+    statement: str
+    parameters: t.Any
+    executemany: bool
+    started: float
+    duration: t.Optional[float] = None
+    rowcount: t.Optional[int] = None
+    explained: t.Optional[dict] = None
+
+
+@dataclass
+class _Capture:
+    slow_query_log: t.Any = None
+    statements: t.List[_Statement] = field(default_factory=list)
+
+
+def listen():
+    global _listening
+
+    # cursor events are only paid for once somebody listens
+    if not _listening:
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+        _listening = True
+
+
+def add_sink(sink: t.Callable[[QueryEvent], None]):
+    listen()
+
+    _sinks.append(sink)
+
+
+def remove_sink(sink: t.Callable[[QueryEvent], None]):
+    if sink in _sinks:
+        _sinks.remove(sink)
+
+
+def fingerprint(sql: str) -> t.Tuple[str, str]:
+    normalized = _PLACEHOLDER.sub("?", sql)
+    normalized = _WHITESPACE.sub(" ", normalized).strip()
+
+    # expanded IN lists and multi-row VALUES collapse to one shape
+    normalized = _IN_LIST.sub("(?)", normalized)
+    normalized = _VALUES_LIST.sub(r"\1", normalized)
+
+    return normalized, hashlib.sha1(normalized.encode()).hexdigest()[:16]
+
+
+def instrument(
+    source: t.Any, execute: t.Callable[[], Result], count_rows: bool = True
+) -> Result:
+    slow_query_log = getattr(source, "_slow_query_log", None)
+
+    if not _sinks and slow_query_log is None:
+        return execute()
+
+    started_at, started = time.time(), time.perf_counter()
+    token = _capture.set(_Capture(slow_query_log))
+
+    try:
+        result = execute()
+    except Exception as e:
+        _emit(source, started_at, started, token, None, repr(e))
+        raise e
+
+    _emit(source, started_at, started, token, _rows_affected(result, count_rows))
+
+    return result
+
+
+async def instrument_async(
+    source: t.Any,
+    execute: t.Callable[[], t.Awaitable[Result]],
+    count_rows: bool = True,
+) -> Result:
+    slow_query_log = getattr(source, "_slow_query_log", None)
+
+    if not _sinks and slow_query_log is None:
+        return await execute()
+
+    started_at, started = time.time(), time.perf_counter()
+    token = _capture.set(_Capture(slow_query_log))
+
+    try:
+        result = await execute()
+    except Exception as e:
+        _emit(source, started_at, started, token, None, repr(e))
+        raise e
+
+    _emit(source, started_at, started, token, _rows_affected(result, count_rows))
+
+    return result
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    capture = _capture.get()
+
+    if capture is not None:
+        capture.statements.append(
+            _Statement(statement, parameters, executemany, time.perf_counter())
+        )
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    capture = _capture.get()
+
+    if capture is None or not capture.statements:
+        return
+
+    captured = capture.statements[-1]
+    captured.duration = time.perf_counter() - captured.started
+
+    # drivers that buffer the result set know its size, sqlite only counts the
+    # rows stepped through so far
+    if (cursor.rowcount or 0) >= 0 and (
+        cursor.description is None or conn.dialect.name != "sqlite"
+    ):
+        captured.rowcount = cursor.rowcount
+
+    slow_query_log = capture.slow_query_log
+
+    # the plan is fetched on the same connection while the statement is current,
+    # which also keeps it inside the greenlet of an asyncio session
+    if (
+        slow_query_log is not None
+        and not executemany
+        and captured.duration >= slow_query_log.threshold
+    ):
+        token = _capture.set(None)
+
+        try:
+            captured.explained = slow_query_log.explain(conn, statement, parameters)
+        finally:
+            _capture.reset(token)
+
+
+def _rows_affected(result: Result, count_rows: bool) -> t.Optional[int]:
+    # ORM results always return rows, only cursor results may not
+    if isinstance(result, CursorResult) and not result.returns_rows:
+        return result.rowcount
+
+    capture = _capture.get()
+
+    if not count_rows or not capture.statements:
+        return None
+
+    # the result is handed back untouched, its size is what the cursor reported
+    return capture.statements[0].rowcount
+
+
+def _emit(
+    source: t.Any,
+    started_at: float,
+    started: float,
+    token: contextvars.Token,
+    rows: t.Optional[int],
+    error: t.Optional[str] = None,
+):
+    duration = time.perf_counter() - started
+    capture = _capture.get()
+    _capture.reset(token)
+
+    if capture.statements:
+        first = capture.statements[0]
+        statement, parameters, executemany = (
+            first.statement,
+            first.parameters,
+            first.executemany,
+        )
+    else:
+        statement, parameters, executemany = "", (), False
+
+    sql, digest = fingerprint(statement)
+    model = getattr(source, "_model", source)
+
+    query_event = QueryEvent(
+        model=getattr(model, "__name__", None),
+        builder=type(source).__name__ if hasattr(source, "_model") else None,
+        sql=sql,
+        fingerprint=digest,
+        bind_count=_bind_count(parameters, executemany),
+        statements=len(capture.statements),
+        started_at=started_at,
+        duration=duration,
+        rows=rows,
+        call_site=call_site(),
+        error=error,
+    )
+
+    for sink in list(_sinks):
+        sink(query_event)
+
+    if capture.slow_query_log is not None:
+        _record_slow(capture, query_event)
+
+
+def _record_slow(capture: _Capture, query_event: QueryEvent):
+    for captured in capture.statements:
+        if (
+            captured.duration is None
+            or captured.duration < capture.slow_query_log.threshold
+        ):
+            continue
+
+        capture.slow_query_log.record(
+            SlowQuery(
+                model=query_event.model,
+                builder=query_event.builder,
+                sql=captured.statement,
+                parameters=captured.parameters,
+                duration=captured.duration,
+                started_at=query_event.started_at,
+                call_site=query_event.call_site,
+                **(captured.explained or {}),
+            )
+        )
+
+
+def _bind_count(parameters: t.Any, executemany: bool) -> int:
+    if executemany:
+        return sum(len(params) for params in parameters)
+
+    return len(parameters or ())
+
+
+def call_site() -> t.Optional[str]:
+    # the first frame outside this package and SQLAlchemy is the caller
+    return next(_application_frames(sys._getframe(1)), None)
+
+
+def call_stack(limit: int = 10) -> t.List[str]:
+    return list(itertools.islice(_application_frames(sys._getframe(1)), limit))
+
+
+def _application_frames(frame: t.Optional[types.FrameType]) -> t.Iterator[str]:
+    current = greenlet.getcurrent() if greenlet is not None else None
+
+    while frame is not None:
+        filename = os.path.abspath(frame.f_code.co_filename)
+
+        if not filename.startswith(_INTERNAL_PATHS):
+            yield f"{filename}:{frame.f_lineno} in {frame.f_code.co_name}"
+
+        frame = frame.f_back
+
+        # asyncio sessions run their sync code in a greenlet, the awaiting
+        # application code sits in the stack of the parent one
+        if frame is None and current is not None and current.parent is not None:
+            current = current.parent
+            frame = current.gr_frame
+
+
+class LoggingSink:
+    def __init__(self, logger: t.Optional[logging.Logger] = None, level=logging.INFO):
+        self.logger = logger or logging.getLogger("flex_alchemy.queries")
+        self.level = level
+
+    def __call__(self, query_event: QueryEvent):
+        self.logger.log(
+            self.level,
+            "%s %s %.3fms rows=%s binds=%s at %s: %s",
+            query_event.model,
+            query_event.builder,
+            query_event.duration * 1000,
+            query_event.rows,
+            query_event.bind_count,
+            query_event.call_site,
+            query_event.sql,
+        )
+
+
+class HistogramSink:
+    # upper bounds of the latency buckets, in seconds
+    buckets = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, float("inf"))
+
+    def __init__(self, buckets: t.Optional[t.Sequence[float]] = None):
+        if buckets is not None:
+            self.buckets = (*sorted(buckets), float("inf"))
+
+        self._stats: t.Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, query_event: QueryEvent):
+        with self._lock:
+            stats = self._stats.get(query_event.fingerprint)
+
+            if stats is None:
+                stats = self._stats[query_event.fingerprint] = {
+                    "fingerprint": query_event.fingerprint,
+                    "sql": query_event.sql,
+                    "model": query_event.model,
+                    "count": 0,
+                    "total": 0.0,
+                    "max": 0.0,
+                    "rows": 0,
+                    "errors": 0,
+                    "histogram": [0] * len(self.buckets),
+                }
+
+            stats["count"] += 1
+            stats["total"] += query_event.duration
+            stats["max"] = max(stats["max"], query_event.duration)
+            stats["rows"] += query_event.rows or 0
+            stats["errors"] += query_event.error is not None
+
+            for idx, bound in enumerate(self.buckets):
+                if query_event.duration <= bound:
+                    stats["histogram"][idx] += 1
+                    break
+
+    def top(self, n: int = 10, by: str = "total") -> t.List[dict]:
+        with self._lock:
+            stats = [
+                {**item, "mean": item["total"] / item["count"]}
+                for item in self._stats.values()
+            ]
+
+        return sorted(stats, key=lambda item: item[by], reverse=True)[:n]
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+class OpenTelemetrySink:
+    def __init__(self, tracer: t.Any):
+        self.tracer = tracer
+
+    def __call__(self, query_event: QueryEvent):
+        # spans are recorded after the fact with the measured start and end times
+        start_time = int(query_event.started_at * 1e9)
+        span = self.tracer.start_span(
+            f"{query_event.builder or 'execute'} {query_event.model}",
+            start_time=start_time,
+            attributes={
+                "db.statement": query_event.sql,
+                "db.flex_alchemy.fingerprint": query_event.fingerprint,
+                "db.flex_alchemy.bind_count": query_event.bind_count,
+                "db.flex_alchemy.rows": query_event.rows or 0,
+                "code.call_site": query_event.call_site or "",
+            },
+        )
+        span.end(end_time=start_time + int(query_event.duration * 1e9))
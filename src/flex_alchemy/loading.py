@@ -0,0 +1,143 @@
+import typing as t
+
+from sqlalchemy import Select, event, inspect, select, tuple_
+from sqlalchemy.orm import (
+    Load,
+    Mapper,
+    ORMExecuteState,
+    Session,
+    joinedload,
+    raiseload,
+    selectinload,
+)
+from sqlalchemy.orm.util import identity_key
+
+from .exceptions import LazyLoadError
+from .utils import chunked, max_bind_params
+
+_listening = False
+
+
+def find_many(
+    session: Session,
+    model: t.Type[t.Any],
+    pks: t.Iterable[t.Any],
+    chunk_size: t.Optional[int] = None,
+    stmt: t.Optional[Select] = None,
+) -> t.Tuple[t.List[t.Any], t.List[t.Any]]:
+    # identity map entries may not match the criteria of a scoped statement, such
+    # as soft deletes, every key is looked up again
+    scoped = stmt is not None and stmt.whereclause is not None
+    stmt = select(model) if stmt is None else stmt
+
+    mapper = inspect(model)
+    columns = mapper.primary_key
+    names = [mapper.get_property_by_column(column).key for column in columns]
+
+    pks = list(pks)
+    idents = [_normalize_ident(pk, names) for pk in pks]
+
+    found: t.Dict[tuple, t.Any] = {}
+    misses: t.List[tuple] = []
+
+    for ident in dict.fromkeys(idents):
+        instance = (
+            None if scoped else session.identity_map.get(identity_key(model, ident))
+        )
+
+        # expired instances would reload one by one, fetch them with the misses
+        if instance is None or inspect(instance).expired:
+            misses.append(ident)
+        elif not inspect(instance).deleted:
+            found[ident] = instance
+
+    dialect = session.get_bind(mapper=mapper).dialect
+    limit = max_bind_params(dialect.name) // len(columns)
+    chunk_size = min(chunk_size or limit, limit)
+
+    for chunk in chunked(misses, chunk_size):
+        if len(columns) == 1:
+            clause = columns[0].in_([ident[0] for ident in chunk])
+        else:
+            clause = tuple_(*columns).in_(chunk)
+
+        for instance in session.execute(stmt.where(clause)).scalars():
+            found[tuple(mapper.primary_key_from_instance(instance))] = instance
+
+    instances = [found[ident] for ident in idents if ident in found]
+    missing = [pk for pk, ident in zip(pks, idents) if ident not in found]
+
+    return instances, missing
+
+
+def _normalize_ident(pk: t.Any, names: t.List[str]) -> tuple:
+    if isinstance(pk, dict):
+        return tuple(pk[name] for name in names)
+
+    if isinstance(pk, (tuple, list)):
+        return tuple(pk)
+
+    return (pk,)
+
+
+def eager_options(
+    model: t.Type[t.Any], paths: t.Iterable[str], strict: bool = False
+) -> t.List[Load]:
+    tree: dict = {}
+
+    for path in paths:
+        node = tree
+
+        for name in path.split("."):
+            node = node.setdefault(name, {})
+
+    options = _eager_loaders(inspect(model), tree, None, strict)
+
+    if strict:
+        options.append(raiseload("*"))
+
+    return options
+
+
+def _eager_loaders(
+    mapper: Mapper, tree: dict, parent: t.Optional[Load], strict: bool
+) -> t.List[Load]:
+    options = []
+
+    for name, children in tree.items():
+        if name not in mapper.relationships:
+            raise ValueError(f"{mapper.class_.__name__} has no relationship {name!r}.")
+
+        prop = mapper.relationships[name]
+
+        # collections load in one extra IN query, scalars ride along in the JOIN
+        if prop.uselist:
+            loader = selectinload if parent is None else parent.selectinload
+        else:
+            loader = joinedload if parent is None else parent.joinedload
+
+        option = loader(prop.class_attribute)
+
+        options.append(option.raiseload("*") if strict else option)
+        options.extend(_eager_loaders(prop.mapper, children, option, strict))
+
+    return options
+
+
+def listen_lazy_loads():
+    global _listening
+
+    if not _listening:
+        event.listen(Session, "do_orm_execute", _prevent_lazy_load)
+
+        _listening = True
+
+
+def _prevent_lazy_load(state: ORMExecuteState):
+    if not state.is_select or state.lazy_loaded_from is None:
+        return
+
+    model = state.lazy_loaded_from.class_
+
+    if getattr(model, "_strict_loading", False):
+        raise LazyLoadError(model.__name__, state.loader_strategy_path[-1].key)
@@ -0,0 +1,139 @@
+import logging
+import random
+import typing as t
+import warnings
+
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, Session
+
+from .exceptions import NPlusOneError, NPlusOneWarning
+from .instrumentation import call_stack
+
+_HANDLER = "flex_alchemy_handler"
+_STATS = "flex_alchemy_query_stats"
+
+MODES = ("warn", "raise", "log")
+
+logger = logging.getLogger("flex_alchemy.n_plus_one")
+
+_listening = False
+
+
+@dataclass
+class NPlusOneReport:
+    model: t.Optional[str]
+    relationship: t.Optional[str]
+    sql: str
+    count: int
+    stack: t.List[str] = field(default_factory=list)
+
+    def __str__(self) -> str:
+        target = (
+            f"{self.model}.{self.relationship}" if self.relationship else self.model
+        )
+
+        return (
+            f"{self.count} repeated queries on {target}, eager load it with `with_`"
+            f" or batch the lookups (at {self.stack[0] if self.stack else '?'})"
+        )
+
+
+class NPlusOneDetector:
+    def __init__(
+        self, mode: str = "warn", threshold: int = 5, sample_rate: float = 1.0
+    ):
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {', '.join(MODES)}.")
+
+        self.mode = mode
+        self.threshold = threshold
+        self.sample_rate = sample_rate
+
+    def __call__(self, state: ORMExecuteState):
+        info = state.session.info
+        stats = info.get(_STATS)
+
+        # scopes are sampled as a whole, skipped ones only pay this lookup
+        if stats is None:
+            stats = info[_STATS] = (
+                {"statements": 0, "repeated": {}, "reports": []}
+                if random.random() < self.sample_rate
+                else False
+            )
+
+        if not stats:
+            return
+
+        stats["statements"] += 1
+
+        if not state.is_select:
+            return
+
+        # queries of the same shape share a cache key whatever their parameters
+        cache_key = state.statement._generate_cache_key()
+
+        if cache_key is None:
+            return
+
+        count = stats["repeated"].get(cache_key.key, 0) + 1
+        stats["repeated"][cache_key.key] = count
+
+        if count == self.threshold:
+            report = self._report(state, count)
+            stats["reports"].append(report)
+
+            self._notify(report)
+
+    def _report(self, state: ORMExecuteState, count: int) -> NPlusOneReport:
+        if state.lazy_loaded_from is not None:
+            model = state.lazy_loaded_from.class_.__name__
+            relationship = state.loader_strategy_path[-1].key
+        else:
+            mappers = state.all_mappers
+            model = mappers[0].class_.__name__ if mappers else None
+            relationship = None
+
+        return NPlusOneReport(
+            model=model,
+            relationship=relationship,
+            sql=str(state.statement),
+            count=count,
+            stack=call_stack(),
+        )
+
+    def _notify(self, report: NPlusOneReport):
+        if self.mode == "raise":
+            raise NPlusOneError(report)
+
+        if self.mode == "warn":
+            warnings.warn(str(report), NPlusOneWarning)
+        else:
+            logger.warning("%s\n%s", report, "\n".join(report.stack))
+
+
+def listen_n_plus_one():
+    global _listening
+
+    if not _listening:
+        event.listen(Session, "do_orm_execute", _detect)
+
+        _listening = True
+
+
+def query_stats(session: t.Any) -> t.Optional[dict]:
+    stats = session.info.get(_STATS)
+
+    if not stats:
+        return None
+
+    return {"statements": stats["statements"], "reports": list(stats["reports"])}
+
+
+def _detect(state: ORMExecuteState):
+    handler = state.session.info.get(_HANDLER)
+    detector = getattr(handler, "_n_plus_one", None)
+
+    if detector is not None:
+        detector(state)
@@ -0,0 +1,174 @@
+import base64
+import json
+import typing as t
+import uuid
+
+from datetime import date, datetime, time
+from decimal import Decimal
+
+from sqlalchemy import Connection, Select, Table, and_, literal, or_, text, tuple_
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import ColumnElement, UnaryExpression
+
+from .explain import explain
+
+_ENCODERS: t.Dict[type, t.Tuple[str, t.Callable]] = {
+    datetime: ("dt", datetime.isoformat),
+    date: ("d", date.isoformat),
+    time: ("t", time.isoformat),
+    Decimal: ("dec", str),
+    uuid.UUID: ("uuid", str),
+}
+
+_DECODERS: t.Dict[str, t.Callable] = {
+    "dt": datetime.fromisoformat,
+    "d": date.fromisoformat,
+    "t": time.fromisoformat,
+    "dec": Decimal,
+    "uuid": uuid.UUID,
+}
+
+
+def encode_cursor(values: t.Sequence[t.Any]) -> str:
+    payload = []
+
+    for value in values:
+        encoder = _ENCODERS.get(type(value))
+        payload.append([encoder[0], encoder[1](value)] if encoder else value)
+
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> t.List[t.Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+    except ValueError as e:
+        raise ValueError("invalid pagination cursor.") from e
+
+    if not isinstance(payload, list):
+        raise ValueError("invalid pagination cursor.")
+
+    try:
+        return [
+            _DECODERS[value[0]](value[1]) if isinstance(value, list) else value
+            for value in payload
+        ]
+    except (KeyError, IndexError, TypeError, ValueError) as e:
+        raise ValueError("invalid pagination cursor.") from e
+
+
+def keyset_columns(
+    order_by: t.Sequence[t.Any], primary_key: t.Sequence[ColumnElement]
+) -> t.List[t.Tuple[ColumnElement, bool]]:
+    keys = []
+
+    for clause in order_by:
+        if hasattr(clause, "__clause_element__"):
+            clause = clause.__clause_element__()
+
+        descending = False
+
+        if isinstance(clause, UnaryExpression):
+            if clause.modifier not in (operators.asc_op, operators.desc_op):
+                raise ValueError("cursor pagination only supports asc / desc ordering.")
+
+            descending = clause.modifier is operators.desc_op
+            clause = clause.element
+
+        if not isinstance(clause, ColumnElement):
+            raise ValueError(f"cannot paginate by cursor over {clause!r}.")
+
+        keys.append((clause, descending))
+
+    # primary key columns keep the ordering total, so no row is skipped or repeated
+    for column in primary_key:
+        if not any(column.shares_lineage(key) for key, _ in keys):
+            keys.append((column, False))
+
+    return keys
+
+
+def keyset_order(keys: t.Sequence[t.Tuple[ColumnElement, bool]]) -> t.List[t.Any]:
+    order_by = []
+
+    # NULLs sort last in both directions, the same way on every dialect
+    for column, descending in keys:
+        if _nullable(column):
+            order_by.append(column.is_(None))
+
+        order_by.append(column.desc() if descending else column.asc())
+
+    return order_by
+
+
+def keyset_predicate(
+    keys: t.Sequence[t.Tuple[ColumnElement, bool]], values: t.Sequence[t.Any]
+) -> ColumnElement:
+    if (
+        len(keys) > 1
+        and len({descending for _, descending in keys}) == 1
+        and not any(_nullable(column) for column, _ in keys)
+    ):
+        columns = tuple_(*(column for column, _ in keys))
+        bound = tuple_(*values)
+
+        return columns < bound if keys[0][1] else columns > bound
+
+    clauses = []
+
+    for idx, (column, descending) in enumerate(keys):
+        # within the trailing NULLs of a column only the later keys move forward
+        if values[idx] is None:
+            continue
+
+        equals = [
+            (
+                keys[prev][0].is_(None)
+                if values[prev] is None
+                else keys[prev][0] == values[prev]
+            )
+            for prev in range(idx)
+        ]
+        value = literal(values[idx], column.type)
+        after = column < value if descending else column > value
+
+        if _nullable(column):
+            after = or_(after, column.is_(None))
+
+        clauses.append(and_(*equals, after))
+
+    return or_(*clauses)
+
+
+def _nullable(column: ColumnElement) -> bool:
+    return bool(getattr(column, "nullable", False)) and not getattr(
+        column, "primary_key", False
+    )
+
+
+def estimate_count(
+    connection: Connection, stmt: Select, table: t.Optional[Table] = None
+) -> t.Optional[int]:
+    if connection.dialect.name != "postgresql":
+        return None
+
+    # without filters the planner statistics of the table are enough
+    if table is not None:
+        reltuples = connection.execute(
+            text("SELECT reltuples FROM pg_class WHERE oid = to_regclass(:name)"),
+            {"name": table.fullname},
+        ).scalar()
+
+        # reltuples is -1 (or 0 on older servers) until the table is analyzed
+        if reltuples is not None and reltuples > 0:
+            return int(reltuples)
+
+    plan = connection.execute(explain(stmt)).scalar()
+
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    return int(plan[0]["Plan"]["Plan Rows"])
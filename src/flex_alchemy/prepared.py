@@ -0,0 +1,151 @@
+import threading
+import typing as t
+import warnings
+
+from sqlalchemy import Engine, event
+
+_PREPARED = "flex_alchemy_prepared"
+_THRESHOLD = "flex_alchemy_prepare_threshold"
+_EXECUTED = "flex_alchemy_executed_statements"
+
+_listening = False
+_warned = False
+
+
+class PreparedStats:
+    def __init__(self):
+        self._statements: t.Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, reused: bool):
+        with self._lock:
+            stats = self._statements.get(statement)
+
+            if stats is None:
+                stats = self._statements[statement] = {
+                    "sql": statement,
+                    "executions": 0,
+                    "prepares": 0,
+                }
+
+            stats["executions"] += 1
+            stats["prepares"] += not reused
+
+    def info(self) -> dict:
+        with self._lock:
+            executions = sum(s["executions"] for s in self._statements.values())
+            prepares = sum(s["prepares"] for s in self._statements.values())
+
+        return {
+            "statements": len(self._statements),
+            "executions": executions,
+            "prepares": prepares,
+            "reuses": executions - prepares,
+            "reuse_ratio": (executions - prepares) / executions if executions else 0.0,
+        }
+
+    def top(self, n: int = 10) -> t.List[dict]:
+        with self._lock:
+            stats = [dict(item) for item in self._statements.values()]
+
+        return sorted(stats, key=lambda item: item["executions"], reverse=True)[:n]
+
+    def reset(self):
+        with self._lock:
+            self._statements.clear()
+
+
+prepared_stats = PreparedStats()
+
+
+def listen_prepared():
+    global _listening
+
+    if not _listening:
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(Engine, "handle_error", _handle_error)
+        event.listen(Engine, "rollback", _rollback)
+
+        _listening = True
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if (
+        executemany
+        or context is None
+        or not context.execution_options.get("prepared")
+        or conn.dialect.driver != "psycopg"
+    ):
+        return
+
+    driver_connection = conn.connection.driver_connection
+
+    # a threshold of 0 has psycopg prepare the statement on its first execution,
+    # later ones on the same connection run the server side statement again
+    conn.info[_THRESHOLD] = driver_connection.prepare_threshold
+    driver_connection.prepare_threshold = 0
+
+    keys = _prepared_keys(driver_connection)
+    conn.info[_PREPARED] = set(keys) if keys is not None else None
+
+
+def _after_cursor_execute(conn, cursor, statement, *args):
+    if _THRESHOLD not in conn.info:
+        return
+
+    driver_connection = conn.connection.driver_connection
+    before = conn.info.pop(_PREPARED)
+
+    _restore_threshold(conn)
+
+    if before is None:
+        # without the driver's cache, a statement already run on this connection
+        # since its last rollback counts as reused
+        executed = conn.info.setdefault(_EXECUTED, set())
+        prepared_stats.record(statement, reused=statement in executed)
+        executed.add(statement)
+
+        return
+
+    # psycopg's own cache tells whether the statement was prepared just now; it
+    # is emptied whenever the driver deallocates, e.g. on ROLLBACK or DDL
+    keys = _prepared_keys(driver_connection)
+
+    if keys:
+        prepared_stats.record(statement, reused=not (keys.keys() - before))
+
+
+def _prepared_keys(driver_connection) -> t.Optional[t.Mapping]:
+    global _warned
+
+    # private to psycopg, checked rather than trusted
+    keys = getattr(getattr(driver_connection, "_prepared", None), "_names", None)
+
+    if keys is None and not _warned:
+        warnings.warn(
+            "psycopg's prepared statement cache is not available, prepared_stats "
+            "estimates reuse from the statements executed on each connection.",
+            RuntimeWarning,
+        )
+        _warned = True
+
+    return keys
+
+
+def _rollback(conn):
+    # psycopg deallocates on rollback, so does the estimate
+    conn.info.pop(_EXECUTED, None)
+
+
+def _restore_threshold(conn):
+    if _THRESHOLD in conn.info:
+        conn.connection.driver_connection.prepare_threshold = conn.info.pop(_THRESHOLD)
+
+
+def _handle_error(exception_context):
+    connection = exception_context.connection
+
+    if connection is not None and not connection.invalidated:
+        connection.info.pop(_PREPARED, None)
+        _restore_threshold(connection)
@@ -0,0 +1,99 @@
+import itertools
+import threading
+import typing as t
+
+from sqlalchemy import Engine, Select, event
+from sqlalchemy.orm import Session
+
+
+class RoundRobinPolicy:
+    def __init__(self):
+        self._counter = itertools.count()
+
+    def select(self, replicas: t.Sequence[Engine]) -> Engine:
+        return replicas[next(self._counter) % len(replicas)]
+
+
+class LeastInFlightPolicy:
+    def __init__(self):
+        self._in_flight: t.Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def select(self, replicas: t.Sequence[Engine]) -> Engine:
+        for engine in replicas:
+            if id(engine) not in self._in_flight:
+                self._track(engine)
+
+        return min(replicas, key=lambda engine: self._in_flight[id(engine)])
+
+    def in_flight(self, engine: Engine) -> int:
+        return self._in_flight.get(id(engine), 0)
+
+    def _track(self, engine: Engine):
+        key = id(engine)
+
+        with self._lock:
+            if key in self._in_flight:
+                return
+
+            self._in_flight[key] = 0
+
+        def checkout(*args):
+            with self._lock:
+                self._in_flight[key] += 1
+
+        def checkin(*args):
+            with self._lock:
+                self._in_flight[key] -= 1
+
+        event.listen(engine, "checkout", checkout)
+        event.listen(engine, "checkin", checkin)
+
+
+class RoutingSession(Session):
+    def __init__(
+        self,
+        *args,
+        replicas: t.Sequence[Engine] = (),
+        policy: t.Optional[t.Any] = None,
+        **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+
+        self.replicas = tuple(replicas)
+        self.policy = policy or RoundRobinPolicy()
+        self.sticky = False
+
+    def get_bind(self, mapper=None, *, clause=None, use_primary=False, **kwargs):
+        primary = super().get_bind(mapper, clause=clause, **kwargs)
+
+        if not self.replicas or self.sticky or kwargs.get("bind") is not None:
+            return primary
+
+        # reads that must see writes committed by another session
+        if use_primary:
+            return primary
+
+        # after the first write every read of this scope sees our own writes
+        if self._flushing or (clause is not None and not _is_read(clause)):
+            self.sticky = True
+
+        if self.sticky or clause is None:
+            return primary
+
+        return self.policy.select(self.replicas)
+
+    def close(self):
+        super().close()
+
+        self.sticky = False
+
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _use_primary(state):
+    if state.execution_options.get("use_primary"):
+        state.bind_arguments["use_primary"] = True
+
+
+def _is_read(clause: t.Any) -> bool:
+    return isinstance(clause, Select) and clause._for_update_arg is None
@@ -4,3 +4,6 @@ class Scope:
 
     def apply(self, *args, **kwargs):
         raise NotImplementedError
+
+    def delete(self, instance) -> bool:
+        return False
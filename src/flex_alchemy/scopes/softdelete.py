@@ -1,29 +1,69 @@
-from datetime import datetime
+from sqlalchemy import Index, func, literal_column, update
+from sqlalchemy.sql import Update
 
-from sqlalchemy import update
 from . import Scope
-from ..builders.select import SelectBuilder
+from ..builders.base import BaseBuilder, BaseWhereBuilder
+from ..builders.delete import DeleteBuilder
 
 
 class SoftDeleteScope(Scope):
-    def __init__(self):
-        self._builder: SelectBuilder = None
+    name = "softdelete"
 
-    def boot(self, builder: SelectBuilder):
-        self._builder = builder
+    def __init__(self, column: str = "deleted_at"):
+        self.column = column
 
-        self._builder.macro("_delete_stmt", self._delete_stmt)
+    def boot(self, builder: BaseBuilder):
+        if not isinstance(builder, BaseWhereBuilder):
+            return
 
-    def apply(self, with_trashed: bool = False):
-        if not with_trashed:
-            self._builder.where(self._builder.get_model_class().deleted_at.is_(None))
+        builder.macro("with_trashed", self._with_trashed)
+        builder.macro("only_trashed", self._only_trashed)
 
-    def _delete_stmt(self):
-        stmt = update(self._builder.get_model_class())
+        if isinstance(builder, DeleteBuilder):
+            builder.macro("_delete_stmt", self._delete_stmt)
+            builder.macro("force_delete", self._force_delete)
 
-        if self._builder._where_clauses:
-            stmt = stmt.where(*self._builder._where_clauses)
+    def apply(self, builder: BaseWhereBuilder):
+        builder.where(self._column(builder).is_(None))
 
-        stmt = stmt.values(deleted_at=datetime.now())
+    def delete(self, instance) -> bool:
+        setattr(instance, self.column, func.now())
 
-        return stmt
+        return True
+
+    def _column(self, builder: BaseBuilder):
+        return getattr(builder._model, self.column)
+
+    def _with_trashed(self, builder: BaseWhereBuilder):
+        names = [name for name, scope in builder._scopes.items() if scope is self]
+
+        return builder.without_scope(*names)
+
+    def _only_trashed(self, builder: BaseWhereBuilder):
+        return self._with_trashed(builder).where(self._column(builder).is_not(None))
+
+    def _force_delete(self, builder: DeleteBuilder):
+        builder = builder._mutable()
+        builder._macros.pop("_delete_stmt", None)
+
+        return builder
+
+    def _delete_stmt(self, builder: DeleteBuilder) -> Update:
+        stmt = update(builder._model)
+
+        if builder._where_clauses:
+            stmt = stmt.where(*builder._where_clauses)
+
+        return stmt.values({self.column: func.now()})
+
+
+def partial_index(
+    name: str, *columns: str, column: str = "deleted_at", unique: bool = False
+) -> Index:
+    # matches the scope's `deleted_at IS NULL` filter, so the index stays small
+    # and the planner can use it for every scoped query
+    where = literal_column(column).is_(None)
+
+    return Index(
+        name, *columns, unique=unique, postgresql_where=where, sqlite_where=where
+    )
@@ -1,25 +1,218 @@
-from typing import Optional
-from sqlalchemy import Engine
-from sqlalchemy.orm import Session, sessionmaker, scoped_session
+from asyncio import current_task
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Iterator, Optional, Sequence
+from weakref import WeakSet
+from sqlalchemy import Dialect, Engine, event
+from sqlalchemy.orm import Mapper, Session, sessionmaker, scoped_session
 
 from .exceptions import SessionNotProvidedError
+from .nplusone import _HANDLER, NPlusOneDetector, listen_n_plus_one, query_stats
+from .prepared import listen_prepared
+from .routing import RoundRobinPolicy, RoutingSession
+
+if TYPE_CHECKING:
+    # sqlalchemy.ext.asyncio needs greenlet, which only the asyncio extra installs
+    from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_scoped_session
+
+_UNIT_OF_WORK = "flex_alchemy_unit_of_work"
+
+
+def in_unit_of_work(session: Any) -> bool:
+    return session.info.get(_UNIT_OF_WORK, 0) > 0
+
+
+def commit_loaded(session: Session, instance: Any):
+    if isinstance(session, scoped_session):
+        session = session()
+
+    if not session.expire_on_commit:
+        session.commit()
+        return
+
+    # the flush already loaded server generated values, keep them past the commit
+    session.expire_on_commit = False
+
+    try:
+        session.commit()
+    finally:
+        session.expire_on_commit = True
+
+    for obj in list(session.identity_map.values()):
+        if obj is not instance:
+            session.expire(obj)
+
+
+_EAGER_DEFAULTS: "WeakSet[Mapper]" = WeakSet()
+
+
+def _database_generated(column: Any) -> bool:
+    return (
+        column.server_default is not None
+        or column.server_onupdate is not None
+        or (column.default is not None and column.default.is_clause_element)
+        or (column.onupdate is not None and column.onupdate.is_clause_element)
+    )
+
+
+def _apply_eager_defaults(mapper: Mapper, dialect: Optional[Dialect]):
+    # without RETURNING the values would come back through one SELECT per row,
+    # leave them expired so they load on first access instead
+    if dialect is None or (dialect.insert_returning and dialect.update_returning):
+        mapper.eager_defaults = True
+    else:
+        mapper.eager_defaults = "auto"
+
+
+@event.listens_for(Mapper, "mapper_configured")
+def _eager_defaults(mapper: Mapper, class_: type):
+    # columns the database fills in come back through RETURNING instead of a
+    # refresh after commit; that costs an UPDATE per row, so mappers without
+    # them keep "auto" and their batched executemany UPDATEs
+    if (
+        issubclass(class_, ScopedSessionHandler)
+        and mapper.eager_defaults == "auto"
+        and any(_database_generated(column) for column in mapper.columns)
+    ):
+        _EAGER_DEFAULTS.add(mapper)
+        _apply_eager_defaults(mapper, class_._dialect)
 
 
 class ScopedSessionHandler:
     _session: Optional[scoped_session] = None
+    _async_session: Optional["async_scoped_session"] = None
+    _n_plus_one: Optional[NPlusOneDetector] = None
+    _prepared_statements: bool = False
+    _dialect: Optional[Dialect] = None
 
     @classmethod
-    def make_session(cls, engine: Engine):
-        if not isinstance(engine, Engine):
+    def make_session(
+        cls,
+        engine: Engine,
+        replicas: Optional[Sequence[Engine]] = None,
+        policy: Optional[Any] = None,
+    ):
+        if not all(isinstance(e, Engine) for e in (engine, *(replicas or ()))):
             raise ValueError("Only support Sqlalchemy Engine Object")
 
-        cls._session = scoped_session(sessionmaker(engine))
+        if replicas:
+            factory = sessionmaker(
+                engine,
+                class_=RoutingSession,
+                replicas=replicas,
+                policy=policy or RoundRobinPolicy(),
+                info={_HANDLER: cls},
+            )
+        else:
+            factory = sessionmaker(engine, info={_HANDLER: cls})
+
+        cls._session = scoped_session(factory)
+        cls._use_dialect(engine.dialect)
+
+    @classmethod
+    def make_async_session(
+        cls,
+        engine: "AsyncEngine",
+        replicas: Optional[Sequence["AsyncEngine"]] = None,
+        policy: Optional[Any] = None,
+    ):
+        from sqlalchemy.ext.asyncio import (
+            AsyncEngine,
+            async_scoped_session,
+            async_sessionmaker,
+        )
+
+        if not all(isinstance(e, AsyncEngine) for e in (engine, *(replicas or ()))):
+            raise ValueError("Only support Sqlalchemy AsyncEngine Object")
+
+        if replicas:
+            factory = async_sessionmaker(
+                engine,
+                expire_on_commit=False,
+                sync_session_class=RoutingSession,
+                replicas=[replica.sync_engine for replica in replicas],
+                policy=policy or RoundRobinPolicy(),
+                info={_HANDLER: cls},
+            )
+        else:
+            factory = async_sessionmaker(
+                engine, expire_on_commit=False, info={_HANDLER: cls}
+            )
+
+        # one AsyncSession per asyncio task, tasks never share a session
+        cls._async_session = async_scoped_session(factory, scopefunc=current_task)
+        cls._use_dialect(engine.sync_engine.dialect)
+
+    @classmethod
+    def _use_dialect(cls, dialect: Dialect):
+        cls._dialect = dialect
+
+        for mapper in list(_EAGER_DEFAULTS):
+            if issubclass(mapper.class_, cls):
+                _apply_eager_defaults(mapper, dialect)
+
+    @classmethod
+    def detect_n_plus_one(
+        cls,
+        mode: str = "warn",
+        threshold: int = 5,
+        sample_rate: float = 1.0,
+        enable: bool = True,
+    ):
+        listen_n_plus_one()
+
+        cls._n_plus_one = (
+            NPlusOneDetector(mode, threshold, sample_rate) if enable else None
+        )
+
+    @classmethod
+    def prepare_statements(cls, enable: bool = True):
+        cls._prepared_statements = enable
+
+        if enable:
+            listen_prepared()
+
+    @classmethod
+    def query_stats(cls, session: Optional[Session] = None) -> Optional[dict]:
+        return query_stats(
+            cls.get_session(session or cls._session or cls._async_session)
+        )
 
     @classmethod
     def teardown_session(cls):
         if cls._session:
             cls._session.remove()
 
+    @classmethod
+    async def teardown_async_session(cls):
+        if cls._async_session:
+            await cls._async_session.remove()
+
+    @classmethod
+    @contextmanager
+    def transaction(cls, session: Optional[Session] = None) -> Iterator[Session]:
+        session = cls.get_session(session)
+        depth = session.info.get(_UNIT_OF_WORK, 0)
+
+        # nested blocks join the outermost one, which owns the single commit
+        session.info[_UNIT_OF_WORK] = depth + 1
+
+        try:
+            yield session
+
+            if not depth:
+                session.commit()
+
+        except Exception as e:
+            if not depth:
+                session.rollback()
+
+            raise e
+
+        finally:
+            session.info[_UNIT_OF_WORK] = depth
+
+    unit_of_work = transaction
+
     @classmethod
     def get_session(cls, session: Optional[Session] = None) -> Session:
         session = session or cls._session
@@ -28,3 +221,14 @@ class ScopedSessionHandler:
             raise SessionNotProvidedError
 
         return session
+
+    @classmethod
+    def get_async_session(
+        cls, session: Optional["AsyncSession"] = None
+    ) -> "AsyncSession":
+        session = session or cls._async_session
+
+        if not session:
+            raise SessionNotProvidedError
+
+        return session
@@ -0,0 +1,34 @@
+import typing as t
+
+from itertools import islice
+
+_T = t.TypeVar("_T")
+
+# upper bound of bound parameters a single statement may carry, per dialect
+BIND_PARAM_LIMITS = {
+    "sqlite": 999,
+    "postgresql": 32767,
+    "mysql": 65535,
+    "mariadb": 65535,
+    "mssql": 2100,
+    "oracle": 1000,
+}
+
+
+def max_bind_params(dialect_name: str) -> int:
+    return BIND_PARAM_LIMITS.get(dialect_name, 999)
+
+
+def chunked(iterable: t.Iterable[_T], size: int) -> t.Iterator[t.List[_T]]:
+    if size < 1:
+        raise ValueError("chunk size must be greater than 0.")
+
+    iterator = iter(iterable)
+
+    while True:
+        chunk = list(islice(iterator, size))
+
+        if not chunk:
+            return
+
+        yield chunk
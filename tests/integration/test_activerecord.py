@@ -1,6 +1,9 @@
+import pytest
 import sqlalchemy as sa
 
 from examples.models import User, Permission
+from examples.models._base import Base
+from flex_alchemy.explain import SlowQueryLog
 
 
 def test_select(seed_users):
@@ -32,6 +35,18 @@ def test_find(seed_users):
     assert not User.find(100)
 
 
+def test_find_many(seed_users):
+    users = User.find_many([5, 3, 100, 7])
+
+    assert [user.id for user in users] == [5, 3, 7]
+
+    users, missing = User.find_many([2, 100, 2, 200], with_missing=True)
+
+    assert [user.id for user in users] == [2, 2]
+    assert users[0] is users[1]
+    assert missing == [100, 200]
+
+
 def test_all(seed_users):
     users = User.all()
 
@@ -56,6 +71,154 @@ def test_create(faker):
     assert user.password == data["password"]
 
 
+def test_bulk_create(faker):
+    values = (
+        {"name": faker.name(), "email": faker.email(), "password": faker.password()}
+        for _ in range(25)
+    )
+
+    assert User.bulk_create(values, batch_size=10) == 25
+    assert len(User.all()) == 25
+
+
+def test_bulk_create_return_keys(faker):
+    values = [
+        {"name": faker.name(), "email": faker.email(), "password": faker.password()}
+        for _ in range(5)
+    ]
+
+    keys = User.bulk_create(values, batch_size=2, return_keys=True)
+
+    assert keys == [1, 2, 3, 4, 5]
+
+
+def test_bulk_create_return_instances(faker):
+    values = [
+        {"name": faker.name(), "email": faker.email(), "password": faker.password()}
+        for _ in range(5)
+    ]
+
+    users = User.bulk_create(values, batch_size=2, return_instances=True)
+
+    assert len(users) == 5
+
+    for user, value in zip(users, values):
+        assert isinstance(user, User)
+        assert user.email == value["email"]
+        assert user.created_at is not None
+
+
+def test_each(seed_users):
+    users = list(User.each(batch_size=3))
+
+    assert len(users) == 10
+    assert all(isinstance(user, User) for user in users)
+    assert len(User._session.identity_map) == 0
+
+
+def test_chunk(seed_users):
+    chunks = list(User.chunk(batch_size=4))
+
+    assert [len(chunk) for chunk in chunks] == [4, 4, 2]
+
+
+def test_stream_with_where(seed_users):
+    users = list(User.where(User.enable.is_(True)).stream(batch_size=2))
+
+    assert len(users) == 5
+    assert all(user.enable for user in users)
+
+
+def test_cursor_paginate(seed_users):
+    page = User.cursor_paginate(per_page=4)
+
+    assert [user.id for user in page["data"]] == [1, 2, 3, 4]
+    assert page["has_more"]
+
+    page = User.cursor_paginate(per_page=4, after=page["next_cursor"])
+    assert [user.id for user in page["data"]] == [5, 6, 7, 8]
+
+    page = User.cursor_paginate(per_page=4, after=page["next_cursor"])
+    assert [user.id for user in page["data"]] == [9, 10]
+    assert not page["has_more"]
+    assert page["next_cursor"] is None
+
+
+def test_cursor_paginate_mixed_order(seed_users):
+    expected = [
+        user.id
+        for user in User.order_by(User.enable.desc(), User.id.asc())
+        .execute()
+        .scalars()
+    ]
+
+    ids, after = [], None
+
+    while True:
+        page = User.order_by(User.enable.desc()).cursor_paginate(3, after=after)
+        ids += [user.id for user in page["data"]]
+        after = page["next_cursor"]
+
+        if not after:
+            break
+
+    assert ids == expected
+
+
+def test_cursor_paginate_nullable_order(seed_users):
+    User.update(created_at=None).where(User.id.in_([2, 5, 6, 9])).execute()
+
+    ids, after = [], None
+
+    while True:
+        page = User.order_by(User.created_at.desc()).cursor_paginate(3, after=after)
+        ids += [user.id for user in page["data"]]
+        after = page["next_cursor"]
+
+        if not after:
+            break
+
+    # NULLs come last, ordered by primary key
+    assert ids[-4:] == [2, 5, 6, 9]
+    assert sorted(ids) == list(range(1, 11))
+
+
+def test_cursor_paginate_needs_key_columns(seed_users):
+    with pytest.raises(ValueError, match="among the selected columns"):
+        User.select(User.name).cursor_paginate(3)
+
+    page = User.select(User, User.name).cursor_paginate(3)
+
+    assert [row[0].id for row in page["data"]] == [1, 2, 3]
+
+
+def test_paginate(seed_users):
+    paginate = User.paginate(page=2, per_page=4)
+
+    assert paginate["total"] == 10
+    assert paginate["current_page"] == 2
+    assert paginate["last_page"] == 3
+    assert [user.id for user in paginate["data"]] == [5, 6, 7, 8]
+
+
+def test_paginate_with_where(seed_users):
+    builder = User.where(User.enable.is_(True)).order_by(User.id)
+
+    for count in ("exact", "cached"):
+        paginate = builder.paginate(page=1, per_page=4, count=count)
+
+        assert paginate["total"] == 5
+        assert paginate["last_page"] == 2
+        assert all(user.enable for user in paginate["data"])
+
+
+def test_paginate_estimate(seed_users):
+    paginate = User.where(User.enable.is_(True)).paginate(count="estimate")
+
+    assert isinstance(paginate["total"], int)
+    assert len(paginate["data"]) == 5
+
+
 def test_where(seed_users):
     users = User.where(User.enable.is_(True)).execute().scalars().all()
 
@@ -223,3 +386,546 @@ def test_execute(faker):
     assert user.name == name
     assert user.email == email
     assert user.password == password
+
+
+def test_cached_where(seed_users):
+    from flex_alchemy.builders.select import SelectBuilder
+
+    SelectBuilder.statement_cache.clear()
+
+    for user in User.all():
+        found = User.where(User.email == user.email).cached().execute().scalars().one()
+
+        assert found.id == user.id
+
+    assert SelectBuilder.statement_cache.misses == 1
+    assert SelectBuilder.statement_cache.hits == 9
+
+
+def test_cache_invalidation(engine, seed_users):
+    statements = []
+
+    def listener(conn, cursor, statement, *args):
+        statements.append(statement.split()[0])
+
+    def names():
+        builder = User.select(User.name).where(User.id == 1).cache(ttl=60)
+
+        return builder.execute().scalars().one()
+
+    sa.event.listen(engine, "before_cursor_execute", listener)
+
+    try:
+        name = names()
+
+        assert names() == name
+        assert statements == ["SELECT"]
+
+        User.update(name="cached").where(User.id == 1).execute()
+
+        assert names() == "cached"
+
+        user = User.find(1)
+        user.name = "saved"
+        user.save()
+
+        assert names() == "saved"
+
+        user.delete()
+
+        assert User.where(User.id == 1).cache().execute().scalars().all() == []
+    finally:
+        sa.event.remove(engine, "before_cursor_execute", listener)
+
+
+def test_cache_returns_instances(seed_users):
+    users = User.where(User.id <= 3).cache().execute().scalars().all()
+    cached = User.where(User.id <= 3).cache().execute().scalars().all()
+
+    assert [user.id for user in cached] == [user.id for user in users]
+    assert all(isinstance(user, User) for user in cached)
+
+
+@pytest.fixture
+def seed_user_permissions(seed_users, seed_permissions):
+    users = User.all()
+    permissions = Permission.all()
+
+    for user in users:
+        user.permissions = permissions[: user.id % 3 + 1]
+
+    Base._session.commit()
+    Base.teardown_session()
+
+
+def test_with_eager_loading(engine, seed_user_permissions):
+    statements = []
+
+    def listener(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    sa.event.listen(engine, "before_cursor_execute", listener)
+
+    try:
+        users = User.with_("permissions", "permissions.users").execute().scalars().all()
+
+        assert [len(user.permissions) for user in users] == [
+            user.id % 3 + 1 for user in users
+        ]
+        assert all(len(p.users) for user in users for p in user.permissions)
+        assert len(statements) == 3
+    finally:
+        sa.event.remove(engine, "before_cursor_execute", listener)
+
+
+def test_with_strict_eager_loading(seed_user_permissions):
+    user = User.with_("permissions", strict=True).execute().scalars().first()
+
+    assert user.permissions
+
+    with pytest.raises(sa.exc.InvalidRequestError):
+        user.permissions[0].users
+
+
+def test_prevent_lazy_loading(seed_user_permissions):
+    from flex_alchemy.exceptions import LazyLoadError
+
+    Base.prevent_lazy_loading()
+
+    try:
+        assert User.with_("permissions").execute().scalars().first().permissions
+
+        with pytest.raises(LazyLoadError):
+            User.find(2).permissions
+    finally:
+        Base.prevent_lazy_loading(False)
+
+    assert User.find(3).permissions
+
+
+def test_detect_n_plus_one(seed_user_permissions):
+    from flex_alchemy.exceptions import NPlusOneError
+
+    Base.detect_n_plus_one(mode="raise", threshold=3)
+
+    try:
+        users = User.with_("permissions").execute().scalars().all()
+
+        assert all(user.permissions for user in users)
+        assert Base.query_stats() == {"statements": 2, "reports": []}
+
+        Base.teardown_session()
+
+        with pytest.raises(NPlusOneError) as exc_info:
+            for user in User.all():
+                user.permissions
+
+        assert exc_info.value.report.relationship == "permissions"
+        assert Base.query_stats()["statements"] == 4
+    finally:
+        Base.detect_n_plus_one(enable=False)
+
+
+def test_upsert(seed_users):
+    users = User.order_by(User.id).limit(2).execute().scalars().all()
+    rows = [
+        {"name": "upserted", "email": user.email, "password": "secret"}
+        for user in users
+    ]
+    rows.append({"name": "new", "email": "new@example.com", "password": "secret"})
+
+    keys = User.upsert(rows, conflict=["email"], return_keys=True)
+
+    assert keys[:2] == [user.id for user in users]
+    assert User.where(User.name == "upserted").count() == 2
+    assert User.find(keys[2]).email == "new@example.com"
+
+
+def test_upsert_do_nothing(seed_users):
+    user = User.first()
+    rows = [{"name": "ignored", "email": user.email, "password": "secret"}]
+
+    assert User.upsert(rows, conflict=["email"], update=[]) == 0
+    assert User.find(user.id).name != "ignored"
+
+
+def test_bulk_load(faker):
+    rows = [
+        {
+            "name": faker.name(),
+            "email": f"{num}-{faker.email()}",
+            "password": faker.password(),
+            "enable": num % 2 == 0,
+        }
+        for num in range(100)
+    ]
+
+    stats = User.bulk_load(row for row in rows)
+
+    assert stats["rows"] == 100
+    assert stats["method"] == "copy"
+    assert User.where(User.enable.is_(True)).count() == 50
+
+
+def test_bulk_load_with_defaults(faker):
+    rows = [(faker.name(), f"{num}-{faker.email()}", "secret") for num in range(10)]
+
+    User.bulk_load(rows, columns=["name", "email", "password"])
+
+    assert User.where(User.password == "secret", User.enable.is_(True)).count() == 10
+
+    # SQL expression defaults are filled in too, the same as an INSERT would
+    assert User.where(User.password == "secret", User.created_at.is_(None)).count() == 0
+
+
+def test_async_copy_from(engine, faker):
+    import asyncio
+
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+    from flex_alchemy.builders.asyncio import AsyncInsertBuilder
+
+    rows = [(faker.name(), f"{num}-{faker.email()}", "async") for num in range(10)]
+
+    async def load():
+        async_engine = create_async_engine(engine.url)
+
+        try:
+            async with AsyncSession(async_engine) as session:
+                return await AsyncInsertBuilder(User).copy_from(
+                    rows, ["name", "email", "password"], session=session
+                )
+        finally:
+            await async_engine.dispose()
+
+    stats = asyncio.run(load())
+
+    assert stats["rows"] == 10
+    assert stats["method"] == "copy"
+    assert User.where(User.password == "async").count() == 10
+
+
+def test_copy_rows_uses_column_types(engine):
+    from datetime import time, timezone
+
+    from flex_alchemy.bulk import copy_rows
+
+    table = sa.Table(
+        "copy_readings",
+        sa.MetaData(),
+        sa.Column("value", sa.REAL()),
+        sa.Column("taken_at", sa.Time(timezone=True)),
+        sa.Column("ratio", sa.Float()),
+    )
+    taken_at = time(9, 30, tzinfo=timezone.utc)
+
+    with engine.begin() as connection:
+        table.create(connection)
+
+        try:
+            stats = copy_rows(
+                connection, list(table.columns), [(1.5, taken_at, 0.25)] * 3
+            )
+
+            assert stats["rows"] == 3
+            assert (
+                connection.execute(sa.select(table)).all()
+                == [(1.5, taken_at, 0.25)] * 3
+            )
+        finally:
+            table.drop(connection)
+
+
+def test_transaction(engine, seed_users):
+    statements = []
+
+    def listener(conn, cursor, statement, *args):
+        statements.append(statement.split()[0])
+
+    sa.event.listen(engine, "before_cursor_execute", listener)
+
+    try:
+        with Base.transaction():
+            users = User.order_by(User.id).limit(3).execute().scalars().all()
+
+            for user in users:
+                user.name = "batched"
+                user.save()
+
+            users[0].delete()
+            Permission.create({"name": "staged"})
+
+        # no refresh per save, `updated_at` comes back through one UPDATE ...
+        # RETURNING per remaining user; the extra SELECT loads the
+        # user_permissions rows removed with the user
+        assert statements.count("SELECT") == 2
+        assert statements.count("UPDATE") == 2
+    finally:
+        sa.event.remove(engine, "before_cursor_execute", listener)
+
+    assert User.where(User.name == "batched").count() == 2
+    assert len(User.all()) == 9
+    assert Permission.where(Permission.name == "staged").count() == 1
+
+
+def test_transaction_save_assigns_primary_key(seed_user_permissions):
+    with pytest.raises(RuntimeError):
+        with Base.transaction():
+            permission = Permission(name="audit")
+            permission.save()
+
+            # flushed, not committed: the key is there for related rows
+            assert permission.id is not None
+
+            user = User.first()
+            user.permissions.append(permission)
+            user.save()
+
+            raise RuntimeError
+
+    assert Permission.where(Permission.name == "audit").count() == 0
+
+
+def test_transaction_rollback(seed_users):
+    with pytest.raises(RuntimeError):
+        with Base.unit_of_work():
+            user = User.first()
+            user.name = "rolled back"
+            user.save()
+
+            raise RuntimeError
+
+    assert User.where(User.name == "rolled back").count() == 0
+
+
+def test_save_fetches_server_defaults(engine):
+    statements = []
+
+    def listener(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    sa.event.listen(engine, "before_cursor_execute", listener)
+
+    try:
+        user = User(name="returning", email="returning@example.com", password="x")
+        user.save()
+
+        assert user.id and user.created_at
+        assert [statement.split()[0] for statement in statements] == ["INSERT"]
+        assert "RETURNING" in statements[0]
+
+        user.name = "updated"
+        user.save()
+
+        # the `onupdate=func.now()` value comes back with the UPDATE itself
+        assert user.name == "updated"
+        assert user.updated_at
+        assert [statement.split()[0] for statement in statements] == [
+            "INSERT",
+            "UPDATE",
+        ]
+        assert "RETURNING" in statements[1]
+    finally:
+        sa.event.remove(engine, "before_cursor_execute", listener)
+
+
+@pytest.mark.parametrize("strategy", ["values", "executemany"])
+def test_bulk_update(seed_users, strategy):
+    users = User.order_by(User.id).execute().scalars().all()
+    rows = [
+        {"id": user.id, "name": f"bulk-{user.id}", "enable": user.id % 2 == 0}
+        for user in users
+    ]
+    first_id = users[0].id
+    rows.append({"id": first_id, "password": "changed"})
+
+    assert User.bulk_update(rows, batch_size=4, strategy=strategy) == 11
+
+    Base.teardown_session()
+
+    for user in User.order_by(User.id).execute().scalars().all():
+        assert user.name == f"bulk-{user.id}"
+        assert user.enable is (user.id % 2 == 0)
+
+    assert User.find(first_id).password == "changed"
+
+
+def test_destroy_chunked(seed_users):
+    calls = []
+
+    total = (
+        User.destroy()
+        .where(User.enable.is_(False))
+        .execute_chunked(chunk_size=2, progress=lambda *args: calls.append(args))
+    )
+
+    assert total == 5
+    assert calls == [(1, 2), (2, 4), (3, 5)]
+    assert User.where(User.enable.is_(False)).count() == 0
+    assert User.where(User.enable.is_(True)).count() == 5
+
+
+def test_update_chunked(seed_users):
+    # rows keep matching the filter after the update, each one is touched once
+    total = (
+        User.update(name="backfilled")
+        .where(User.enable.is_(True))
+        .execute_chunked(chunk_size=2, sleep=0.01)
+    )
+
+    assert total == 5
+    assert User.where(User.name == "backfilled").count() == 5
+
+
+def test_query_events_count_rows(seed_users):
+    from flex_alchemy.instrumentation import add_sink, remove_sink
+
+    events = []
+    add_sink(events.append)
+
+    try:
+        users = User.where(User.id <= 3).execute().scalars()
+        count = User.update(name="renamed").where(User.id <= 2).execute()
+    finally:
+        remove_sink(events.append)
+
+    assert len(users.all()) == 3
+    assert count.rowcount == 2
+    assert [e.rows for e in events] == [3, 2]
+
+
+def test_explain_slow(seed_users):
+    log = SlowQueryLog(threshold=0, analyze=True, large_table_rows=10)
+
+    User.where(User.name.like("%a%")).explain_slow(log).execute().scalars().all()
+    User.where(User.id == 1).explain_slow(log).execute()
+
+    scan, lookup = log.records
+
+    assert scan.analyzed
+    assert scan.plan[0]["Plan"]["Node Type"] == "Seq Scan"
+    assert "Actual Rows" in scan.plan[0]["Plan"]
+    assert scan.seq_scans == ["users"]
+    assert lookup.seq_scans == []
+
+
+def test_failed_explain_keeps_transaction(monkeypatch, seed_users):
+    monkeypatch.setattr(
+        "flex_alchemy.explain.explain_prefix", lambda *args: "EXPLAIN BROKEN "
+    )
+    log = SlowQueryLog(threshold=0)
+
+    with Base.transaction():
+        User.update(name="explained").where(User.id == 1).explain_slow(log).execute()
+        User.update(name="explained").where(User.id == 2).execute()
+
+    assert log.records[0].plan is None
+    assert User.where(User.name == "explained").count() == 2
+
+
+def test_frozen_builder_shared_across_threads(seed_users):
+    from concurrent.futures import ThreadPoolExecutor
+
+    enabled = User.where(User.enable.is_(True)).order_by(User.id).freeze()
+
+    def names(user_id):
+        try:
+            return enabled.where(User.id <= user_id).as_dicts()
+        finally:
+            Base.teardown_session()
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(names, range(1, 11)))
+
+    # every other seeded user is enabled, starting with the first one
+    assert [len(rows) for rows in results] == [(num + 1) // 2 for num in range(1, 11)]
+    assert len(enabled._where_clauses) == 1
+
+
+def test_prepare_statements(engine, seed_users):
+    from sqlalchemy.orm import Session
+    from flex_alchemy.prepared import prepared_stats
+
+    # every checkout gets the same pooled connection
+    pooled = sa.create_engine(engine.url, pool_size=1, max_overflow=0)
+
+    Base.prepare_statements()
+    prepared_stats.reset()
+
+    try:
+        with Session(pooled) as session:
+            assert User.find(1, session=session).id == 1
+            assert User.where(User.id > 5).as_dicts(session=session)
+
+            session.commit()
+
+        with Session(pooled) as session:
+            assert User.find(1, session=session).id == 1
+
+            prepared = session.execute(
+                sa.text("SELECT statement FROM pg_prepared_statements")
+            )
+
+            assert len(prepared.all()) == 2
+
+            session.commit()
+
+        assert prepared_stats.info()["reuses"] == 1
+
+        # psycopg deallocates every statement when a transaction rolls back
+        with Session(pooled) as session:
+            User.find(1, session=session)
+
+        with Session(pooled) as session:
+            User.find(1, session=session)
+
+        assert prepared_stats.info() == {
+            "statements": 2,
+            "executions": 5,
+            "prepares": 3,
+            "reuses": 2,
+            "reuse_ratio": 0.4,
+        }
+    finally:
+        Base.prepare_statements(False)
+        pooled.dispose()
+
+
+def test_read_replica_routing(engine, seed_users):
+    replica = sa.create_engine(engine.url)
+    statements = []
+
+    def listener(name):
+        return lambda *args: statements.append((name, args[2].split()[0]))
+
+    listeners = [(engine, listener("primary")), (replica, listener("replica"))]
+
+    for bind, fn in listeners:
+        sa.event.listen(bind, "before_cursor_execute", fn)
+
+    Base.make_session(engine, replicas=[replica])
+
+    try:
+        assert len(User.all()) == 10
+        assert User.find(1)
+
+        user = User.first()
+        user.name = "replica"
+        user.save()
+
+        assert User.find(user.id).name == "replica"
+
+        assert statements == [
+            ("replica", "SELECT"),
+            ("replica", "SELECT"),
+            ("replica", "SELECT"),
+            ("primary", "UPDATE"),
+        ]
+    finally:
+        Base.teardown_session()
+        Base.make_session(engine)
+
+        for bind, fn in listeners:
+            sa.event.remove(bind, "before_cursor_execute", fn)
+
+        replica.dispose()
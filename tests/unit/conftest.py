@@ -0,0 +1,29 @@
+import pytest
+import sqlalchemy as sa
+
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+from flex_alchemy import ActiveRecord
+
+
+class Base(DeclarativeBase, ActiveRecord):
+    pass
+
+
+class Item(Base):
+    __tablename__ = "items"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    # attribute and column names differ on purpose
+    name: Mapped[str] = mapped_column("item_name", sa.String(50))
+
+
+@pytest.fixture
+def engine() -> sa.Engine:
+    engine = sa.create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    Base.make_session(engine)
+
+    yield engine
+
+    Base.teardown_session()
@@ -0,0 +1,212 @@
+import asyncio
+import typing as t
+import pytest
+
+import sqlalchemy as sa
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from flex_alchemy import AsyncActiveRecord
+
+
+class Base(DeclarativeBase, AsyncActiveRecord):
+    pass
+
+
+class Article(Base):
+    __tablename__ = "articles"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    title: Mapped[str] = mapped_column(sa.String(50))
+    published: Mapped[bool] = mapped_column(sa.Boolean(), default=False)
+    created_at: Mapped[t.Optional[sa.DateTime]] = mapped_column(
+        sa.DateTime(), server_default=sa.func.now()
+    )
+
+
+def run(coro_fn: t.Callable[[], t.Awaitable]):
+    async def main():
+        engine = create_async_engine("sqlite+aiosqlite://")
+
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+        Base.make_async_session(engine)
+
+        try:
+            return await coro_fn()
+        finally:
+            await Base.teardown_async_session()
+            await engine.dispose()
+
+    return asyncio.run(main())
+
+
+async def seed_articles():
+    await Article.insert(
+        [{"title": f"article {num}", "published": num % 2 == 0} for num in range(10)]
+    ).execute()
+
+
+def test_make_async_session_with_invalid_engine():
+    with pytest.raises(ValueError):
+        Base.make_async_session(sa.create_engine("sqlite://"))
+
+
+def test_create_and_find():
+    async def scenario():
+        article = await Article.create({"title": "hello"})
+
+        assert article.id == 1
+        assert article.created_at is not None
+
+        found = await Article.find(1)
+
+        assert found.title == "hello"
+        assert await Article.find(100) is None
+
+    run(scenario)
+
+
+def test_find_many():
+    async def scenario():
+        await seed_articles()
+
+        articles, missing = await Article.find_many([4, 100, 2], with_missing=True)
+
+        assert [article.id for article in articles] == [4, 2]
+        assert missing == [100]
+
+    run(scenario)
+
+
+def test_first_and_all():
+    async def scenario():
+        await seed_articles()
+
+        assert isinstance(await Article.first(), Article)
+        assert len(await Article.all()) == 10
+
+    run(scenario)
+
+
+def test_where():
+    async def scenario():
+        await seed_articles()
+
+        result = await Article.where(Article.published.is_(True)).execute()
+        articles = result.scalars().all()
+
+        assert len(articles) == 5
+        assert all(article.published for article in articles)
+
+    run(scenario)
+
+
+def test_update_and_destroy():
+    async def scenario():
+        await seed_articles()
+
+        await Article.update(title="updated").where(Article.id <= 3).execute()
+        await Article.destroy().where(Article.published.is_(False)).execute()
+
+        articles = await Article.all()
+
+        assert len(articles) == 5
+        assert [article.title for article in articles][:2] == ["updated", "updated"]
+
+    run(scenario)
+
+
+def test_execute_chunked():
+    async def scenario():
+        await seed_articles()
+
+        calls = []
+        updated = await (
+            Article.update(title="chunked")
+            .where(Article.published.is_(True))
+            .execute_chunked(
+                chunk_size=2, sleep=0.01, progress=lambda *args: calls.append(args)
+            )
+        )
+        deleted = await Article.destroy().execute_chunked(chunk_size=4)
+
+        assert updated == 5
+        assert calls == [(1, 2), (2, 4), (3, 5)]
+        assert deleted == 10
+        assert await Article.all() == []
+
+    run(scenario)
+
+
+def test_bulk_load():
+    async def scenario():
+        rows = [(f"article {num}", num % 2 == 0) for num in range(10)]
+
+        stats = await Article.bulk_load(rows, columns=["title", "published"])
+
+        assert stats["rows"] == 10
+        assert stats["method"] == "executemany"
+        assert await Article.where(Article.published.is_(True)).count() == 5
+
+    run(scenario)
+
+
+def test_save_and_delete():
+    async def scenario():
+        await seed_articles()
+
+        article = await Article.find(1)
+        article.title = "renamed"
+        await article.save()
+
+        assert (await Article.find(1)).title == "renamed"
+
+        await article.delete()
+
+        assert len(await Article.all()) == 9
+
+    run(scenario)
+
+
+def test_save_in_transaction_assigns_primary_key():
+    async def scenario():
+        with pytest.raises(RuntimeError):
+            async with Base.transaction():
+                article = Article(title="draft")
+                await article.save()
+
+                assert article.id == 1
+
+                raise RuntimeError
+
+        assert await Article.all() == []
+
+    run(scenario)
+
+
+def test_stream_and_paginate():
+    async def scenario():
+        await seed_articles()
+
+        chunks = [chunk async for chunk in Article.order_by(Article.id).chunk(4)]
+        assert [len(chunk) for chunk in chunks] == [4, 4, 2]
+
+        paginate = await Article.order_by(Article.id).paginate(2, 4)
+        assert paginate["total"] == 10
+        assert [article.id for article in paginate["data"]] == [5, 6, 7, 8]
+
+    run(scenario)
+
+
+def test_session_per_task():
+    async def scenario():
+        async def current_session():
+            return Base._async_session()
+
+        sessions = await asyncio.gather(*(current_session() for _ in range(3)))
+
+        assert len({id(session) for session in sessions}) == 3
+
+    run(scenario)
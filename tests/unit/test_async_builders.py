@@ -0,0 +1,87 @@
+import asyncio
+import pytest
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.dml import Delete, Insert, Update
+
+from flex_alchemy.builders.asyncio import (
+    AsyncSelectBuilder,
+    AsyncInsertBuilder,
+    AsyncUpdateBuilder,
+    AsyncDeleteBuilder,
+)
+from flex_alchemy.exceptions import SessionNotProvidedError
+
+from examples.models import User
+
+
+@pytest.fixture
+def session(mocker):
+    return mocker.AsyncMock(spec=AsyncSession, info={})
+
+
+def test_select_execute(faker, session):
+    builder = AsyncSelectBuilder(User, session=session)
+
+    asyncio.run(builder.where(User.email == faker.email()).execute())
+
+    session.execute.assert_awaited_once()
+    assert isinstance(session.execute.call_args.args[0], Select)
+
+
+def test_select_cached_execute(faker, session):
+    email = faker.email()
+
+    builder = AsyncSelectBuilder(User, session=session)
+
+    asyncio.run(builder.where(User.email == email).cached().execute())
+
+    _, params = session.execute.call_args.args
+    assert params == {"fa_0": email}
+
+
+def test_select_count(mocker, session):
+    session.run_sync.return_value = 10
+
+    count = asyncio.run(AsyncSelectBuilder(User, session=session).count())
+
+    assert count == 10
+    session.run_sync.assert_awaited_once()
+
+
+def test_insert_execute(faker, session):
+    builder = AsyncInsertBuilder(User, session=session)
+
+    asyncio.run(builder.values(name=faker.name()).execute())
+
+    session.execute.assert_awaited_once()
+    session.commit.assert_awaited_once()
+    assert isinstance(session.execute.call_args.args[0], Insert)
+
+
+def test_update_execute_not_commit(faker, session):
+    builder = AsyncUpdateBuilder(User, session=session)
+
+    asyncio.run(builder.values(name=faker.name()).execute(commit=False))
+
+    session.execute.assert_awaited_once()
+    session.commit.assert_not_awaited()
+    assert isinstance(session.execute.call_args.args[0], Update)
+
+
+def test_delete_execute(faker, session):
+    builder = AsyncDeleteBuilder(User, session=session)
+
+    asyncio.run(builder.where(User.email == faker.email()).execute())
+
+    session.execute.assert_awaited_once()
+    session.commit.assert_awaited_once()
+    assert isinstance(session.execute.call_args.args[0], Delete)
+
+
+def test_execute_without_session(faker):
+    builder = AsyncSelectBuilder(User)
+
+    with pytest.raises(SessionNotProvidedError):
+        asyncio.run(builder.where(User.email == faker.email()).execute())
@@ -0,0 +1,46 @@
+import json
+
+from benchmarks import compare, run
+
+
+def test_run_writes_json_report(tmp_path):
+    output = tmp_path / "benchmark.json"
+
+    run.main(
+        [
+            "--backends",
+            "sqlite-memory",
+            "--sizes",
+            "10",
+            "--repeat",
+            "1",
+            "--iterations",
+            "5",
+            "--operations",
+            "5",
+            "--output",
+            str(output),
+        ]
+    )
+
+    report = json.loads(output.read_text())
+    names = {(result["group"], result["name"]) for result in report["results"]}
+
+    assert report["meta"]["sizes"] == [10]
+    assert {("builders", "select"), ("crud", "find"), ("crud", "delete")} <= names
+    assert {("bulk", "bulk_load"), ("hydration", "orm")} <= names
+    assert all(result["seconds"] > 0 for result in report["results"])
+
+
+def test_compare_flags_regressions():
+    result = {"backend": "sqlite-memory", "group": "crud", "name": "find", "size": None}
+    key = ("sqlite-memory", "crud", "find", None)
+
+    rows = compare.compare(
+        {key: {**result, "per_op_us": 100.0}},
+        {key: {**result, "per_op_us": 125.0}},
+        tolerance=0.2,
+    )
+
+    assert rows[0]["regression"]
+    assert rows[0]["ratio"] == 1.25
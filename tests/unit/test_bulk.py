@@ -0,0 +1,141 @@
+import itertools
+import pytest
+
+import sqlalchemy as sa
+
+from flex_alchemy.bulk import (
+    _binary_type,
+    column_defaults,
+    copy_rows,
+    row_values,
+    values_updates,
+)
+
+
+@pytest.fixture
+def table() -> sa.Table:
+    return sa.Table(
+        "events",
+        sa.MetaData(),
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("name", sa.String(20)),
+    )
+
+
+def test_row_values_from_dicts():
+    keys, values = row_values(({"id": i, "name": str(i)} for i in range(3)))
+
+    assert keys == ["id", "name"]
+    assert list(values) == [(0, "0"), (1, "1"), (2, "2")]
+
+
+def test_row_values_from_tuples():
+    keys, values = row_values([(1, "a")], ["id", "name"])
+
+    assert keys == ["id", "name"]
+    assert list(values) == [(1, "a")]
+
+    with pytest.raises(ValueError):
+        row_values([(1, "a")])
+
+
+def test_row_values_empty():
+    keys, values = row_values([])
+
+    assert keys == []
+    assert list(values) == []
+
+
+def test_binary_type():
+    psycopg = pytest.importorskip("psycopg")
+
+    from sqlalchemy.dialects import postgresql
+
+    def oid(type_):
+        return _binary_type(type_, postgresql.dialect(), psycopg.adapters.types)
+
+    assert oid(sa.BigInteger()) == 20
+    assert oid(sa.String(20)) == 1043
+    assert oid(sa.REAL()) == 700
+    assert oid(sa.Double()) == 701
+    assert oid(sa.Time(timezone=True)) == 1266
+    assert oid(sa.DateTime(timezone=True)) == 1184
+    assert oid(sa.Numeric(10, 2)) == 1700
+
+    # types the binary format cannot pick safely go through text COPY
+    assert oid(sa.Float()) is None
+    assert oid(sa.ARRAY(sa.Integer())) is None
+    assert oid(sa.Enum("a", "b", name="choice")) is None
+    assert oid(sa.JSON()) is None
+
+
+def test_copy_rows_falls_back_to_executemany(table: sa.Table):
+    engine = sa.create_engine("sqlite://")
+    table.metadata.create_all(engine)
+
+    with engine.begin() as connection:
+        stats = copy_rows(
+            connection,
+            [table.c.id, table.c.name],
+            ((i, f"event-{i}") for i in range(25)),
+            batch_size=10,
+        )
+
+        assert stats["rows"] == 25
+        assert stats["method"] == "executemany"
+        assert stats["rows_per_second"] > 0
+        assert connection.scalar(sa.select(sa.func.count()).select_from(table)) == 25
+
+
+def test_column_defaults():
+    from datetime import datetime
+
+    columns = {
+        "id": sa.Column("id", sa.Integer, primary_key=True),
+        "enabled": sa.Column("enable", sa.Boolean, default=True),
+        "created_at": sa.Column("created_at", sa.DateTime, default=sa.func.now()),
+        "token": sa.Column("token", sa.Integer, default=itertools.count().__next__),
+    }
+
+    with sa.create_engine("sqlite://").connect() as connection:
+        defaults = column_defaults(connection, columns, ["id"])
+
+        assert column_defaults(connection, columns, list(columns)) == {}
+
+    # keyed by attribute name, like the rows, not by column name
+    assert list(defaults) == ["enabled", "created_at", "token"]
+    assert defaults["enabled"]() is True
+    assert isinstance(defaults["created_at"](), datetime)
+    assert defaults["created_at"]() == defaults["created_at"]()
+    assert [defaults["token"]() for _ in range(3)] == [0, 1, 2]
+
+
+def test_values_updates():
+    from sqlalchemy.dialects import postgresql
+
+    from examples.models import User
+
+    rows = [{"id": 1, "name": "a"}, {"id": 2, "name": "b"}, {"id": 3, "enable": True}]
+    statements = [
+        str(stmt.compile(dialect=postgresql.dialect()))
+        for stmt in values_updates(sa.inspect(User), rows, max_params=3)
+    ]
+
+    # 2 bind params per row leave room for a single row per statement
+    assert len(statements) == 3
+    assert "SET name=CAST(data.name AS VARCHAR(50))" in statements[0]
+    assert "AS data (id, name) WHERE users.id = data.id" in statements[0]
+    assert "SET enable=CAST(data.enable AS BOOLEAN)" in statements[2]
+
+    with pytest.raises(ValueError):
+        list(values_updates(sa.inspect(User), [{"name": "a"}], max_params=999))
+
+
+def test_values_updates_skips_primary_key_only_rows():
+    from examples.models import User
+
+    rows = [{"id": 1}, {"id": 2, "name": "b"}, {"id": 3}]
+    statements = list(values_updates(sa.inspect(User), rows, max_params=999))
+
+    assert len(statements) == 1
+    assert "SET name=" in str(statements[0])
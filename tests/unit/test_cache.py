@@ -0,0 +1,181 @@
+import os
+import subprocess
+import sys
+
+import sqlalchemy as sa
+
+from flex_alchemy.builders.cache import (
+    LRUCache,
+    QueryCache,
+    _query_caches,
+    dependent_tables,
+)
+from .conftest import Item
+
+
+def test_get_and_set(faker):
+    cache = LRUCache()
+    value = faker.pyint()
+
+    assert cache.get("key") is None
+
+    cache.set("key", value)
+
+    assert cache.get("key") == value
+    assert cache.info() == {"hits": 1, "misses": 1, "size": 1, "maxsize": 512}
+
+
+def test_evict_least_recently_used():
+    cache = LRUCache(maxsize=2)
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_expire_entries(mocker):
+    monotonic = mocker.patch("flex_alchemy.builders.cache.time.monotonic")
+    monotonic.return_value = 100.0
+
+    cache = LRUCache(ttl=10)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=30)
+
+    monotonic.return_value = 115.0
+
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    assert len(cache) == 1
+
+
+def test_clear():
+    cache = LRUCache()
+    cache.set("a", 1)
+    cache.get("a")
+
+    cache.clear()
+
+    assert len(cache) == 0
+    assert cache.hits == 0
+    assert cache.misses == 0
+
+
+def test_query_cache_with_dict_store():
+    store = {}
+    cache = QueryCache(store=store)
+
+    key = cache.key_for("users", ["users"])
+
+    assert cache.get(key) is None
+
+    cache.set(key, "frozen")
+
+    assert cache.get(key) == "frozen"
+    assert cache.info() == {"hits": 1, "misses": 1}
+    assert "flex_alchemy:table:users" in store
+
+
+def test_query_cache_invalidate():
+    cache = QueryCache(store={})
+
+    users = cache.key_for("users", ["users"])
+    permissions = cache.key_for("permissions", ["permissions"])
+
+    cache.set(users, "users")
+    cache.set(permissions, "permissions")
+    cache.invalidate("users")
+
+    assert cache.get(cache.key_for("users", ["users"])) is None
+    assert cache.get(cache.key_for("permissions", ["permissions"])) == "permissions"
+
+
+def test_query_cache_expire_entries(mocker):
+    cache = QueryCache(store={}, ttl=10)
+    clock = mocker.patch("flex_alchemy.builders.cache.time.time", return_value=100)
+
+    key = cache.key_for("users", ["users"])
+    cache.set(key, "frozen")
+
+    clock.return_value = 111
+
+    assert cache.get(key) is None
+
+
+def test_write_only_cache_invalidates_shared_store(engine: sa.Engine):
+    store = {}
+    reader = QueryCache(store=store)
+
+    key = reader.key_for("items", ["items"])
+    reader.set(key, "frozen")
+
+    # the reader lives in another process, only the writer's cache sees commits
+    _query_caches.discard(reader)
+    writer = QueryCache(store=store)
+
+    Item.create({"name": "written"})
+
+    assert reader.get(reader.key_for("items", ["items"])) is None
+    assert writer.info() == {"hits": 0, "misses": 0}
+
+
+def test_listeners_registered_on_first_cache():
+    script = """
+import sqlalchemy as sa
+from sqlalchemy.orm import Session
+
+from flex_alchemy.builders.cache import _after_flush
+from flex_alchemy.builders.select import SelectBuilder
+from examples.models import User
+
+assert SelectBuilder.query_cache is None
+assert not sa.event.contains(Session, "after_flush", _after_flush)
+
+User.where(User.id == 1).cache()
+
+assert SelectBuilder.query_cache is not None
+assert sa.event.contains(Session, "after_flush", _after_flush)
+"""
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+    )
+
+    assert result.returncode == 0, result.stderr
+
+
+def test_cache_hit_skips_compile(mocker, engine: sa.Engine):
+    Item.bulk_create([{"name": "first"}, {"name": "second"}])
+
+    def items(after: int) -> list:
+        return Item.where(Item.id > after).cache().execute().scalars().all()
+
+    assert len(items(0)) == 2
+
+    compile = mocker.spy(sa.sql.Select, "compile")
+
+    assert len(items(0)) == 2
+    assert len(items(1)) == 1
+
+    # a new bound value, not a new statement shape
+    compile.assert_not_called()
+
+
+def test_dependent_tables():
+    metadata = sa.MetaData()
+    users = sa.Table("users", metadata, sa.Column("id", sa.Integer))
+    roles = sa.Table(
+        "roles", metadata, sa.Column("id", sa.Integer), sa.Column("user_id", sa.Integer)
+    )
+
+    alias = roles.alias()
+    stmt = sa.select(users.c.id).join(alias, alias.c.user_id == users.c.id)
+
+    assert dependent_tables(stmt) == {"users", "roles"}
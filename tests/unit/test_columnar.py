@@ -0,0 +1,112 @@
+import datetime
+import typing as t
+
+import pytest
+
+import sqlalchemy as sa
+from sqlalchemy.orm import Mapped, mapped_column
+
+from flex_alchemy.columnar import fill_arrays, numpy_dtype
+
+from .conftest import Base
+
+np = pytest.importorskip("numpy")
+
+
+class Sale(Base):
+    __tablename__ = "sales"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    region: Mapped[str] = mapped_column(sa.String(10))
+    amount: Mapped[float] = mapped_column(sa.Float())
+    quantity: Mapped[t.Optional[int]] = mapped_column(nullable=True)
+    sold_on: Mapped[datetime.date] = mapped_column(sa.Date())
+
+
+@pytest.fixture(autouse=True)
+def sales(engine: sa.Engine):
+    Sale.bulk_create(
+        {
+            "region": "north" if num % 2 else "south",
+            "amount": num * 1.5,
+            "quantity": None if num % 3 == 0 else num,
+            "sold_on": datetime.date(2024, 1, num),
+        }
+        for num in range(1, 11)
+    )
+
+
+def test_to_columns():
+    columns = (
+        Sale.select(Sale.region, sa.func.count().label("total"))
+        .group_by(Sale.region)
+        .order_by(Sale.region)
+        .to_columns(chunk_size=1)
+    )
+
+    assert columns == {"region": ["north", "south"], "total": [5, 5]}
+
+
+def test_to_numpy_derives_dtypes():
+    arrays = (
+        Sale.select(Sale.id, Sale.amount, Sale.sold_on, Sale.region)
+        .where(Sale.id <= 4)
+        .order_by(Sale.id)
+        .to_numpy(chunk_size=3)
+    )
+
+    assert arrays["id"].dtype == np.int64
+    assert arrays["amount"].dtype == np.float64
+    assert arrays["sold_on"].dtype == np.dtype("datetime64[D]")
+    assert arrays["region"].dtype == object
+    assert arrays["id"].tolist() == [1, 2, 3, 4]
+    assert arrays["amount"].tolist() == [1.5, 3.0, 4.5, 6.0]
+    assert arrays["sold_on"][0] == np.datetime64("2024-01-01")
+
+
+def test_to_numpy_selects_model_columns_by_default():
+    arrays = Sale.where(Sale.id == 1).to_numpy(dtypes={"region": "U5"})
+
+    assert list(arrays) == ["id", "region", "amount", "quantity", "sold_on"]
+    assert arrays["region"].dtype == np.dtype("U5")
+
+
+def test_to_numpy_nulls():
+    with pytest.raises(ValueError):
+        Sale.select(Sale.quantity).to_numpy()
+
+    quantity = (
+        Sale.select(Sale.quantity)
+        .order_by(Sale.id)
+        .to_numpy(masked=True, chunk_size=4)["quantity"]
+    )
+
+    assert isinstance(quantity, np.ma.MaskedArray)
+    assert quantity.mask.tolist() == [num % 3 == 0 for num in range(1, 11)]
+    assert quantity.sum() == 1 + 2 + 4 + 5 + 7 + 8 + 10
+
+    floats = (
+        Sale.select(Sale.quantity)
+        .order_by(Sale.id)
+        .to_numpy(dtypes={"quantity": "float64"})["quantity"]
+    )
+
+    assert np.isnan(floats[2])
+
+
+def test_numpy_dtype():
+    assert numpy_dtype(sa.SmallInteger()) == "int16"
+    assert numpy_dtype(sa.Numeric()) == "float64"
+    assert numpy_dtype(sa.DateTime()) == "datetime64[us]"
+    assert numpy_dtype(sa.DateTime(timezone=True)) == "object"
+    assert numpy_dtype(sa.JSON()) == "object"
+
+
+def test_fill_arrays_grows_past_capacity():
+    partitions = [[(num, num * 0.5)] * 3 for num in range(5)]
+
+    arrays = fill_arrays(partitions, ["a", "b"], ["int64", "float64"], capacity=2)
+
+    assert len(arrays["a"]) == 15
+    assert arrays["a"][-1] == 4
+    assert arrays["b"].sum() == pytest.approx(sum(num * 0.5 * 3 for num in range(5)))
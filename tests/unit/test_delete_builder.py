@@ -11,11 +11,12 @@ from flex_alchemy.builders.delete import DeleteBuilder
 from examples.models import User
 
 from flex_alchemy.exceptions import SessionNotProvidedError
+from flex_alchemy.session import ScopedSessionHandler
 
 
 @pytest.fixture
 def session(mocker) -> MagicMock:
-    return mocker.MagicMock(spec=Session)
+    return mocker.MagicMock(spec=Session, info={})
 
 
 @pytest.fixture
@@ -81,3 +82,25 @@ def test_call_execute_without_session(faker):
 
     with pytest.raises(SessionNotProvidedError):
         builder.where(User.email == faker.email()).execute()
+
+
+def test_call_execute_in_unit_of_work(faker, session, builder: DeleteBuilder):
+    with ScopedSessionHandler.transaction(session):
+        builder.where(User.email == faker.email()).execute(session=session)
+
+        session.commit.assert_not_called()
+
+    session.commit.assert_called_once()
+
+
+def test_unit_of_work_rollback(faker, session, builder: DeleteBuilder):
+    with pytest.raises(RuntimeError):
+        with ScopedSessionHandler.unit_of_work(session):
+            with ScopedSessionHandler.unit_of_work(session):
+                builder.where(User.email == faker.email()).execute(session=session)
+
+            raise RuntimeError
+
+    session.commit.assert_not_called()
+    session.rollback.assert_called_once()
+    assert session.info == {"flex_alchemy_unit_of_work": 0}
@@ -0,0 +1,102 @@
+from datetime import datetime
+
+import pytest
+
+import sqlalchemy as sa
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .conftest import Base, Item
+
+
+class Ticket(Base):
+    __tablename__ = "tickets"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    title: Mapped[str] = mapped_column(sa.String(50))
+    revision: Mapped[int] = mapped_column(
+        server_default=sa.text("1"), server_onupdate=sa.FetchedValue()
+    )
+
+
+class Stamp(Base):
+    __tablename__ = "stamps"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(sa.String(50))
+    updated_at: Mapped[datetime] = mapped_column(
+        default=sa.func.now(), onupdate=sa.func.now()
+    )
+
+
+@pytest.fixture
+def statements(engine: sa.Engine) -> list:
+    statements = []
+
+    def listener(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    sa.event.listen(engine, "before_cursor_execute", listener)
+
+    yield statements
+
+    sa.event.remove(engine, "before_cursor_execute", listener)
+
+
+def test_eager_defaults_only_with_server_generated_columns(engine: sa.Engine):
+    sa.orm.configure_mappers()
+
+    assert sa.inspect(Ticket).eager_defaults is True
+    assert sa.inspect(Stamp).eager_defaults is True
+    assert sa.inspect(Item).eager_defaults == "auto"
+
+
+def test_plain_mappers_keep_batched_updates(statements: list):
+    items = [Item(name=f"item-{num}") for num in range(3)]
+    tickets = [Ticket(title=f"ticket-{num}") for num in range(3)]
+
+    with Base.transaction() as session:
+        session.add_all([*items, *tickets])
+
+    statements.clear()
+
+    with Base.transaction():
+        for item, ticket in zip(items, tickets):
+            item.name = "renamed"
+            ticket.title = "renamed"
+
+    updates = [statement for statement in statements if "UPDATE" in statement]
+
+    # one executemany for the items, one UPDATE ... RETURNING per ticket
+    assert len(updates) == 4
+    assert sum("RETURNING" in statement for statement in updates) == 3
+
+
+def test_sql_expression_onupdate_returns_with_update(statements: list):
+    stamp = Stamp(name="stamp")
+    stamp.save()
+
+    stamp.name = "renamed"
+    stamp.save()
+
+    assert stamp.updated_at
+    assert [statement.split()[0] for statement in statements] == ["INSERT", "UPDATE"]
+    assert all("RETURNING" in statement for statement in statements)
+
+
+def test_without_returning_loads_on_access(monkeypatch, engine, statements: list):
+    monkeypatch.setattr(engine.dialect, "insert_returning", False)
+    monkeypatch.setattr(engine.dialect, "update_returning", False)
+    Base.make_session(engine)
+
+    assert sa.inspect(Stamp).eager_defaults == "auto"
+
+    stamp = Stamp(name="stamp")
+    stamp.save()
+
+    stamp.name = "renamed"
+    stamp.save()
+
+    # no SELECT right after the flush, `updated_at` loads when read
+    assert [statement.split()[0] for statement in statements] == ["INSERT", "UPDATE"]
+    assert stamp.updated_at
+    assert statements[-1].split()[0] == "SELECT"
@@ -0,0 +1,119 @@
+import io
+import json
+
+import pytest
+
+import sqlalchemy as sa
+
+from flex_alchemy.explain import SlowQueryLog
+
+from .conftest import Item
+
+
+@pytest.fixture(autouse=True)
+def items(engine: sa.Engine):
+    Item.bulk_create({"name": f"item-{num}"} for num in range(1, 21))
+
+
+def test_slow_select_is_explained():
+    log = SlowQueryLog(threshold=0, large_table_rows=10)
+
+    items = Item.where(Item.name == "item-3").explain_slow(log).execute()
+
+    assert len(items.scalars().all()) == 1
+    assert len(log.records) == 1
+
+    slow_query = log.records[0]
+
+    assert slow_query.model == "Item"
+    assert slow_query.builder == "SelectBuilder"
+    assert slow_query.parameters == ("item-3",)
+    assert slow_query.plan[0]["detail"] == "SCAN items"
+    assert slow_query.seq_scans == ["items"]
+    assert slow_query.call_site.startswith(__file__)
+
+
+def test_index_lookup_and_small_tables_are_not_flagged():
+    log = SlowQueryLog(threshold=0, large_table_rows=100)
+
+    Item.where(Item.id == 3).explain_slow(log).execute()
+    Item.where(Item.name == "item-3").explain_slow(log).execute()
+
+    assert [record.seq_scans for record in log.records] == [[], []]
+    assert log.records[0].plan[0]["detail"].startswith("SEARCH items")
+
+
+def test_fast_and_unsampled_queries():
+    log = SlowQueryLog(threshold=60)
+
+    Item.where(Item.id == 3).explain_slow(log).execute()
+
+    assert len(log.records) == 0
+
+    log = SlowQueryLog(threshold=0, sample_rate=0)
+
+    Item.where(Item.id == 3).explain_slow(log).execute()
+
+    assert log.records[0].plan is None
+
+
+def test_write_builders_are_explained_once():
+    log = SlowQueryLog(threshold=0, analyze=True)
+
+    Item.update(name="renamed").where(Item.id <= 2).explain_slow(log).execute()
+
+    assert log.records[0].builder == "UpdateBuilder"
+    assert log.records[0].analyzed is False
+    assert Item.where(Item.name == "renamed").count() == 2
+
+
+def test_builders_without_opt_in_are_not_logged():
+    Item.where(Item.id == 3).execute()
+
+    assert len(Item.select().slow_query_log.records) == 0
+
+
+def test_dump_writes_json_lines():
+    log = SlowQueryLog(threshold=0)
+
+    Item.where(Item.id == 3).explain_slow(log).execute()
+    Item.where(Item.id == 4).explain_slow(log).execute()
+
+    fp = io.StringIO()
+    log.dump(fp)
+
+    lines = [json.loads(line) for line in fp.getvalue().splitlines()]
+
+    assert [line["parameters"] for line in lines] == [[3], [4]]
+    assert lines[0]["sql"].startswith("SELECT")
+
+
+def test_failed_explain_does_not_fail_the_query(monkeypatch, caplog):
+    monkeypatch.setattr(
+        "flex_alchemy.explain.explain_prefix", lambda *args: "EXPLAIN BROKEN "
+    )
+    log = SlowQueryLog(threshold=0)
+
+    items = Item.where(Item.name == "item-3").explain_slow(log).execute()
+
+    assert len(items.scalars().all()) == 1
+    assert log.records[0].plan is None
+    assert "could not explain slow query" in caplog.text
+
+
+def test_table_sizes_are_probed_once(monkeypatch):
+    log = SlowQueryLog(threshold=0, large_table_rows=10)
+    probes = []
+
+    count_up_to_threshold = log._count_up_to_threshold
+    monkeypatch.setattr(
+        log,
+        "_count_up_to_threshold",
+        lambda *args: probes.append(args) or count_up_to_threshold(*args),
+    )
+
+    Item.where(Item.name == "item-3").explain_slow(log).execute()
+    Item.where(Item.name == "item-4").explain_slow(log).execute()
+
+    assert [record.seq_scans for record in log.records] == [["items"], ["items"]]
+    assert len(probes) == 1
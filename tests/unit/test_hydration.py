@@ -0,0 +1,49 @@
+import dataclasses
+
+import pytest
+
+import sqlalchemy as sa
+
+from flex_alchemy.builders.select import row_dataclass
+
+from .conftest import Base, Item
+
+
+@pytest.fixture(autouse=True)
+def items(engine: sa.Engine):
+    Item.bulk_create({"name": f"item-{num}"} for num in range(1, 4))
+
+
+def test_as_rows():
+    rows = Item.select().order_by(Item.id.desc()).as_rows()
+
+    assert rows == [(3, "item-3"), (2, "item-2"), (1, "item-1")]
+    assert all(type(row) is tuple for row in rows)
+    assert len(Base._session().identity_map) == 0
+
+
+def test_as_dicts_use_attribute_keys():
+    dicts = Item.where(Item.id == 2).as_dicts()
+
+    assert dicts == [{"id": 2, "name": "item-2"}]
+
+
+def test_as_dicts_with_selected_entities():
+    dicts = Item.select(Item.name).where(Item.id < 3).order_by(Item.id).as_dicts()
+
+    assert dicts == [{"name": "item-1"}, {"name": "item-2"}]
+
+
+def test_as_dataclasses():
+    items = Item.with_().where(Item.id == 1).as_dataclasses()
+
+    assert dataclasses.asdict(items[0]) == {"id": 1, "name": "item-1"}
+    assert type(items[0]).__name__ == "ItemRow"
+    assert type(items[0]).__slots__ == ("id", "name")
+    assert not hasattr(items[0], "__dict__")
+    assert len(Base._session().identity_map) == 0
+
+
+def test_row_dataclass_is_generated_once():
+    assert row_dataclass(Item, ("id",)) is row_dataclass(Item, ("id",))
+    assert row_dataclass(Item, ("id",)) is not row_dataclass(Item, ("name",))
@@ -12,7 +12,7 @@ from flex_alchemy.exceptions import SessionNotProvidedError
 
 @pytest.fixture
 def session(mocker):
-    return mocker.MagicMock(spec=Session)
+    return mocker.MagicMock(spec=Session, info={})
 
 
 @pytest.fixture
@@ -87,8 +87,44 @@ def test_call_execute_not_commit(session, builder: InsertBuilder, values: dict):
     session.commit.assert_not_called()
 
 
+def test_set_many(faker, builder: InsertBuilder):
+    rows = [{"name": faker.name(), "email": faker.email()} for _ in range(3)]
+
+    stmt = builder.many(iter(rows))._build()
+
+    assert isinstance(stmt, Insert)
+    assert not stmt._values
+    assert builder._rows == rows
+
+
+def test_set_many_empty(builder: InsertBuilder):
+    with pytest.raises(ValueError):
+        builder.many([])._build()
+
+
+def test_call_execute_many(faker, session, builder: InsertBuilder):
+    rows = [{"name": faker.name(), "email": faker.email()} for _ in range(3)]
+
+    builder.many(rows).execute(session=session)
+
+    stmt, params = session.execute.call_args.args
+
+    assert isinstance(stmt, Insert)
+    assert params == rows
+    session.commit.assert_called_once()
+
+
 def test_call_execute_without_session(faker, values: dict):
     builder = InsertBuilder(User)
 
     with pytest.raises(SessionNotProvidedError):
         builder.values(**values).execute()
+
+
+def test_frozen_builder_does_not_share_returning(session):
+    base = InsertBuilder(User, session=session).returning(User.id).freeze()
+
+    derived = base.returning(User.name, sort_by_parameter_order=True)
+
+    assert base._returning == {"cols": (User.id,), "params": {}}
+    assert derived._returning["params"] == {"sort_by_parameter_order": True}
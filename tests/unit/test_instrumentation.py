@@ -0,0 +1,151 @@
+import pytest
+
+import sqlalchemy as sa
+
+from flex_alchemy.instrumentation import (
+    HistogramSink,
+    QueryEvent,
+    add_sink,
+    fingerprint,
+    remove_sink,
+)
+
+from .conftest import Item
+
+
+@pytest.fixture(autouse=True)
+def items(engine: sa.Engine):
+    Item.bulk_create({"name": f"item-{num}"} for num in range(1, 6))
+
+
+@pytest.fixture
+def events():
+    events = []
+    add_sink(events.append)
+
+    yield events
+
+    remove_sink(events.append)
+
+
+def make_event(fingerprint: str, duration: float) -> QueryEvent:
+    return QueryEvent(
+        model="Item",
+        builder="SelectBuilder",
+        sql="SELECT 1",
+        fingerprint=fingerprint,
+        bind_count=0,
+        statements=1,
+        started_at=0.0,
+        duration=duration,
+        rows=1,
+        call_site=None,
+    )
+
+
+def test_fingerprint_normalizes_literals_and_lists():
+    first, first_digest = fingerprint(
+        "SELECT * FROM items\n WHERE id IN (%(id_1)s, %(id_2)s) AND name = %(name)s"
+    )
+    second, second_digest = fingerprint(
+        "SELECT * FROM items WHERE id IN (?, ?, ?) AND name = ?"
+    )
+
+    assert first == "SELECT * FROM items WHERE id IN (?) AND name = ?"
+    assert first == second
+    assert first_digest == second_digest
+
+
+def test_fingerprint_collapses_multi_row_values():
+    sql, _ = fingerprint("INSERT INTO items (name) VALUES ($1), ($2), ($3)")
+
+    assert sql == "INSERT INTO items (name) VALUES (?)"
+
+
+def test_select_builder_emits_event(events):
+    items = Item.where(Item.id > 2).execute().scalars().all()
+
+    assert len(items) == 3
+    assert len(events) == 1
+
+    query_event = events[0]
+
+    assert query_event.model == "Item"
+    assert query_event.builder == "SelectBuilder"
+    # sqlite does not report the size of a result set
+    assert query_event.rows is None
+    assert query_event.bind_count == 1
+    assert query_event.statements == 1
+    assert query_event.sql.startswith("SELECT items.id, items.item_name FROM items")
+    assert query_event.call_site.startswith(__file__)
+
+
+def test_write_builders_report_rowcount(events):
+    Item.update(name="renamed").where(Item.id <= 2).execute()
+    Item.destroy().where(Item.id == 5).execute()
+
+    assert [(e.builder, e.rows) for e in events] == [
+        ("UpdateBuilder", 2),
+        ("DeleteBuilder", 1),
+    ]
+
+
+def test_activerecord_execute_emits_event(events):
+    result = Item.execute(sa.select(Item.id))
+
+    assert events[0].model == "Item"
+    assert events[0].builder is None
+    assert events[0].rows is None
+
+    # the result is handed back as is, still unread
+    assert len(result.all()) == 5
+
+
+def test_insert_returning_keeps_cursor_result(events):
+    builder = Item.insert({"name": "returned"}).returning(Item.id)
+    result = builder.execute(commit=False)
+
+    assert result.scalar_one() == 6
+    assert events[0].rows is None
+
+    Item._session.commit()
+
+
+def test_failed_query_emits_error(events):
+    with pytest.raises(sa.exc.OperationalError):
+        Item.execute(sa.text("SELECT * FROM missing"))
+
+    assert events[0].error is not None
+    assert events[0].rows is None
+
+
+def test_no_events_without_sinks():
+    sink = HistogramSink()
+    add_sink(sink)
+    remove_sink(sink)
+
+    Item.where(Item.id > 2).execute()
+
+    assert sink.top() == []
+
+
+def test_histogram_sink_top():
+    sink = HistogramSink(buckets=[0.01, 0.1])
+
+    for duration in (0.005, 0.05, 0.5):
+        sink(make_event("slow", duration))
+
+    sink(make_event("fast", 0.001))
+
+    top = sink.top(n=1)
+
+    assert len(top) == 1
+    assert top[0]["fingerprint"] == "slow"
+    assert top[0]["count"] == 3
+    assert top[0]["histogram"] == [1, 1, 1]
+    assert top[0]["mean"] == pytest.approx(0.555 / 3)
+    assert sink.top(by="count")[1]["fingerprint"] == "fast"
+
+    sink.reset()
+
+    assert sink.top() == []
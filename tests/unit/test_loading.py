@@ -0,0 +1,91 @@
+import pytest
+
+import sqlalchemy as sa
+from sqlalchemy.orm import DeclarativeBase, Mapped, Session, mapped_column
+
+from flex_alchemy.loading import find_many
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class Membership(Base):
+    __tablename__ = "memberships"
+
+    group_id: Mapped[int] = mapped_column(primary_key=True)
+    member_id: Mapped[int] = mapped_column(primary_key=True)
+    role: Mapped[str] = mapped_column(sa.String(20))
+
+
+@pytest.fixture
+def engine() -> sa.Engine:
+    engine = sa.create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+
+    with Session(engine) as session:
+        session.add_all(
+            Membership(group_id=group, member_id=member, role=f"{group}-{member}")
+            for group in range(1, 4)
+            for member in range(1, 4)
+        )
+        session.commit()
+
+    return engine
+
+
+@pytest.fixture
+def statements(engine: sa.Engine) -> list:
+    statements = []
+
+    sa.event.listen(
+        engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+
+    return statements
+
+
+def test_find_many_composite_keys(engine, statements):
+    with Session(engine) as session:
+        instances, missing = find_many(
+            session, Membership, [(3, 1), {"group_id": 1, "member_id": 2}, (9, 9)]
+        )
+
+    assert [instance.role for instance in instances] == ["3-1", "1-2"]
+    assert missing == [(9, 9)]
+    assert len(statements) == 1
+
+
+def test_find_many_chunks(engine, statements):
+    keys = [(group, member) for group in range(1, 4) for member in range(1, 4)]
+
+    with Session(engine) as session:
+        instances, missing = find_many(session, Membership, keys, chunk_size=4)
+
+    assert [(i.group_id, i.member_id) for i in instances] == keys
+    assert not missing
+    assert len(statements) == 3
+
+
+def test_find_many_identity_map_hits(engine, statements):
+    with Session(engine) as session:
+        loaded = session.get(Membership, (2, 2))
+
+        instances, _ = find_many(session, Membership, [(2, 2), (2, 3), (2, 2)])
+
+    assert instances[0] is loaded
+    assert instances[2] is loaded
+    assert len(statements) == 2
+    assert statements[-1].count("?") == 2
+
+
+def test_find_many_chunk_size_bound_by_dialect(engine, statements):
+    keys = [(group, member) for group in range(1, 700) for member in range(1, 2)]
+
+    with Session(engine) as session:
+        find_many(session, Membership, keys, chunk_size=5000)
+
+    # sqlite allows 999 bound parameters, two per composite key
+    assert len(statements) == 2
@@ -0,0 +1,113 @@
+import typing as t
+
+import pytest
+
+import sqlalchemy as sa
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from flex_alchemy.exceptions import NPlusOneError, NPlusOneWarning
+
+from .conftest import Base
+
+
+class Author(Base):
+    __tablename__ = "authors"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    books: Mapped[t.List["Book"]] = relationship(back_populates="author")
+
+
+class Book(Base):
+    __tablename__ = "books"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    author_id: Mapped[int] = mapped_column(sa.ForeignKey("authors.id"))
+    author: Mapped[Author] = relationship(back_populates="books")
+
+
+@pytest.fixture(autouse=True)
+def books(engine: sa.Engine):
+    Author.bulk_create({"id": num} for num in range(1, 7))
+    Book.bulk_create({"author_id": num} for num in range(1, 7))
+
+    yield
+
+    Base.detect_n_plus_one(enable=False)
+
+
+def load_books():
+    return [len(author.books) for author in Author.all()]
+
+
+def test_raise_reports_relationship_and_call_site():
+    Base.detect_n_plus_one(mode="raise", threshold=3)
+
+    with pytest.raises(NPlusOneError) as exc_info:
+        load_books()
+
+    report = exc_info.value.report
+
+    assert report.model == "Author"
+    assert report.relationship == "books"
+    assert report.count == 3
+    assert report.stack[0].startswith(__file__)
+    assert any("in load_books" in frame for frame in report.stack)
+
+
+def test_warn_once_per_query_shape():
+    Base.detect_n_plus_one(mode="warn", threshold=3)
+
+    with pytest.warns(NPlusOneWarning) as record:
+        load_books()
+
+    assert len(record) == 1
+
+    stats = Base.query_stats()
+
+    assert stats["statements"] == 7
+    assert len(stats["reports"]) == 1
+
+
+def test_repeated_builder_queries_are_reported():
+    Base.detect_n_plus_one(mode="raise", threshold=3)
+
+    Book.where(Book.author_id == 1).execute()
+    Book.where(Book.author_id == 2).execute()
+
+    with pytest.raises(NPlusOneError) as exc_info:
+        Book.where(Book.author_id == 3).execute()
+
+    assert exc_info.value.report.model == "Book"
+    assert exc_info.value.report.relationship is None
+
+
+def test_eager_loading_is_not_reported():
+    Base.detect_n_plus_one(mode="raise", threshold=3)
+
+    authors = Author.with_("books").execute().scalars().all()
+
+    assert sum(len(author.books) for author in authors) == 6
+    assert Base.query_stats()["reports"] == []
+
+
+def test_stats_are_per_scope():
+    Base.detect_n_plus_one(mode="log", threshold=3)
+
+    load_books()
+    Base.teardown_session()
+    Author.all()
+
+    assert Base.query_stats() == {"statements": 1, "reports": []}
+
+
+def test_unsampled_scopes_are_skipped():
+    Base.detect_n_plus_one(mode="raise", threshold=3, sample_rate=0)
+
+    load_books()
+
+    assert Base.query_stats() is None
+
+
+def test_invalid_mode():
+    with pytest.raises(ValueError):
+        Base.detect_n_plus_one(mode="ignore")
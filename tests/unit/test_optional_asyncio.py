@@ -0,0 +1,53 @@
+import os
+import subprocess
+import sys
+
+SCRIPT = """
+import sys
+
+# greenlet comes with the asyncio extra only, hide it
+sys.modules["greenlet"] = None
+
+import sqlalchemy as sa
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+import flex_alchemy
+from flex_alchemy import ActiveRecord
+
+
+class Base(DeclarativeBase, ActiveRecord):
+    __abstract__ = True
+
+
+class Item(Base):
+    __tablename__ = "items"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str]
+
+
+engine = sa.create_engine("sqlite://")
+Base.metadata.create_all(engine)
+Base.make_session(engine)
+
+Item.create({"name": "foo"})
+assert Item.find(1).name == "foo"
+
+try:
+    flex_alchemy.AsyncActiveRecord
+except ImportError:
+    pass
+else:
+    raise AssertionError("AsyncActiveRecord imported without greenlet")
+"""
+
+
+def test_import_without_greenlet():
+    result = subprocess.run(
+        [sys.executable, "-c", SCRIPT],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+    )
+
+    assert result.returncode == 0, result.stderr
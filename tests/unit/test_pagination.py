@@ -0,0 +1,137 @@
+import base64
+import json
+import uuid
+import pytest
+
+from datetime import date, datetime
+from decimal import Decimal
+
+from sqlalchemy.sql.elements import BooleanClauseList, BinaryExpression
+
+from flex_alchemy.pagination import (
+    decode_cursor,
+    encode_cursor,
+    keyset_columns,
+    keyset_order,
+    keyset_predicate,
+)
+
+from examples.models import User
+
+PRIMARY_KEY = (User.__table__.c.id,)
+
+
+def test_cursor_round_trip(faker):
+    values = [
+        faker.name(),
+        faker.pyint(),
+        None,
+        True,
+        datetime(2025, 3, 12, 17, 48, 51),
+        date(2025, 3, 12),
+        Decimal("10.50"),
+        uuid.uuid4(),
+    ]
+
+    cursor = encode_cursor(values)
+
+    assert isinstance(cursor, str)
+    assert decode_cursor(cursor) == values
+
+
+def test_decode_invalid_cursor():
+    with pytest.raises(ValueError):
+        decode_cursor("not a cursor")
+
+
+@pytest.mark.parametrize(
+    "payload", [[["nope", "1"]], [["dt"]], [["dt", 1]], [["dt", "yesterday"]]]
+)
+def test_decode_tampered_cursor(payload):
+    with pytest.raises(ValueError, match="invalid pagination cursor"):
+        decode_cursor(base64.urlsafe_b64encode(json.dumps(payload).encode()).decode())
+
+
+def test_keyset_columns_appends_primary_key():
+    keys = keyset_columns((User.name.desc(), User.created_at), PRIMARY_KEY)
+
+    assert [(column.name, descending) for column, descending in keys] == [
+        ("name", True),
+        ("created_at", False),
+        ("id", False),
+    ]
+
+
+def test_keyset_columns_with_primary_key():
+    keys = keyset_columns((User.id.desc(),), PRIMARY_KEY)
+
+    assert [(column.name, descending) for column, descending in keys] == [("id", True)]
+
+
+def test_keyset_columns_unsupported_ordering():
+    with pytest.raises(ValueError):
+        keyset_columns((User.name.desc().nulls_last(),), PRIMARY_KEY)
+
+    with pytest.raises(ValueError):
+        keyset_columns(("name",), PRIMARY_KEY)
+
+
+def test_keyset_predicate_single_column(faker):
+    keys = keyset_columns((), PRIMARY_KEY)
+
+    predicate = keyset_predicate(keys, [10])
+
+    assert str(predicate.compile(compile_kwargs={"literal_binds": True})) == (
+        "users.id > 10"
+    )
+
+
+def test_keyset_predicate_same_direction():
+    keys = keyset_columns((User.name.desc(),), PRIMARY_KEY)
+    keys = [(column, True) for column, _ in keys]
+
+    predicate = keyset_predicate(keys, ["foo", 10])
+
+    assert isinstance(predicate, BinaryExpression)
+    assert str(predicate.compile(compile_kwargs={"literal_binds": True})) == (
+        "(users.name, users.id) < ('foo', 10)"
+    )
+
+
+def test_keyset_predicate_mixed_direction():
+    keys = keyset_columns((User.name.desc(),), PRIMARY_KEY)
+
+    predicate = keyset_predicate(keys, ["foo", 10])
+
+    assert isinstance(predicate, BooleanClauseList)
+    assert str(predicate.compile(compile_kwargs={"literal_binds": True})) == (
+        "users.name < 'foo' OR users.name = 'foo' AND users.id > 10"
+    )
+
+
+def test_keyset_order_puts_nulls_last():
+    keys = keyset_columns((User.created_at.desc(),), PRIMARY_KEY)
+
+    order_by = [str(clause) for clause in keyset_order(keys)]
+
+    assert order_by == [
+        "users.created_at IS NULL",
+        "users.created_at DESC",
+        "users.id ASC",
+    ]
+
+
+def test_keyset_predicate_nullable_column():
+    keys = keyset_columns((User.created_at,), PRIMARY_KEY)
+    created_at = datetime(2025, 3, 12)
+
+    def compiled(values):
+        predicate = keyset_predicate(keys, values)
+
+        return str(predicate.compile(compile_kwargs={"literal_binds": True}))
+
+    assert compiled([created_at, 10]) == (
+        "users.created_at > '2025-03-12 00:00:00' OR users.created_at IS NULL"
+        " OR users.created_at = '2025-03-12 00:00:00' AND users.id > 10"
+    )
+    assert compiled([None, 10]) == "users.created_at IS NULL AND users.id > 10"
@@ -0,0 +1,69 @@
+import types
+
+import pytest
+import sqlalchemy as sa
+
+from flex_alchemy import prepared
+from flex_alchemy.prepared import PreparedStats, listen_prepared, prepared_stats
+
+
+def test_prepared_stats():
+    stats = PreparedStats()
+
+    stats.record("SELECT 1", reused=False)
+    stats.record("SELECT 1", reused=True)
+    stats.record("SELECT 1", reused=True)
+    stats.record("SELECT 2", reused=False)
+
+    assert stats.info() == {
+        "statements": 2,
+        "executions": 4,
+        "prepares": 2,
+        "reuses": 2,
+        "reuse_ratio": 0.5,
+    }
+    assert stats.top(1) == [{"sql": "SELECT 1", "executions": 3, "prepares": 1}]
+
+    stats.reset()
+
+    assert stats.info()["executions"] == 0
+    assert stats.info()["reuse_ratio"] == 0.0
+
+
+def test_other_drivers_are_not_recorded():
+    listen_prepared()
+    prepared_stats.reset()
+
+    engine = sa.create_engine("sqlite://")
+
+    with engine.connect() as connection:
+        stmt = sa.select(sa.literal(1)).execution_options(prepared=True)
+
+        assert connection.execute(stmt).scalar() == 1
+
+    assert prepared_stats.info()["executions"] == 0
+
+
+def test_estimates_reuse_without_psycopg_cache(mocker):
+    mocker.patch.object(prepared, "_warned", False)
+    prepared_stats.reset()
+
+    conn = mocker.MagicMock(info={})
+    conn.dialect.driver = "psycopg"
+    conn.connection.driver_connection = types.SimpleNamespace(prepare_threshold=5)
+    context = mocker.MagicMock(execution_options={"prepared": True})
+
+    def execute(statement: str):
+        prepared._before_cursor_execute(conn, None, statement, {}, context, False)
+        prepared._after_cursor_execute(conn, None, statement, {}, context, False)
+
+    with pytest.warns(RuntimeWarning, match="prepared statement cache"):
+        execute("SELECT 1")
+
+    execute("SELECT 1")
+    prepared._rollback(conn)
+    execute("SELECT 1")
+
+    assert conn.connection.driver_connection.prepare_threshold == 5
+    assert prepared_stats.info()["prepares"] == 2
+    assert prepared_stats.info()["reuses"] == 1
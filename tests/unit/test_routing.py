@@ -0,0 +1,97 @@
+import pytest
+
+import sqlalchemy as sa
+
+from flex_alchemy.routing import LeastInFlightPolicy, RoundRobinPolicy, RoutingSession
+
+from examples.models import User
+
+
+@pytest.fixture
+def primary() -> sa.Engine:
+    return sa.create_engine("sqlite://")
+
+
+@pytest.fixture
+def replicas() -> list:
+    return [sa.create_engine("sqlite://"), sa.create_engine("sqlite://")]
+
+
+@pytest.fixture
+def session(primary, replicas) -> RoutingSession:
+    return RoutingSession(primary, replicas=replicas)
+
+
+def test_round_robin_policy(replicas):
+    policy = RoundRobinPolicy()
+
+    assert [policy.select(replicas) for _ in range(4)] == replicas * 2
+
+
+def test_least_in_flight_policy(replicas):
+    policy = LeastInFlightPolicy()
+
+    assert policy.select(replicas) is replicas[0]
+
+    with replicas[0].connect():
+        assert policy.in_flight(replicas[0]) == 1
+        assert policy.select(replicas) is replicas[1]
+
+    assert policy.in_flight(replicas[0]) == 0
+    assert policy.select(replicas) is replicas[0]
+
+
+def test_read_routes_to_replicas(session, replicas):
+    stmt = sa.select(User)
+
+    assert session.get_bind(clause=stmt) is replicas[0]
+    assert session.get_bind(clause=stmt) is replicas[1]
+    assert not session.sticky
+
+
+def test_locking_read_routes_to_primary(session, primary):
+    assert session.get_bind(clause=sa.select(User).with_for_update()) is primary
+
+
+def test_write_sticks_to_primary(session, primary):
+    assert session.get_bind(clause=sa.update(User).values(name="foo")) is primary
+    assert session.sticky
+
+    assert session.get_bind(clause=sa.select(User)) is primary
+
+    session.close()
+
+    assert not session.sticky
+
+
+def test_connection_without_clause_routes_to_primary(session, primary):
+    assert session.get_bind() is primary
+    assert not session.sticky
+
+
+def test_without_replicas(primary):
+    session = RoutingSession(primary)
+
+    assert session.get_bind(clause=sa.select(User)) is primary
+
+
+def test_use_primary_routes_to_primary(session, primary):
+    assert session.get_bind(clause=sa.select(User), use_primary=True) is primary
+    assert not session.sticky
+
+
+def test_use_primary_execution_option(session, primary, replicas):
+    User.metadata.create_all(primary)
+    binds = []
+
+    sa.event.listen(
+        primary, "before_cursor_execute", lambda *args: binds.append("primary")
+    )
+
+    assert session.get(User, 1, execution_options={"use_primary": True}) is None
+    assert (
+        session.execute(sa.select(User).execution_options(use_primary=True)).all() == []
+    )
+
+    assert binds == ["primary", "primary"]
+    assert not session.sticky
@@ -157,6 +157,160 @@ def test_call_execute_without_session(faker):
         builder.where(User.email == faker.email()).execute()
 
 
+def test_chunk(mocker, session, builder: SelectBuilder):
+    users = [User(), User(), User()]
+
+    result = session.execute.return_value
+    result.scalars.return_value.partitions.return_value = iter([users[:2], users[2:]])
+    session.__contains__ = mocker.MagicMock(return_value=True)
+
+    chunks = list(builder.chunk(2))
+
+    assert chunks == [users[:2], users[2:]]
+
+    _, kwargs = session.execute.call_args
+    assert kwargs["execution_options"] == {"stream_results": True, "yield_per": 2}
+
+    assert session.expunge.call_count == 3
+    result.scalars.return_value.close.assert_called_once()
+
+
+def test_stream_rows(session, builder: SelectBuilder):
+    rows = [(1, "foo"), (2, "bar")]
+
+    session.execute.return_value.partitions.return_value = iter([rows])
+
+    assert list(builder.select(User.id, User.name).stream(10)) == rows
+
+    session.expunge.assert_not_called()
+
+
+def test_count_stmt(faker, builder: SelectBuilder):
+    email = faker.email()
+
+    stmt = builder.where(User.email == email).order_by(User.id).limit(10)._count_stmt()
+
+    assert str(stmt) == (
+        "SELECT count(*) AS count_1 \nFROM users \nWHERE users.email = :email_1"
+    )
+
+
+def test_count_stmt_with_group_by(builder: SelectBuilder):
+    stmt = builder.select(User.name).group_by(User.name)._count_stmt()
+
+    assert str(stmt).startswith("SELECT count(*) AS count_1 \nFROM (SELECT")
+
+
+def test_paginate(session, builder: SelectBuilder):
+    users = [User(), User()]
+
+    session.execute.return_value.scalars.return_value.all.return_value = users
+    session.execute.return_value.scalar_one.return_value = 45
+
+    paginate = builder.paginate(page=2, per_page=20)
+
+    stmt = session.execute.call_args_list[0].args[0]
+
+    assert stmt._offset_clause.value == 20
+    assert stmt._limit_clause.value == 20
+
+    assert paginate == {
+        "total": 45,
+        "per_page": 20,
+        "current_page": 2,
+        "last_page": 3,
+        "data": users,
+    }
+
+
+def test_paginate_without_count(session, builder: SelectBuilder):
+    paginate = builder.paginate(page=1, per_page=20, count="none")
+
+    session.execute.assert_called_once()
+
+    assert paginate["total"] is None
+    assert paginate["last_page"] is None
+
+
+def test_paginate_invalid_count(builder: SelectBuilder):
+    with pytest.raises(ValueError):
+        builder.paginate(count="unknown")
+
+
+@pytest.mark.parametrize("page, per_page", [(0, 30), (-1, 30), (1, 0), (1, -5)])
+def test_paginate_invalid_page(builder: SelectBuilder, page: int, per_page: int):
+    with pytest.raises(ValueError):
+        builder.paginate(page=page, per_page=per_page)
+
+
+@pytest.mark.parametrize("per_page", [0, -1])
+def test_cursor_paginate_invalid_per_page(builder: SelectBuilder, per_page: int):
+    with pytest.raises(ValueError):
+        builder.cursor_paginate(per_page=per_page)
+
+
+def test_paginate_cached_count(faker, session):
+    SelectBuilder.count_cache.clear()
+
+    session.execute.return_value.scalar_one.return_value = 45
+    email = faker.email()
+
+    for _ in range(3):
+        SelectBuilder(User, session=session).where(User.email == email).paginate(
+            count="cached"
+        )
+
+    SelectBuilder(User, session=session).where(User.email == faker.email()).paginate(
+        count="cached"
+    )
+
+    assert SelectBuilder.count_cache.hits == 2
+    assert SelectBuilder.count_cache.misses == 2
+
+
+def test_cached_execute_reuses_statement(faker, session):
+    SelectBuilder.statement_cache.clear()
+
+    emails = [faker.email(), faker.email()]
+
+    for email in emails:
+        SelectBuilder(User, session=session).where(User.email == email).order_by(
+            User.id.asc()
+        ).limit(10).cached().execute()
+
+    (first_stmt, first_params), (second_stmt, second_params) = [
+        call.args for call in session.execute.call_args_list
+    ]
+
+    assert first_stmt is second_stmt
+    assert first_params == {"fa_0": emails[0], "fa_limit": 10}
+    assert second_params == {"fa_0": emails[1], "fa_limit": 10}
+
+    assert SelectBuilder.statement_cache.hits == 1
+    assert SelectBuilder.statement_cache.misses == 1
+
+
+def test_cached_execute_by_shape(faker, session):
+    SelectBuilder.statement_cache.clear()
+
+    builders = [
+        SelectBuilder(User, session=session).where(User.email == faker.email()),
+        SelectBuilder(User, session=session).where(User.name == faker.name()),
+        SelectBuilder(User, session=session).where(User.name == faker.name()).limit(1),
+        SelectBuilder(User, session=session).where(User.id.in_([1, 2, 3])),
+        SelectBuilder(User, session=session).where(User.id.in_([4, 5])),
+    ]
+
+    for builder in builders:
+        builder.cached().execute()
+
+    assert SelectBuilder.statement_cache.misses == 4
+    assert SelectBuilder.statement_cache.hits == 1
+
+    _, params = session.execute.call_args.args
+    assert params == {"fa_0": [4, 5]}
+
+
 # def test_select_joined_load_unique(faker, session: scoped_session):
 #     session.execute(
 #         insert(User).values(
@@ -322,3 +476,81 @@ def test_call_execute_without_session(faker):
 
 #     for user in paginate["data"]:
 #         assert isinstance(user, User)
+
+
+def test_select_with_eager_loading(builder: SelectBuilder):
+    stmt = builder.with_("permissions", "permissions.users")._build()
+
+    strategies = [
+        [loader.strategy for loader in option.context] for option in stmt._with_options
+    ]
+
+    assert strategies == [
+        [(("lazy", "selectin"),)],
+        [(("lazy", "selectin"),), (("lazy", "selectin"),)],
+    ]
+
+
+def test_select_with_strict_eager_loading(builder: SelectBuilder):
+    stmt = builder.with_("permissions", strict=True)._build()
+
+    assert len(stmt._with_options) == 2
+    assert [loader.strategy for loader in stmt._with_options[0].context] == [
+        (("lazy", "selectin"),),
+        (("lazy", "raise"),),
+    ]
+
+
+def test_select_with_unknown_relationship(builder: SelectBuilder):
+    with pytest.raises(ValueError):
+        builder.with_("permissions.roles")
+
+
+def test_frozen_builder_derives_copies(builder: SelectBuilder):
+    base = builder.where(User.enable.is_(True)).freeze()
+
+    first = base.where(User.id == 1).limit(1)
+    second = base.where(User.id == 2).order_by(User.id)
+
+    assert first is not base and second is not first
+    assert len(base._where_clauses) == 1
+    assert len(first._where_clauses) == 2 and first._limit == 1
+    assert second._where_clauses[0] is base._where_clauses[0]
+    assert second._limit is None and base._order_by == ()
+    assert first._frozen and second._frozen
+
+
+def test_frozen_builder_caches_statement(builder: SelectBuilder):
+    base = builder.where(User.enable.is_(True)).freeze()
+
+    assert base._build() is base._build()
+    assert base.limit(1)._build() is not base._build()
+
+
+def test_mutable_builder_rebuilds_statement(builder: SelectBuilder):
+    stmt = builder.where(User.enable.is_(True))._build()
+
+    assert builder.where(User.id == 1) is builder
+    assert builder._build() is not stmt
+
+
+def test_frozen_builder_resolves_session_late(mocker):
+    base = SelectBuilder(User).where(User.enable.is_(True)).freeze()
+    session = mocker.MagicMock(spec=Session)
+
+    mocker.patch.object(User, "_session", None)
+
+    with pytest.raises(SessionNotProvidedError):
+        base.execute()
+
+    mocker.patch.object(User, "_session", session)
+    base.where(User.id == 1).execute()
+
+    session.execute.assert_called_once()
+
+
+def test_prepared(builder: SelectBuilder):
+    stmt = builder.where(User.id == 1).prepared()._build()
+
+    assert stmt.get_execution_options()["prepared"] is True
+    assert "prepared" not in builder.prepared(False)._build().get_execution_options()
@@ -0,0 +1,114 @@
+import typing as t
+
+from datetime import datetime
+
+import pytest
+
+import sqlalchemy as sa
+from sqlalchemy.orm import Mapped, mapped_column
+
+from flex_alchemy.scopes.softdelete import SoftDeleteScope, partial_index
+
+from .conftest import Base
+
+
+class Post(Base):
+    __tablename__ = "posts"
+    __table_args__ = (partial_index("ix_posts_slug_active", "slug", unique=True),)
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    slug: Mapped[str] = mapped_column(sa.String(50))
+    deleted_at: Mapped[t.Optional[datetime]] = mapped_column(nullable=True)
+
+
+Post.add_global_scope(SoftDeleteScope())
+
+
+@pytest.fixture(autouse=True)
+def posts(engine: sa.Engine):
+    Post.bulk_create({"slug": f"post-{num}"} for num in range(1, 6))
+
+
+def slugs(builder) -> t.List[str]:
+    return [post.slug for post in builder.order_by(Post.id).execute().scalars()]
+
+
+def test_delete_instance_softly():
+    Post.find(1).delete()
+
+    assert Post.find(1) is None
+    assert len(Post.all()) == 4
+    assert slugs(Post.select().with_trashed()) == [f"post-{num}" for num in range(1, 6)]
+    assert slugs(Post.select().only_trashed()) == ["post-1"]
+
+
+def test_find_many_skips_trashed():
+    post = Post.find(2)
+    Post.find(1).delete()
+
+    # the soft deleted row is still in the identity map, unexpired
+    Post.destroy().where(Post.id == 2).execute(commit=False)
+
+    posts, missing = Post.find_many([3, 1, 2], with_missing=True)
+
+    assert [post.slug for post in posts] == ["post-3"]
+    assert missing == [1, 2]
+    assert post in Post._session()
+
+
+def test_force_delete_instance():
+    Post.find(1).force_delete()
+
+    assert slugs(Post.select().with_trashed()) == [f"post-{num}" for num in range(2, 6)]
+
+
+def test_destroy_rewritten_to_update(engine):
+    statements = []
+
+    sa.event.listen(
+        engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+
+    Post.destroy().where(Post.id <= 2).execute()
+
+    assert statements[0].startswith("UPDATE posts SET deleted_at=CURRENT_TIMESTAMP")
+    assert "posts.deleted_at IS NULL" in statements[0]
+    assert slugs(Post.select()) == ["post-3", "post-4", "post-5"]
+
+    Post.destroy().where(Post.id == 1).only_trashed().force_delete().execute()
+
+    assert slugs(Post.select().only_trashed()) == ["post-2"]
+
+
+def test_update_scoped():
+    Post.find(1).delete()
+
+    assert Post.update(deleted_at=None).execute().rowcount == 4
+    assert Post.update(deleted_at=None).only_trashed().execute().rowcount == 1
+    assert Post.find(1).slug == "post-1"
+
+
+def test_scoped_count_and_chunked_delete():
+    assert Post.where(Post.id > 1).count() == 4
+
+    assert Post.destroy().execute_chunked(chunk_size=2) == 5
+    assert Post.select().count() == 0
+    assert Post.select().with_trashed().count() == 5
+
+
+def test_partial_index():
+    index = next(iter(Post.__table__.indexes))
+    ddl = str(
+        sa.schema.CreateIndex(index).compile(
+            dialect=sa.create_engine("sqlite://").dialect
+        )
+    )
+
+    assert ddl.endswith("ON posts (slug) WHERE deleted_at IS NULL")
+
+
+def test_unknown_macro():
+    with pytest.raises(AttributeError):
+        Post.select().restore()
@@ -13,7 +13,7 @@ from flex_alchemy.exceptions import SessionNotProvidedError
 
 @pytest.fixture
 def session(mocker):
-    return mocker.MagicMock(spec=Session)
+    return mocker.MagicMock(spec=Session, info={})
 
 
 @pytest.fixture
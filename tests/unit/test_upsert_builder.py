@@ -0,0 +1,116 @@
+import pytest
+
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from flex_alchemy.builders.upsert import UpsertBuilder
+from flex_alchemy.exceptions import SessionNotProvidedError, UnsupportedDialectError
+
+from examples.models import User
+
+
+@pytest.fixture
+def session(mocker):
+    session = mocker.MagicMock(spec=Session, info={})
+    session.get_bind.return_value.dialect.name = "postgresql"
+
+    return session
+
+
+@pytest.fixture
+def builder(session) -> UpsertBuilder:
+    return UpsertBuilder(User, session=session)
+
+
+@pytest.fixture
+def rows(faker) -> list:
+    return [
+        {"name": faker.name(), "email": faker.email(), "password": faker.password()}
+        for _ in range(3)
+    ]
+
+
+def compile_sql(stmt, dialect) -> str:
+    return str(stmt.compile(dialect=dialect))
+
+
+def test_postgresql_on_conflict_do_update(builder: UpsertBuilder, rows: list):
+    stmt = builder.values(rows).on_conflict("email")._build(rows, "postgresql")
+    sql = compile_sql(stmt, postgresql.dialect())
+
+    assert "ON CONFLICT (email) DO UPDATE SET" in sql
+    assert "name = excluded.name" in sql
+    assert "password = excluded.password" in sql
+    assert "updated_at = now()" in sql
+    assert "email = excluded.email" not in sql
+
+
+def test_sqlite_on_conflict_update_columns(builder: UpsertBuilder, rows: list):
+    stmt = (
+        builder.values(rows)
+        .on_conflict("email")
+        .update("name", enable=True)
+        ._build(rows, "sqlite")
+    )
+    sql = compile_sql(stmt, sqlite.dialect())
+
+    assert "ON CONFLICT (email) DO UPDATE SET name = excluded.name, enable = ?" in sql
+
+
+def test_on_conflict_do_nothing(builder: UpsertBuilder, rows: list):
+    stmt = builder.values(rows).do_nothing()._build(rows, "postgresql")
+
+    assert "ON CONFLICT (id) DO NOTHING" in compile_sql(stmt, postgresql.dialect())
+
+
+def test_mysql_on_duplicate_key_update(builder: UpsertBuilder, rows: list):
+    stmt = builder.values(rows).update("name")._build(rows, "mysql")
+    sql = compile_sql(stmt, mysql.dialect())
+
+    assert "ON DUPLICATE KEY UPDATE name = VALUES(name)" in sql
+
+
+def test_unsupported_dialect(builder: UpsertBuilder, rows: list):
+    with pytest.raises(UnsupportedDialectError):
+        builder.values(rows)._build(rows, "mssql")
+
+
+def test_mysql_returning_is_rejected(builder: UpsertBuilder, rows: list):
+    with pytest.raises(UnsupportedDialectError):
+        builder.values(rows).returning(User.id)._build(rows, "mysql")
+
+
+def test_mariadb_returning(builder: UpsertBuilder, rows: list):
+    stmt = builder.values(rows).returning(User.id)._build(rows, "mariadb")
+
+    assert "RETURNING" in compile_sql(stmt, mysql.dialect(is_mariadb=True))
+
+
+def test_execute_in_batches(mocker, session, builder: UpsertBuilder, rows: list):
+    mocker.patch("flex_alchemy.builders.upsert.max_bind_params", return_value=6)
+    session.execute.return_value.rowcount = 1
+
+    total = builder.values(rows).execute()
+
+    # 3 columns per row leave room for 2 rows per statement
+    assert session.execute.call_count == 2
+    assert total == 2
+    session.commit.assert_called_once()
+
+
+def test_execute_returning(session, builder: UpsertBuilder, rows: list):
+    session.execute.return_value.all.return_value = [(1,), (2,), (3,)]
+
+    returned = builder.values(rows).returning(User.id).execute()
+
+    assert returned == [(1,), (2,), (3,)]
+
+
+def test_execute_with_empty_rows(builder: UpsertBuilder):
+    with pytest.raises(ValueError):
+        builder.values([]).execute()
+
+
+def test_call_execute_without_session(rows: list):
+    with pytest.raises(SessionNotProvidedError):
+        UpsertBuilder(User).values(rows).execute()